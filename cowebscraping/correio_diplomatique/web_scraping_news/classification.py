@@ -0,0 +1,24 @@
+from time import perf_counter
+
+from .keyword_manager import KeywordManager
+
+# KeywordManager do processo (o spider e cada worker do ClassificationPipeline têm o seu).
+KEYWORD_MANAGER = KeywordManager()
+
+
+def classify_article(article):
+    """
+    Classifica o texto de uma notícia de uma vez: devolve (accepted_by, gangs).
+    O texto normalizado fica em cache, então as duas validações o reaproveitam.
+    """
+    item = {'article': article or ''}
+    gangs_found = KEYWORD_MANAGER.search_gangs(item)
+    accepted_keyword = KEYWORD_MANAGER.accept_article(item)
+    return accepted_keyword, gangs_found
+
+
+def timed_classify_article(article):
+    """Executado nos workers do ClassificationPipeline: classifica e mede o tempo gasto fora do reator."""
+    start = perf_counter()
+    accepted_keyword, gangs_found = classify_article(article)
+    return accepted_keyword, gangs_found, perf_counter() - start
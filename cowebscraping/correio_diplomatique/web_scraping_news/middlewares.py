@@ -1,10 +1,13 @@
 import json
 import yaml
 import sys
-import pymongo
-from scrapy.exceptions import IgnoreRequest
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import TextResponse
 from scrapy import signals
-from sshtunnel import open_tunnel
+from crawler_common.mongo_pool import acquire_mongo_client
+from crawler_common.seen_index import SeenUrlIndex, load_seen_index
+from crawler_common.bloom_filter import BloomSeenUrls, BatchedUrlLookup, load_bloom_filter
+from crawler_common.render_cache import RenderDecisionCache
 from itemadapter import is_item, ItemAdapter
 
 # Tenta carregar as configurações no início
@@ -62,27 +65,59 @@ class WebScrapingNewsDownloaderMiddleware:
 
 
 class DuplicateFilterMiddleware:
-    def __init__(self, output_mode='json'):
-        self.visited_urls = set()
+    def __init__(self, output_mode='json', snapshot_max_age=0, snapshot_file='visited_urls_{}.idx',
+                 seen_urls_mode='index', bloom_settings=None):
+        # Fingerprints de 64 bits num array ordenado (ver seen_index.SeenUrlIndex), não um set de strings
+        self.visited_urls = SeenUrlIndex()
         self.output_mode = output_mode
+        self.snapshot_max_age = snapshot_max_age
+        self.snapshot_file = snapshot_file
+        self.snapshot_path = None
+
+        # Modo 'bloom': filtro de Bloom em disco + confirmação dos acertos no banco (ver bloom_filter.BloomSeenUrls)
+        self.seen_urls_mode = seen_urls_mode
+        self.bloom_settings = bloom_settings or {}
+        # Índice do executor conjunto (run_spiders.py), compartilhado com os outros spiders: quem salva e fecha é o executor
+        self.shared = False
 
     @classmethod
     def from_crawler(cls, crawler):
         output_mode = crawler.settings.get('OUTPUT_MODE', 'json')
-        middleware = cls(output_mode)
+        middleware = cls(
+            output_mode,
+            snapshot_max_age=crawler.settings.getfloat('SEEN_INDEX_SNAPSHOT_MAX_AGE', 0),
+            snapshot_file=crawler.settings.get('SEEN_INDEX_SNAPSHOT_FILE', 'visited_urls_{}.idx'),
+            seen_urls_mode=crawler.settings.get('SEEN_URLS_MODE', 'index'),
+            bloom_settings={
+                'file': crawler.settings.get('SEEN_BLOOM_FILE', 'visited_urls_{}.bloom'),
+                'capacity': crawler.settings.getint('SEEN_BLOOM_CAPACITY', 10000000),
+                'error_rate': crawler.settings.getfloat('SEEN_BLOOM_ERROR_RATE', 0.001),
+                'max_age': crawler.settings.getfloat('SEEN_BLOOM_MAX_AGE', 30 * 24 * 60 * 60),
+            },
+        )
         crawler.signals.connect(middleware.open_spider, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.close_spider, signal=signals.spider_closed)
         return middleware
 
     def open_spider(self, spider):
+        shared_seen_urls = getattr(spider, 'shared_seen_urls', None)
+        if shared_seen_urls is not None:
+            self.visited_urls = shared_seen_urls
+            self.shared = True
+            spider.logger.info(f"Filtro de duplicatas compartilhado pelo executor: {self.visited_urls.describe()}")
+        else:
+            self.load_visited_urls(spider)
+        # O spider consulta o mesmo filtro para parar a paginação quando uma página só traz URLs já vistas
+        spider.seen_urls = self.visited_urls
+
+    def load_visited_urls(self, spider):
         spider.logger.info("Inicializando Filtro de Duplicatas...")
         
         # --- MODO JSON ---
         if self.output_mode == 'json':
             try:
                 with open('visited_urls.json', 'r', encoding='utf-8') as f:
-                    for line in f:
-                        url_data = json.loads(line.strip())
-                        self.visited_urls.add(url_data['url'])
+                    self.visited_urls = SeenUrlIndex.from_urls(json.loads(line.strip())['url'] for line in f)
             except FileNotFoundError:
                 pass 
 
@@ -95,63 +130,81 @@ class DuplicateFilterMiddleware:
             lamcad_configs = configs['lamcad']
             mongo_configs = configs['mongodb_lamcad']
             
-            server = None
-            client = None
-            
-            # --- AQUI ESTÁ A CORREÇÃO DE PORTA ---
-            # Usamos 27019 para ler o histórico, enquanto o Pipeline usa 27018 para salvar.
-            porta_verificacao = 27019 
+            newspaper = getattr(spider, 'article_newspaper_selector', None)
+            query = {"newspaper": newspaper} if newspaper else {}
+            mongo = None
 
             try:
-                # 1. Abre Túnel Temporário na porta 27019
-                server = open_tunnel(
-                    (lamcad_configs['server_ip'], lamcad_configs['server_port']),
-                    ssh_username=lamcad_configs['ssh_username'],
-                    ssh_password=lamcad_configs['ssh_password'],
-                    local_bind_address=('127.0.0.1', porta_verificacao), # <--- Porta Alternativa
-                    remote_bind_address=(lamcad_configs['remote_bind_ip'], lamcad_configs['remote_bind_port'])
-                )
-                server.start()
-                
-                # 2. Conecta ao Mongo usando a porta 27019
-                client = pymongo.MongoClient(
-                    host='127.0.0.1',
-                    port=porta_verificacao,  # <--- Conecta na Porta Alternativa
-                    serverSelectionTimeoutMS=5000
-                )
+                # 1. Empresta túnel + cliente do pool do processo. A porta local é escolhida automaticamente,
+                # e o Pipeline reaproveita o mesmo túnel depois (sem porta alternativa nem segundo handshake).
+                mongo = acquire_mongo_client(lamcad_configs, mongo_configs['uri'])
+                client = mongo.client
 
                 db = client[mongo_configs['database']]
                 collection = db['visitedUrls']
-                
-                # 3. Lógica de Busca (Isso faltava no seu snippet!)
-                newspaper = getattr(spider, 'article_newspaper_selector', None)
-                query = {"newspaper": newspaper} if newspaper else {}
-                
-                # Traz apenas o campo URL para ser rápido
-                cursor = collection.find(query, {"url": 1}) 
-                
-                count = 0
-                for doc in cursor:
-                    self.visited_urls.add(doc.get('url'))
-                    count += 1
-                
-                spider.logger.info(f"{count} URLs carregadas do MongoDB para o filtro.")
+
+                if self.seen_urls_mode == 'bloom':
+                    # 2a. Filtro de Bloom; a conexão fica emprestada para as confirmações até o fim do spider
+                    self.visited_urls = self.open_bloom_filter(collection, query, mongo, newspaper or spider.name, spider)
+                    mongo = None
+                else:
+                    # 2b. Índice compacto: percorre o cursor em lotes (traz apenas o campo URL para ser rápido)
+                    self.snapshot_path = self.snapshot_file.format(newspaper or spider.name)
+                    # (com snapshot, só os documentos acima do high-water mark de _id atravessam o túnel)
+                    self.visited_urls, from_snapshot, fetched = load_seen_index(
+                        self.snapshot_path, self.snapshot_max_age, [('visitedUrls', collection, query)])
+                    origin = (f"do snapshot {self.snapshot_path} (+{fetched} novas do MongoDB)"
+                              if from_snapshot else "do MongoDB")
+                    spider.logger.info(f"URLs carregadas {origin} para o filtro: {self.visited_urls.describe()}")
 
             except Exception as e:
                 spider.logger.error(f"Erro ao carregar duplicatas do Mongo: {e}")
             
             finally:
-                # 4. Fecha tudo imediatamente
-                if client: client.close()
-                if server: server.stop()
+                # 3. Devolve ao pool (o túnel continua aberto por alguns segundos para o Pipeline)
+                if mongo: mongo.release()
 
-    def process_request(self, request, spider):
+    def open_bloom_filter(self, collection, query, mongo, scope, spider):
+        settings = self.bloom_settings
+        bloom_file = settings['file'].format(scope)
+
+        bloom, from_disk, fetched = load_bloom_filter(
+            bloom_file, settings['max_age'], settings['capacity'], settings['error_rate'],
+            count_documents=lambda: collection.count_documents(query),
+            sources=[('visitedUrls', collection, query)],
+        )
+        lookup = BatchedUrlLookup([collection], mongo, logger=spider.logger)
+        # A confirmação de cada lote é uma consulta $in: sem índice no campo url, cada lote percorre a coleção
+        missing = lookup.collections_without_url_index()
+        if missing:
+            spider.logger.warning(f"⚠️ Sem índice no campo url em {missing}: crie-o uma vez com createIndex({{url: 1}}).")
+        visited_urls = BloomSeenUrls(bloom, lookup)
+        origin = f"do arquivo {bloom_file} (+{fetched} novas do MongoDB)" if from_disk else "do MongoDB"
+        spider.logger.info(f"Filtro de duplicatas carregado {origin}: {visited_urls.describe()}")
+        return visited_urls
+
+    def close_spider(self, spider):
+        if self.shared:
+            spider.logger.info(f"Filtro de duplicatas (compartilhado) no encerramento: {self.visited_urls.describe()}")
+            return
+        # Atualiza o snapshot com as URLs visitadas nesta execução
+        if self.seen_urls_mode != 'bloom' and self.snapshot_path and self.snapshot_max_age > 0 and self.visited_urls.recent:
+            try:
+                count = self.visited_urls.save(self.snapshot_path)
+                spider.logger.info(f"Snapshot do filtro atualizado: {count} URLs em {self.snapshot_path}")
+            except OSError as e:
+                spider.logger.error(f"Erro ao salvar snapshot do filtro: {e}")
+        spider.logger.info(f"Filtro de duplicatas no encerramento: {self.visited_urls.describe()}")
+        self.visited_urls.close()
+
+    async def process_request(self, request, spider):
         # Lógica de ignorar URL
         is_search_url = False
         if hasattr(spider, 'is_search_url'):
             is_search_url = spider.is_search_url(request.url)
 
-        if not is_search_url and request.url in self.visited_urls:
+        # No modo 'bloom' só os acertos do filtro vão ao banco (agrupados em lote com os de outras requisições)
+        if not is_search_url and await self.visited_urls.contains(request.url):
             spider.logger.info(f"🚫 URL Duplicada ignorada: {request.url}")
             raise IgnoreRequest(f"🚫 URL já visitada: {request.url}")
         
@@ -167,3 +220,93 @@ class DuplicateFilterMiddleware:
             self.visited_urls.add(request.url)
             
         return response
+
+
+class StaticFirstMiddleware:
+    """
+    Baixa primeiro por HTTP simples e só escala para o Playwright quando o conteúdo não vem no HTML.
+
+    Vale para as requisições cujo callback está em `spider.static_first_callbacks` e que não pediram o
+    navegador explicitamente (meta 'playwright'). A resposta estática é conferida com os seletores de conteúdo
+    do spider (`article_content_selector` em XPath e/ou `body_selectors` em CSS): se todos vierem vazios, a mesma
+    requisição é refeita com o Playwright. O caminho que trouxe o conteúdo fica gravado por padrão de URL e por
+    domínio (ver render_cache.RenderDecisionCache), e as próximas URLs do mesmo padrão vão direto para ele.
+    """
+    def __init__(self, cache_file='render_decisions_{}.json', cache_ttl=0, stats=None):
+        self.cache_file = cache_file
+        self.cache_ttl = cache_ttl
+        self.stats = stats
+        self.cache = RenderDecisionCache()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('STATIC_FIRST_ENABLED', True):
+            raise NotConfigured
+        middleware = cls(
+            cache_file=crawler.settings.get('STATIC_FIRST_CACHE_FILE', 'render_decisions_{}.json'),
+            cache_ttl=crawler.settings.getfloat('STATIC_FIRST_CACHE_TTL', 0),
+            stats=crawler.stats,
+        )
+        crawler.signals.connect(middleware.open_spider, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.close_spider, signal=signals.spider_closed)
+        return middleware
+
+    def open_spider(self, spider):
+        self.cache = RenderDecisionCache.load(self.cache_file.format(spider.name), self.cache_ttl)
+        if self.cache.entries:
+            spider.logger.info(f"🧭 Decisões de renderização carregadas: {self.cache.describe()}")
+
+    def close_spider(self, spider):
+        try:
+            self.cache.save()
+        except OSError as e:
+            spider.logger.error(f"Erro ao salvar as decisões de renderização: {e}")
+        spider.logger.info(f"🧭 Decisões de renderização: {self.cache.describe()}")
+
+    def applies_to(self, request, spider):
+        callback = getattr(request.callback, '__name__', None)
+        return callback in getattr(spider, 'static_first_callbacks', ()) and (
+            'playwright' not in request.meta or request.meta.get('static_first'))
+
+    def process_request(self, request, spider):
+        if not self.applies_to(request, spider) or 'static_first' in request.meta:
+            return None
+        if self.cache.mode(request.url) == 'browser':
+            # Padrão que só funciona no navegador: vai direto, sem a tentativa estática
+            request.meta['playwright'] = True
+            request.meta['static_first'] = 'browser'
+            self.stats.inc_value('static_first/browser_direct')
+        else:
+            request.meta['static_first'] = 'static'
+        return None
+
+    def process_response(self, request, response, spider):
+        step = request.meta.get('static_first')
+        if step is None or not self.applies_to(request, spider) or response.status != 200:
+            return response
+
+        if self.has_content(response, spider):
+            self.cache.record(request.url, step if step != 'escalated' else 'browser', tested=step != 'browser')
+            self.stats.inc_value(f'static_first/{step}_ok')
+            return response
+
+        if step == 'static':
+            # HTML sem o conteúdo (renderizado por JS): refaz a mesma requisição pelo Playwright
+            self.stats.inc_value('static_first/escalated')
+            spider.logger.debug(f"Conteúdo vazio no HTML estático, usando o navegador: {request.url}")
+            return request.replace(meta={**request.meta, 'playwright': True, 'static_first': 'escalated'},
+                                   dont_filter=True)
+        # Vazio também no navegador: a página não tem o conteúdo, a decisão fica como estava
+        self.stats.inc_value('static_first/empty')
+        return response
+
+    # Método que confere se algum dos seletores de conteúdo do spider encontrou texto na resposta.
+    @staticmethod
+    def has_content(response, spider):
+        if not isinstance(response, TextResponse):
+            return False
+        xpath = getattr(spider, 'article_content_selector', None)
+        if xpath and any(text.strip() for text in response.xpath(xpath).getall()):
+            return True
+        return any(text.strip() for selector in getattr(spider, 'body_selectors', ())
+                   for text in response.css(selector).getall())
@@ -1,10 +1,26 @@
+import asyncio
 import json
+import multiprocessing
+import os
 import sys
 import yaml
 import pymongo
-from scrapy.exceptions import DropItem
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from scrapy.exceptions import DropItem, NotConfigured
 from itemadapter import ItemAdapter
-from sshtunnel import open_tunnel
+from scrapy.utils.defer import deferred_from_coro
+from twisted.internet import defer
+
+from .classification import classify_article, timed_classify_article
+from crawler_common.id_allocator import IdEventAllocator, AsyncIdEventAllocator
+from crawler_common.mongo_pool import acquire_mongo_client, close_spider_without_database
+
+# Driver assíncrono (opcional, só para o AsyncStoragePipeline): pip install motor
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:
+    AsyncIOMotorClient = None
 
 # --- CARREGAMENTO DO ARQUIVO DE CONFIGURAÇÃO ---
 try:
@@ -14,22 +30,113 @@ except FileNotFoundError:
     print("ERRO CRÍTICO: Arquivo config.yaml não encontrado!")
     sys.exit(1)
 
+# --- PIPELINE DE CLASSIFICAÇÃO (OPCIONAL) ---
+class ClassificationPipeline:
+    """
+    Tira a validação de palavras-chave (accept_article + search_gangs) da thread do reator,
+    enviando cada artigo para um pool de processos e devolvendo um Deferred.
+    Ativação: CLASSIFICATION_ENABLED = True. CLASSIFICATION_WORKERS = 0 classifica inline.
+    """
+    def __init__(self, workers, stats):
+        self.workers = workers
+        self.stats = stats
+        self.executor = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('CLASSIFICATION_ENABLED'):
+            raise NotConfigured
+        workers = crawler.settings.getint('CLASSIFICATION_WORKERS', os.cpu_count() or 1)
+        return cls(workers, crawler.stats)
+
+    def open_spider(self, spider):
+        # Avisa o spider para não classificar no parse_item
+        spider.deferred_classification = True
+        if self.workers > 0:
+            try:
+                # 'spawn' evita herdar por fork as threads do Playwright/reator
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+                spider.logger.info(f"Classificação em {self.workers} processo(s) fora do reator.")
+            except (OSError, NotImplementedError) as e:
+                spider.logger.warning(f"⚠️ Não foi possível criar o pool de classificação ({e}). Classificando inline.")
+        else:
+            spider.logger.info("Classificação inline (CLASSIFICATION_WORKERS = 0).")
+
+    def close_spider(self, spider):
+        if self.executor:
+            self.executor.shutdown(wait=True)
+        offloaded_time = self.stats.get_value('classification/offloaded_time', 0)
+        offloaded_items = self.stats.get_value('classification/offloaded_items', 0)
+        inline_items = self.stats.get_value('classification/inline_items', 0)
+        spider.logger.info(
+            f"⏱️ Classificação: {offloaded_items} itens nos workers ({offloaded_time:.2f}s poupados do reator), "
+            f"{inline_items} itens inline.")
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        if self.executor is None:
+            return self.classify_inline(item, spider)
+
+        try:
+            future = self.executor.submit(timed_classify_article, adapter.get('article'))
+        except (BrokenProcessPool, RuntimeError) as e:
+            spider.logger.warning(f"⚠️ Pool de classificação indisponível ({e}). Seguindo inline.")
+            self.executor = None
+            return self.classify_inline(item, spider)
+
+        # Importado aqui para não instalar o reator padrão antes do AsyncioSelectorReactor do Scrapy.
+        from twisted.internet import reactor
+
+        deferred = defer.Deferred()
+        future.add_done_callback(lambda done: reactor.callFromThread(deferred.callback, done))
+        deferred.addCallback(self.on_classified, item, spider)
+        return deferred
+
+    def on_classified(self, future, item, spider):
+        try:
+            accepted_keyword, gangs_found, elapsed = future.result()
+        except Exception as e:
+            spider.logger.warning(f"⚠️ Falha no worker de classificação ({e}). Classificando inline: {ItemAdapter(item).get('url')}")
+            return self.classify_inline(item, spider)
+
+        self.stats.inc_value('classification/offloaded_items')
+        self.stats.inc_value('classification/offloaded_time', elapsed)
+        return spider.apply_classification(item, accepted_keyword, gangs_found)
+
+    def classify_inline(self, item, spider):
+        accepted_keyword, gangs_found = classify_article(ItemAdapter(item).get('article'))
+        self.stats.inc_value('classification/inline_items')
+        return spider.apply_classification(item, accepted_keyword, gangs_found)
+
+
 # --- PIPELINE DE ARMAZENAMENTO ---
 class StoragePipeline:
-    def __init__(self, output_mode='json'):
+    def __init__(self, output_mode='json', id_block_size=100, counters_collection='counters'):
         self.output_mode = output_mode
         self.approved_file = None
         self.rejected_file = None
         
-        # Variáveis do MongoDB e SSH
+        # Variáveis do MongoDB e SSH (túnel e cliente emprestados do pool do processo)
         self.client = None
         self.db = None
-        self.server = None 
+        self.mongo = None
+
+        # id_event reservado em blocos numa coleção de contadores (único entre spiders paralelos)
+        self.id_block_size = id_block_size
+        self.counters_collection = counters_collection
+        self.id_allocator = None
 
     @classmethod
     def from_crawler(cls, crawler):
         output_mode = crawler.settings.get('OUTPUT_MODE', 'json')
-        return cls(output_mode)
+        # Com MONGODB_ASYNC = True quem grava no banco é o AsyncStoragePipeline
+        if output_mode == 'database' and crawler.settings.getbool('MONGODB_ASYNC'):
+            raise NotConfigured
+        return cls(
+            output_mode,
+            id_block_size=crawler.settings.getint('ID_EVENT_BLOCK_SIZE', 100),
+            counters_collection=crawler.settings.get('ID_EVENT_COUNTERS_COLLECTION', 'counters'),
+        )
 
     def open_spider(self, spider):
         if self.output_mode == 'json':
@@ -38,30 +145,35 @@ class StoragePipeline:
             
         elif self.output_mode == 'database':
             # --- CONEXÃO SSH E MONGODB ---
-            # O Middleware abriu e fechou o túnel para LER. O Pipeline abre e MANTÉM aberto para ESCREVER.
+            # Túnel e cliente vêm do pool do processo: o Middleware já abriu o túnel para LER e o Pipeline
+            # reaproveita o mesmo túnel (e o mesmo cliente) para ESCREVER, sem novo handshake SSH.
             lamcad_configs = configs['lamcad']
             mongo_configs = configs['mongodb_lamcad']
 
             try:
-                # 1. Abre o Túnel SSH
-                self.server = open_tunnel(
-                    (lamcad_configs['server_ip'], lamcad_configs['server_port']),
-                    ssh_username=lamcad_configs['ssh_username'],
-                    ssh_password=lamcad_configs['ssh_password'],
-                    local_bind_address=(lamcad_configs['local_bind_ip'], lamcad_configs['local_bind_port']),
-                    remote_bind_address=(lamcad_configs['remote_bind_ip'], lamcad_configs['remote_bind_port'])
-                )
-                self.server.start()
-                spider.logger.info(f"✅ Pipeline: Túnel SSH aberto na porta local: {self.server.local_bind_port}")
-
-                # 2. Conecta ao MongoDB através do túnel
-                self.client = pymongo.MongoClient(mongo_configs['uri'])
-                self.db = self.client[mongo_configs['database']]
+                # 1. Empresta túnel SSH + cliente do pool
+                self.mongo = acquire_mongo_client(lamcad_configs, mongo_configs['uri'])
+                spider.logger.info(f"✅ Pipeline: Túnel SSH aberto na porta local: {self.mongo.local_bind_port}")
+
+                # 2. Banco através do túnel
+                self.client = self.mongo.client
+                db = self.client[mongo_configs['database']]
                 
                 spider.logger.info(f"✅ Pipeline: Conectado ao MongoDB: {mongo_configs['database']}")
 
+                # 3. Alinha o contador de id_event com o maior id já gravado em newsData
+                self.id_allocator = IdEventAllocator(
+                    db[self.counters_collection], 'newsData', block_size=self.id_block_size)
+                last_id_event = self.id_allocator.seed(db['newsData'])
+                spider.logger.info(f"✅ Pipeline: Contador de id_event alinhado (maior id no banco: {last_id_event})")
+
             except Exception as e:
                 spider.logger.error(f"❌ Pipeline: ERRO CRÍTICO ao conectar no banco ou SSH: {e}")
+                close_spider_without_database(spider)
+                return
+
+            # Só com o contador alinhado: sem isso o process_item não grava (ids repetidos em newsData)
+            self.db = db
 
         else:
             raise ValueError(f"Modo de saída desconhecido: {self.output_mode}")
@@ -72,11 +184,10 @@ class StoragePipeline:
             if self.rejected_file: self.rejected_file.close()
                 
         elif self.output_mode == 'database':
-            if self.client:
-                self.client.close()
-            if self.server:
-                self.server.stop()
-                spider.logger.info("Pipeline: Túnel SSH fechado.")
+            # Devolve o cliente ao pool (o túnel fecha quando ninguém mais o usa)
+            if self.mongo:
+                self.mongo.release()
+                spider.logger.info("Pipeline: Conexão devolvida ao pool.")
 
     def process_item(self, item, spider):
         adapter = ItemAdapter(item)
@@ -85,49 +196,14 @@ class StoragePipeline:
             if self.db is None:
                 return item
 
-            url = adapter.get('url')
-            newspaper = getattr(spider, 'article_newspaper_selector', None)
-
-            # --------------------------------------------------------------------------------------
-            # ETAPA 1: Salvar na coleção visitedUrls (TODAS as notícias) - SEM VERIFICAR DUPLICIDADE
-            # O Middleware já filtrou duplicatas de REQUESTS. Se chegou aqui, é uma URL nova.
-            # --------------------------------------------------------------------------------------
-            
-            # Usamos update_one com upsert=True para ser idempotente e não ter problemas de concorrência
-            # Caso a URL tenha sido adicionada por outro processo/thread após o filtro do Middleware.
-            self.db['visitedUrls'].update_one(
-                {'url': url}, 
-                {'$set': {'url': url, 'newspaper': newspaper}},
-                upsert=True # Insere se não existir
-            )
-            
-            # ---------------------------------------------------------
-            # ETAPA 2: Salvar na coleção newsData (Apenas ACEITAS)
-            # ---------------------------------------------------------
-            # ETAPA 2: Salvar na coleção newsData (Apenas ACEITAS)
-            # ---------------------------------------------------------
-            if adapter.get('accepted_by'):
-                
-                # Vamos tentar INSERIR. Se der erro de duplicata, capturamos o erro.
-                try:
-                    # Lógica de ID Incremental (Só faz sentido calcular se for inserir)
-                    last_item = self.db['newsData'].find_one(
-                        {}, 
-                        sort=[("id_event", -1)] 
-                    )
-                    next_id_event = (last_item['id_event'] + 1) if last_item else 1
-                    adapter['id_event'] = next_id_event
-                    
-                    # TENTA INSERIR
-                    self.db['newsData'].insert_one(dict(adapter))
-                    
-                    # Se chegou aqui, é porque deu certo
-                    print(f"✅ [DB] Notícia ACEITA salva em newsData (ID {next_id_event}): {url}")
-
-                except pymongo.errors.DuplicateKeyError:
-                    # Se cair aqui, é porque já existia. Apenas avisamos e seguimos a vida.
-                    print(f"⚠️ [DB] Notícia já existe em newsData (Ignorada): {url}")
-                    
+            try:
+                self.save_to_database(adapter, spider)
+            except pymongo.errors.ConnectionFailure as e:
+                # Túnel caiu no meio da execução: reabre (na mesma porta) e tenta a gravação mais uma vez
+                spider.logger.warning(f"⚠️ [DB] Conexão perdida ({e}). Reabrindo o túnel SSH...")
+                if not self.mongo.ensure_connected():
+                    raise
+                self.save_to_database(adapter, spider)
                     
         elif self.output_mode == 'json':
             line = json.dumps(dict(adapter), ensure_ascii=False) + "\n"
@@ -137,3 +213,155 @@ class StoragePipeline:
                 self.rejected_file.write(line)
 
         return item
+
+    def save_to_database(self, adapter, spider):
+        url = adapter.get('url')
+        newspaper = getattr(spider, 'article_newspaper_selector', None)
+
+        # --------------------------------------------------------------------------------------
+        # ETAPA 1: Salvar na coleção visitedUrls (TODAS as notícias) - SEM VERIFICAR DUPLICIDADE
+        # O Middleware já filtrou duplicatas de REQUESTS. Se chegou aqui, é uma URL nova.
+        # --------------------------------------------------------------------------------------
+        
+        # Usamos update_one com upsert=True para ser idempotente e não ter problemas de concorrência
+        # Caso a URL tenha sido adicionada por outro processo/thread após o filtro do Middleware.
+        self.db['visitedUrls'].update_one(
+            {'url': url}, 
+            {'$set': {'url': url, 'newspaper': newspaper}},
+            upsert=True # Insere se não existir
+        )
+        
+        # ---------------------------------------------------------
+        # ETAPA 2: Salvar na coleção newsData (Apenas ACEITAS)
+        # ---------------------------------------------------------
+        # ETAPA 2: Salvar na coleção newsData (Apenas ACEITAS)
+        # ---------------------------------------------------------
+        if adapter.get('accepted_by'):
+            
+            # Vamos tentar INSERIR. Se der erro de duplicata, capturamos o erro.
+            try:
+                # ID Incremental reservado em blocos (Só faz sentido calcular se for inserir)
+                next_id_event = self.id_allocator.next()
+                adapter['id_event'] = next_id_event
+                
+                # TENTA INSERIR
+                self.db['newsData'].insert_one(dict(adapter))
+                
+                # Se chegou aqui, é porque deu certo
+                print(f"✅ [DB] Notícia ACEITA salva em newsData (ID {next_id_event}): {url}")
+
+            except pymongo.errors.DuplicateKeyError:
+                # Se cair aqui, é porque já existia. Apenas avisamos e seguimos a vida.
+                print(f"⚠️ [DB] Notícia já existe em newsData (Ignorada): {url}")
+
+
+# --- PIPELINE DE ARMAZENAMENTO ASSÍNCRONO (MOTOR) ---
+class AsyncStoragePipeline(StoragePipeline):
+    """
+    Versão assíncrona do StoragePipeline (modo 'database'): process_item é uma corrotina e as gravações
+    rodam no loop do asyncio, sem travar o navegador do Playwright.
+    No máximo MONGODB_MAX_IN_FLIGHT gravações ficam em andamento; com a fila cheia o process_item espera,
+    o que segura o crawler quando o banco remoto está lento em vez de travá-lo.
+    Ativação: MONGODB_ASYNC = True (requer o pacote motor).
+    """
+    def __init__(self, max_in_flight=16, id_block_size=100, counters_collection='counters', stats=None):
+        super().__init__('database', id_block_size=id_block_size, counters_collection=counters_collection)
+        self.max_in_flight = max_in_flight
+        self.stats = stats
+        self.slots = None
+        self.tasks = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if crawler.settings.get('OUTPUT_MODE', 'json') != 'database' or not crawler.settings.getbool('MONGODB_ASYNC'):
+            raise NotConfigured
+        if AsyncIOMotorClient is None:
+            raise NotConfigured("MONGODB_ASYNC requer o pacote 'motor' (pip install motor).")
+        return cls(
+            max_in_flight=crawler.settings.getint('MONGODB_MAX_IN_FLIGHT', 16),
+            id_block_size=crawler.settings.getint('ID_EVENT_BLOCK_SIZE', 100),
+            counters_collection=crawler.settings.get('ID_EVENT_COUNTERS_COLLECTION', 'counters'),
+            stats=crawler.stats,
+        )
+
+    def open_spider(self, spider):
+        return deferred_from_coro(self.open(spider))
+
+    def close_spider(self, spider):
+        return deferred_from_coro(self.close(spider))
+
+    async def open(self, spider):
+        lamcad_configs = configs['lamcad']
+        mongo_configs = configs['mongodb_lamcad']
+
+        try:
+            # 1. Empresta do pool o túnel SSH e um cliente assíncrono
+            self.mongo = acquire_mongo_client(lamcad_configs, mongo_configs['uri'], AsyncIOMotorClient)
+            spider.logger.info(f"✅ Pipeline: Túnel SSH aberto na porta local: {self.mongo.local_bind_port}")
+
+            # 2. Banco através do túnel
+            self.client = self.mongo.client
+            db = self.client[mongo_configs['database']]
+
+            # 3. Alinha o contador de id_event com o maior id já gravado em newsData
+            self.id_allocator = AsyncIdEventAllocator(
+                db[self.counters_collection], 'newsData', block_size=self.id_block_size)
+            last_id_event = await self.id_allocator.seed(db['newsData'])
+            spider.logger.info(f"✅ Pipeline: Conectado ao MongoDB (assíncrono): {mongo_configs['database']}")
+            spider.logger.info(f"✅ Pipeline: Contador de id_event alinhado (maior id no banco: {last_id_event})")
+
+        except Exception as e:
+            spider.logger.error(f"❌ Pipeline: ERRO CRÍTICO ao conectar no banco ou SSH: {e}")
+            close_spider_without_database(spider)
+            return
+
+        self.db = db
+        self.slots = asyncio.Semaphore(self.max_in_flight)
+
+    async def close(self, spider):
+        # Espera as gravações em andamento antes de fechar a conexão
+        if self.tasks:
+            spider.logger.info(f"Pipeline: aguardando {len(self.tasks)} gravações pendentes no MongoDB...")
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.mongo:
+            self.mongo.release()
+            spider.logger.info("Pipeline: Conexão devolvida ao pool.")
+
+    async def process_item(self, item, spider):
+        if self.db is None:
+            return item
+
+        # Backpressure: sem vaga na fila de gravações, o item espera aqui
+        if self.slots.locked() and self.stats:
+            self.stats.inc_value('mongodb/backpressure_waits')
+        await self.slots.acquire()
+
+        newspaper = getattr(spider, 'article_newspaper_selector', None)
+        task = asyncio.ensure_future(self.write(dict(ItemAdapter(item)), newspaper))
+        self.tasks.add(task)
+        task.add_done_callback(lambda done: self.on_write_done(done, spider))
+        return item
+
+    def on_write_done(self, task, spider):
+        self.tasks.discard(task)
+        self.slots.release()
+        if not task.cancelled() and task.exception():
+            spider.logger.error(f"❌ [DB] Falha na gravação assíncrona: {task.exception()}")
+
+    async def write(self, data, newspaper):
+        """Mesmas etapas do StoragePipeline: visitedUrls para todas, newsData só para as aceitas."""
+        url = data.get('url')
+
+        await self.db['visitedUrls'].update_one(
+            {'url': url},
+            {'$set': {'url': url, 'newspaper': newspaper}},
+            upsert=True
+        )
+
+        if data.get('accepted_by'):
+            try:
+                data['id_event'] = await self.id_allocator.next()
+                await self.db['newsData'].insert_one(data)
+                print(f"✅ [DB] Notícia ACEITA salva em newsData (ID {data['id_event']}): {url}")
+            except pymongo.errors.DuplicateKeyError:
+                print(f"⚠️ [DB] Notícia já existe em newsData (Ignorada): {url}")
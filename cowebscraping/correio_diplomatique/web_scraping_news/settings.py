@@ -7,6 +7,15 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import os
+import sys
+
+# Módulos divididos com o outro projeto (cowebscraping/crawler_common): a pasta cowebscraping entra no sys.path
+# para o `scrapy crawl` rodado na pasta do scrapy.cfg (o run_spiders.py já roda de lá)
+cowebscraping_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if cowebscraping_dir not in sys.path:
+    sys.path.append(cowebscraping_dir)
+
 BOT_NAME = "web_scraping_news"
 
 SPIDER_MODULES = ["web_scraping_news.spiders"]
@@ -67,6 +76,7 @@ ROBOTSTXT_OBEY = False
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 DOWNLOADER_MIDDLEWARES = {
     "web_scraping_news.middlewares.DuplicateFilterMiddleware": 543,
+    "web_scraping_news.middlewares.StaticFirstMiddleware": 545,
 }
 
 # Enable or disable extensions
@@ -78,12 +88,74 @@ DOWNLOADER_MIDDLEWARES = {
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 ITEM_PIPELINES = {
+    "web_scraping_news.pipelines.ClassificationPipeline": 200,  # Só atua com CLASSIFICATION_ENABLED = True
     "web_scraping_news.pipelines.StoragePipeline": 300,
+    "web_scraping_news.pipelines.AsyncStoragePipeline": 300,    # Só atua com MONGODB_ASYNC = True (modo 'database')
 }
 
 # Defina o modo de saída: 'json' ou 'database'
 OUTPUT_MODE = 'database'
 
+# Palavras-chave buscadas ao mesmo tempo (BaseSpider). Cada uma tem o seu contador de requisições pendentes
+# e grava o próprio checkpoint quando ele zera; todas dividem os CONCURRENT_REQUESTS do downloader.
+KEYWORD_CONCURRENCY = 4
+# Páginas da busca pedidas ao mesmo tempo por palavra-chave quando a primeira página mostra o total de páginas
+# (paged_search_url_template); a paginação para na primeira página vazia (ou, no modo incremental, só com URLs conhecidas).
+SEARCH_PAGE_FANOUT = 4
+# Modo incremental (para atualizações): a busca (ordenada por data) de uma palavra-chave para depois de N páginas
+# seguidas só com URLs já conhecidas antes desta execução. 0 = sempre percorre a busca inteira (primeira coleta ou
+# reposição); ative para as atualizações, ex: scrapy crawl diplomatique_news -s INCREMENTAL_STOP_PAGES=2
+INCREMENTAL_STOP_PAGES = 0
+# Fronteira em disco (frontier.py): as requisições de busca/notícia ficam num SQLite por spider e só
+# FRONTIER_MAX_IN_FLIGHT vão para o Scrapy por vez; a coleta continua de onde parou depois de um reinício.
+FRONTIER_FILE = 'frontier_{}.sqlite3'
+FRONTIER_MAX_IN_FLIGHT = 32
+# Fila de trabalho compartilhada (work_queue.py): com WORK_QUEUE = 'mongo' (várias máquinas) ou 'sqlite' (uma
+# máquina), as palavras-chave do recorte são semeadas na fila e cada processo reserva uma de cada vez (lease renovado
+# a cada WORK_QUEUE_HEARTBEAT segundos; sem renovação por WORK_QUEUE_LEASE segundos, outro processo a pega).
+# None = cada processo com a sua lista (-a inicio/fim).
+WORK_QUEUE = None
+WORK_QUEUE_FILE = 'work_queue.sqlite3'
+WORK_QUEUE_COLLECTION = 'workQueue'
+WORK_QUEUE_LEASE = 300
+WORK_QUEUE_HEARTBEAT = 60
+
+# Classificação das notícias fora do reator (ClassificationPipeline)
+CLASSIFICATION_ENABLED = False
+# Quantidade de processos do pool (0 = classifica inline)
+#CLASSIFICATION_WORKERS = 4
+
+# Alocação de id_event: ids reservados por round trip na coleção de contadores (compartilhada entre spiders)
+ID_EVENT_BLOCK_SIZE = 100
+ID_EVENT_COUNTERS_COLLECTION = 'counters'
+
+# Gravação assíncrona no MongoDB (AsyncStoragePipeline, requer: pip install motor)
+MONGODB_ASYNC = False
+# Máximo de gravações em andamento; com a fila cheia o crawler espera o banco (backpressure)
+MONGODB_MAX_IN_FLIGHT = 16
+
+# Índice compacto de URLs visitadas (DuplicateFilterMiddleware, modo 'database')
+# Snapshot local reaberto via mmap; a cada início só as URLs com _id acima do high-water mark vêm do banco.
+# Reconstruído do zero depois de SEEN_INDEX_SNAPSHOT_MAX_AGE segundos (0 = sem snapshot, sempre lê tudo)
+SEEN_INDEX_SNAPSHOT_MAX_AGE = 7 * 24 * 60 * 60
+SEEN_INDEX_SNAPSHOT_FILE = 'visited_urls_{}.idx'
+# 'index' (fingerprints de todas as URLs) ou 'bloom' (filtro de Bloom em disco, memória constante; acertos confirmados no banco)
+SEEN_URLS_MODE = 'index'
+SEEN_BLOOM_FILE = 'visited_urls_{}.bloom'
+SEEN_BLOOM_CAPACITY = 10000000          # URLs previstas (o filtro é recriado com o dobro do histórico se ele for maior)
+SEEN_BLOOM_ERROR_RATE = 0.001           # Taxa de falsos positivos (cada um custa uma URL a mais na consulta de confirmação)
+SEEN_BLOOM_MAX_AGE = 30 * 24 * 60 * 60  # Segundos até o filtro ser recriado do zero (antes disso, só busca o que é novo). 0 = nunca
+
+# Pool de abas do Playwright (page_pool.py): as páginas de busca reaproveitam abas já abertas
+PAGE_POOL_MAX_NAVIGATIONS = 50          # Navegações por aba antes de trocá-la por uma nova
+PAGE_POOL_MAX_HEAP_MB = 256             # Heap de JS (MB) a partir do qual a aba é trocada antes do limite de navegações
+PAGE_POOL_CONTEXT_MAX_PAGES = 10        # Abas trocadas antes de recriar o contexto do navegador inteiro
+
+# Notícias baixadas primeiro por HTTP simples; Playwright só se os seletores de conteúdo vierem vazios (StaticFirstMiddleware)
+STATIC_FIRST_ENABLED = True
+STATIC_FIRST_CACHE_FILE = 'render_decisions_{}.json'  # Caminho escolhido por padrão de URL/domínio, reaproveitado entre execuções
+STATIC_FIRST_CACHE_TTL = 7 * 24 * 60 * 60          # Segundos até o padrão voltar a ser testado pelo HTTP simples (0 = nunca expira)
+
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -1,14 +1,66 @@
-import json
 import yaml
-import os
-import re
-from urllib.parse import urlparse, parse_qs, quote
+from urllib.parse import urlparse, parse_qs
 import scrapy
-from pymongo import MongoClient
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+from twisted.internet import task
 from ..keyword_manager import KeywordManager
 from ..items import NewsItem
+from crawler_common.checkpoint_journal import CheckpointJournal
+from crawler_common.frontier import RequestFrontier
+from crawler_common.work_queue import MongoWorkQueue, SqliteWorkQueue, worker_path
+from crawler_common.mongo_pool import acquire_mongo_client
 from datetime import datetime
 import pytz
+import time
+
+
+class KeywordState:
+    """
+    Estado de uma palavra-chave em andamento: requisições pendentes, página atual da busca e o callback
+    chamado quando a última requisição dela termina (aí ela recebe o próprio checkpoint).
+    """
+    def __init__(self, keyword, on_complete):
+        self.keyword = keyword
+        self.on_complete = on_complete
+        self.pending = 0
+        self.page = 1
+        self.articles = 0
+        self.failures = 0
+        self.started_at = time.monotonic()
+        # Paginação em paralelo: total de páginas da busca, próxima a pedir, páginas em andamento e se já acabou
+        self.total_pages = None
+        self.next_page = 2
+        self.pages_in_flight = 0
+        self.exhausted = False
+        # Páginas da busca em que todas as URLs já eram conhecidas (modo incremental)
+        self.known_pages = set()
+
+    def record_page(self, page, links, seen, stop_after):
+        """
+        Registra o resultado de uma página da busca. A paginação acaba na primeira página vazia ou, com
+        stop_after > 0, depois de stop_after páginas consecutivas só com URLs já vistas (a busca é ordenada
+        por data: dali para trás o resto já foi coletado). Páginas pedidas em paralelo chegam fora de ordem,
+        então a sequência é contada pelos números das páginas.
+        """
+        if not links:
+            self.exhausted = True
+            return
+        if not stop_after or len(seen) < len(links):
+            return
+        self.known_pages.add(page)
+        first = last = page
+        while first - 1 in self.known_pages:
+            first -= 1
+        while last + 1 in self.known_pages:
+            last += 1
+        if last - first + 1 >= stop_after:
+            self.exhausted = True
+
+    def describe(self):
+        return (f"{self.page} páginas de busca, {self.articles} notícias, {self.failures} falhas, "
+                f"{time.monotonic() - self.started_at:.0f}s")
+
 
 class BaseSpider(scrapy.Spider):
     name = 'base_spider'
@@ -22,6 +74,10 @@ class BaseSpider(scrapy.Spider):
     search_url_template = ''
     search_results_selector = ''
     next_page_selector = ''
+    # Paginação em paralelo: URL da página N da busca ({keyword}, {page}) e seletor dos números das páginas.
+    # Sem eles (ou sem o total de páginas na primeira), a busca segue o next_page_selector uma página por vez.
+    paged_search_url_template = ''
+    page_count_selector = ''
     article_title_selector = ''
     article_date_selector = ''
     article_author_selector = ''
@@ -29,82 +85,166 @@ class BaseSpider(scrapy.Spider):
     article_newspaper_selector = ''
     payed_articles_selector = ''
 
+    # Callbacks cujas respostas são baixadas por HTTP simples primeiro (StaticFirstMiddleware):
+    # o Playwright só entra se article_content_selector vier vazio.
+    static_first_callbacks = ('parse_item',)
+
+    # Ativado pelo ClassificationPipeline quando a validação roda fora do reator.
+    deferred_classification = False
+
     @classmethod
     def from_crawler(cls, crawler, *args, **kwargs):
         spider = cls(crawler.settings, *args, **kwargs)
         spider._set_crawler(crawler)
+        # Enquanto a fronteira tiver requisições das palavras ativas, o spider não fecha
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
         return spider
     
+    @classmethod
+    def shared_seen_url_sources(cls, settings, mongo_configs, kwargs):
+        """
+        Coleções (nome, filtro) do histórico de URLs para o índice compartilhado do executor conjunto (run_spiders.py).
+        Sem o filtro por jornal: as URLs de outros sites nunca aparecem nas buscas deste, então um índice só serve
+        a todos os spiders do processo. None = o DuplicateFilterMiddleware carrega o próprio (modo 'json' ou 'bloom').
+        """
+        if settings.get('OUTPUT_MODE', 'json') != 'database' or settings.get('SEEN_URLS_MODE', 'index') == 'bloom':
+            return None
+        return [('visitedUrls', {})]
+
     @property
     def checkpoint_filename(self):
         """Gera um nome de arquivo único para cada spider (ex: completed_keywords_spidername.yaml)."""
         return f"completed_keywords_{self.name}.yaml"
 
+    @property
+    def checkpoint_journal_filename(self):
+        """
+        Diário de checkpoints do spider (ex: completed_keywords_spidername.journal). O YAML só é lido na migração.
+        Com -a worker=N (vários processos na mesma máquina), cada processo tem o seu.
+        """
+        return worker_path(f"completed_keywords_{self.name}.journal", getattr(self, 'worker', None))
+
     def __init__(self, settings, keyword=None, continue_scraping=False, *args, **kwargs):
         super(BaseSpider, self).__init__(*args, **kwargs)
         self.settings = settings
         self.continue_scraping = continue_scraping
-        self.outstanding_requests = 0
+        # Palavras-chave em andamento ao mesmo tempo (cada uma com o seu contador de pendentes)
+        self.keyword_concurrency = max(1, settings.getint('KEYWORD_CONCURRENCY', 1))
+        # Páginas da busca pedidas ao mesmo tempo por palavra-chave
+        self.search_page_fanout = max(1, settings.getint('SEARCH_PAGE_FANOUT', 1))
+        # Modo incremental: páginas seguidas só com URLs conhecidas até parar a busca da palavra (0 = percorre tudo)
+        self.incremental_stop_pages = max(0, settings.getint('INCREMENTAL_STOP_PAGES', 0))
+        # Filtro de URLs visitadas (o DuplicateFilterMiddleware o atribui ao abrir o spider)
+        self.seen_urls = None
+        self.active_keywords = {}
         self.keyword_index = 0
-        self.current_keyword = None
-        self.stop_url = None
-        self.stop_keyword = None
         self.keyword_manager = None
         self.search_keywords = None
         self.validation_keywords = None
         self.user_keyword = keyword
+        # Checkpoints só de acréscimo: palavras-chave concluídas e páginas da busca já processadas
+        self.checkpoints = CheckpointJournal.open(self.checkpoint_journal_filename, legacy_path=self.checkpoint_filename)
+        # Fronteira em disco: toda requisição de busca/notícia passa por ela e só FRONTIER_MAX_IN_FLIGHT ficam no Scrapy
+        self.frontier = RequestFrontier.open(worker_path(settings.get('FRONTIER_FILE', 'frontier_{}.sqlite3').format(self.name),
+                                                         getattr(self, 'worker', None)))
+        self.frontier_max_in_flight = max(1, settings.getint('FRONTIER_MAX_IN_FLIGHT', 32))
+        # Fila de trabalho compartilhada (WORK_QUEUE): palavra-chave reservada -> unidade da fila
+        self.work_queue = None
+        self.work_queue_mongo = None
+        self.work_units = {}
         
         self.initialize_keywords()
 
     # -------------------------------------------------------------------------
-    # MÉTODOS DE CHECKPOINT (YAML)
+    # MÉTODOS DE CHECKPOINT (DIÁRIO)
     # -------------------------------------------------------------------------
     def get_ignored_keywords(self):
-        """Lê o arquivo YAML e retorna um CONJUNTO (set) de palavras para performance."""
-        filename = self.checkpoint_filename
-        
-        if not os.path.exists(filename):
-            return set()
-        
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                return set(data) if isinstance(data, list) else set()
-        except Exception as e:
-            self.logger.error(f"⚠️ Erro ao ler checkpoint YAML ({filename}): {e}")
-            return set()
+        """Retorna um CONJUNTO (set) com as palavras já concluídas (diário + YAML antigo)."""
+        return self.checkpoints.completed_keywords()
 
     def mark_as_done(self, keyword):
-        """Salva a palavra no arquivo YAML de forma segura."""
+        """Acrescenta a palavra ao diário de checkpoints (uma linha com fsync, sem regravar o arquivo)."""
         if not keyword: return
 
-        filename = self.checkpoint_filename
-        
-        # 1. Carrega a lista atual (lê como set para evitar duplicatas, converte para lista para salvar)
-        current_set = self.get_ignored_keywords()
-        
-        if keyword not in current_set:
-            current_list = list(current_set) # YAML precisa de lista
-            current_list.append(keyword)
-            
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    # Salva em formato de lista bonita (- item)
-                    yaml.dump(current_list, f, allow_unicode=True, default_flow_style=False)
-                self.logger.info(f"💾 Checkpoint YAML: '{keyword}' salvo em {filename}")
-            except Exception as e:
-                self.logger.error(f"❌ Erro ao salvar YAML: {e}")
+        try:
+            if self.checkpoints.add('keyword', keyword):
+                self.logger.info(f"💾 Checkpoint: '{keyword}' salvo em {self.checkpoint_journal_filename}")
+        except OSError as e:
+            self.logger.error(f"❌ Erro ao salvar checkpoint: {e}")
+
+        unit = self.work_units.pop(keyword, None)
+        if unit is not None:
+            self.work_queue.complete(unit.id)
+
+    def closed(self, reason):
+        """Compacta e fecha o diário de checkpoints, fecha a fronteira e devolve à fila o que não terminou."""
+        self.checkpoints.close()
+        self.logger.info(f"🧭 Fronteira no encerramento: {self.frontier.describe()}")
+        self.frontier.close()
+        if self.work_queue:
+            if getattr(self, 'heartbeat_loop', None) and self.heartbeat_loop.running:
+                self.heartbeat_loop.stop()
+            self.work_queue.release_all()
+            self.logger.info(f"🤝 Fila de trabalho no encerramento: {self.work_queue.describe()}")
+            self.work_queue.close()
+            if self.work_queue_mongo:
+                self.work_queue_mongo.release()
+
+    # -------------------------------------------------------------------------
+    # FILA DE TRABALHO (VÁRIOS PROCESSOS/MÁQUINAS)
+    # -------------------------------------------------------------------------
+    def open_work_queue(self, mode):
+        """Abre a fila de trabalho do spider ('mongo' ou 'sqlite'); ver work_queue.py."""
+        lease = self.settings.getint('WORK_QUEUE_LEASE', 300)
+        if mode == 'sqlite':
+            return SqliteWorkQueue(self.settings.get('WORK_QUEUE_FILE', 'work_queue.sqlite3'), self.name, lease_seconds=lease)
+
+        with open('config.yaml', 'r') as configs_file:
+            configs = yaml.safe_load(configs_file)
+        mongo_configs = configs['mongodb_lamcad']
+        self.work_queue_mongo = acquire_mongo_client(configs['lamcad'], mongo_configs['uri'])
+        collection = self.work_queue_mongo.client[mongo_configs['database']][self.settings.get('WORK_QUEUE_COLLECTION', 'workQueue')]
+        return MongoWorkQueue(collection, self.name, lease_seconds=lease)
+
+    def next_keyword(self):
+        """
+        Próxima palavra-chave a iniciar (None se acabaram): da lista deste processo ou, com WORK_QUEUE, reservada
+        na fila compartilhada. Palavras já concluídas no diário local são dadas como feitas na fila.
+        """
+        if self.work_queue is None:
+            if self.keyword_index >= len(self.search_keywords):
+                return None
+            self.keyword_index += 1
+            return self.search_keywords[self.keyword_index - 1]
+
+        while True:
+            unit = self.work_queue.claim()
+            if unit is None:
+                return None
+            if unit.keyword in self.get_ignored_keywords():
+                self.work_queue.complete(unit.id)
+                continue
+            self.work_units[unit.keyword] = unit
+            return unit.keyword
+
+    def work_heartbeat(self):
+        """Renova os leases das palavras reservadas (a cada WORK_QUEUE_HEARTBEAT segundos)."""
+        try:
+            lost = self.work_queue.heartbeat()
+        except Exception as e:
+            self.logger.error(f"⚠️ Erro ao renovar os leases da fila de trabalho: {e}")
+            return
+        for unit in lost:
+            self.work_units.pop(unit.keyword, None)
+            self.logger.warning(f"⚠️ {unit.keyword}: lease perdido (outro processo reservou a palavra-chave).")
 
     def initialize_keywords(self):
         # --- GARANTIA DE INICIALIZAÇÃO DO MANAGER ---
         if self.keyword_manager is None:
+            # A retomada vem do diário de checkpoints (palavras concluídas + requisições que ficaram na fila)
             if self.continue_scraping:
-                self.logger.info("Tentando recuperar estado anterior...")
-                self.stop_url = self.get_last_url()
-                keyword_atual = self.extract_keyword_from_url(self.stop_url) if self.stop_url else None
-                self.keyword_manager = KeywordManager(self.user_keyword, self.continue_scraping, keyword_atual)
-            else:
-                self.keyword_manager = KeywordManager(keyword=self.user_keyword)
+                self.logger.info(f"Retomando estado anterior: {self.frontier.describe()}.")
+            self.keyword_manager = KeywordManager(keyword=self.user_keyword)
 
         # 1. Carrega TODAS as palavras
         full_list = self.keyword_manager.get_search_keywords()
@@ -141,63 +281,212 @@ class BaseSpider(scrapy.Spider):
              self.logger.info(f"⏭️ Pulando {skipped} palavras já concluídas (Checkpoint YAML).")
         
         self.logger.info(f"🚀 Total a executar agora: {len(self.search_keywords)}")
+
+        # 4. Fila de trabalho: o recorte é semeado na fila e cada processo reserva as palavras conforme termina as suas
+        mode = self.settings.get('WORK_QUEUE')
+        if mode:
+            self.work_queue = self.open_work_queue(mode)
+            self.work_queue.seed((keyword, '', '', 0) for keyword in self.search_keywords)
+            self.logger.info(f"🤝 Fila de trabalho '{self.name}' ({mode}): {self.work_queue.describe()}")
         
         
     def start_requests(self):
-        yield from self.process_next_keyword()
-
-    def process_next_keyword(self):
-        if self.keyword_index < len(self.search_keywords):
-            self.current_keyword = self.search_keywords[self.keyword_index]
-            self.keyword_index += 1
-            if self.stop_url:
-                search_url = self.stop_url
-                self.logger.info(f"Iniciando busca a partir da url: {self.stop_url}")
-                self.stop_url = None 
+        if self.work_queue:
+            self.heartbeat_loop = task.LoopingCall(self.work_heartbeat)
+            self.heartbeat_loop.start(self.settings.getint('WORK_QUEUE_HEARTBEAT', 60), now=False)
+        yield from self.start_next_keywords()
+        yield from self.feed_frontier()
+
+    def start_next_keywords(self):
+        """Inicia as próximas palavras-chave até KEYWORD_CONCURRENCY em andamento ao mesmo tempo."""
+        while len(self.active_keywords) < self.keyword_concurrency:
+            keyword = self.next_keyword()
+            if keyword is None:
+                break
+            pending = self.frontier.count(keyword)
+            if not pending and self.checkpoints.units_of('page', keyword):
+                # Todas as páginas e notícias já tinham terminado: faltou só o checkpoint da palavra
+                self.mark_as_done(keyword)
+                continue
+            state = KeywordState(keyword, on_complete=self.keyword_finished)
+            self.active_keywords[keyword] = state
+            if pending:
+                self.resume_keyword(state, pending)
             else:
-                search_url = self.construct_search_url(self.current_keyword)
-                self.logger.info(f"Iniciando busca para a palavra-chave: {self.current_keyword}")
-            self.outstanding_requests = 1
-            yield scrapy.Request(url=search_url, callback=self.parse_search_results)
-        else:
+                self.start_keyword(state)
+            yield from self.feed_frontier()
+
+        if not self.active_keywords:
             self.logger.info("🏁 Todas as palavras-chave foram processadas.")
 
+    def start_keyword(self, state):
+        """Coloca na fronteira a primeira página de busca da palavra-chave."""
+        search_url = self.construct_search_url(state.keyword)
+        self.logger.info(f"Iniciando busca para a palavra-chave: {state.keyword}")
+        self.enqueue(state, search_url, self.parse_search_results, meta={'search_page': 1})
+
+    def resume_keyword(self, state, pending):
+        """As requisições que ficaram na fronteira (páginas da busca e notícias) voltam a contar como pendentes."""
+        done_pages = self.checkpoints.units_of('page', state.keyword)
+        state.pending = pending
+        # A paginação em paralelo continua depois da maior página já processada (as da fronteira não se repetem)
+        state.page = max((detail[0] for detail in done_pages), default=1)
+        state.next_page = state.page + 1
+        self.logger.info(f"♻️ Retomando {state.keyword}: {pending} requisições na fronteira, "
+                         f"{len(done_pages)} páginas de busca já processadas")
+
+    def enqueue(self, state, url, callback, errback=None, meta=None, priority=0):
+        """
+        Coloca uma requisição da palavra-chave na fronteira e a conta como pendente (a mesma URL não entra duas
+        vezes). Ela vai para o Scrapy em feed_frontier e sai da fronteira em request_done.
+        Retorna False se a requisição já estava na fronteira.
+        """
+        if not self.frontier.push(state.keyword, url, callback.__name__, meta=meta,
+                                  errback=errback.__name__ if errback else None, priority=priority):
+            return False
+        state.pending += 1
+        return True
+
+    def feed_frontier(self):
+        """Entrega ao Scrapy as requisições das palavras ativas que cabem em FRONTIER_MAX_IN_FLIGHT."""
+        for entry in self.frontier.pop(self.frontier_max_in_flight - self.frontier.leased, keywords=self.active_keywords):
+            yield self.frontier_request(entry)
+
+    def frontier_request(self, entry):
+        """Monta a requisição de uma linha da fronteira (a palavra vai em meta['keyword']; quem deduplica é a fronteira)."""
+        meta = dict(entry.meta, keyword=entry.keyword, frontier_id=entry.id)
+        errback = getattr(self, entry.errback) if entry.errback else self.handle_failure
+        return scrapy.Request(url=entry.url, callback=getattr(self, entry.callback), errback=errback, meta=meta,
+                              priority=entry.priority, dont_filter=True)
+
+    def spider_idle(self):
+        """Sem requisições no Scrapy: busca mais na fronteira antes de deixar o spider fechar."""
+        requests = list(self.feed_frontier())
+        for request in requests:
+            self.crawler.engine.crawl(request)
+        if requests:
+            raise DontCloseSpider
+
+    def keyword_state(self, meta):
+        return self.active_keywords.get(meta.get('keyword'))
+
+    def request_done(self, meta, failed=False):
+        """
+        Desconta uma requisição da palavra-chave do meta. Se era a última pendente, a palavra é concluída
+        (checkpoint próprio, sem esperar as outras) e as próximas palavras entram no lugar dela.
+        """
+        if 'frontier_id' in meta:
+            self.frontier.done(meta['frontier_id'])
+        state = self.keyword_state(meta)
+        if state is not None:
+            state.pending -= 1
+            if failed:
+                state.failures += 1
+            if state.pending <= 0:
+                del self.active_keywords[state.keyword]
+                state.on_complete(state)
+                yield from self.start_next_keywords()
+        # O lugar desta requisição passa para a próxima da fronteira
+        yield from self.feed_frontier()
+
+    def keyword_finished(self, state):
+        """Chamado quando todas as requisições da palavra-chave terminaram: grava o checkpoint dela."""
+        self.logger.info(f"🎉 Extração finalizada com sucesso para: {state.keyword} ({state.describe()})")
+        self.mark_as_done(state.keyword)
+
     def construct_search_url(self, keyword):
         return self.search_url_template.format(keyword=keyword.replace(' ', '+'))
 
-    def parse_search_results(self, response):
+    def construct_page_url(self, keyword, page):
+        return self.paged_search_url_template.format(keyword=keyword.replace(' ', '+'), page=page)
+
+    def search_page_count(self, response):
+        """Total de páginas da busca: o maior número entre os links da paginação (None se não houver)."""
+        if not (self.page_count_selector and self.paged_search_url_template):
+            return None
+        numbers = [int(text.strip()) for text in response.xpath(self.page_count_selector).getall()
+                   if text.strip().isdigit()]
+        return max(numbers, default=None)
+
+    def search_page_known(self, state, url, page):
+        """Se a página da busca já está na fronteira ou já foi processada (diário)."""
+        return self.frontier.contains(state.keyword, url) or ('page', state.keyword, page) in self.checkpoints
+
+    async def record_search_page(self, state, page, links):
+        """
+        Confere quais links da página já eram conhecidos antes desta execução e atualiza a palavra-chave. As URLs
+        coletadas nesta execução (por outra palavra-chave, por exemplo) não contam: as páginas mais antigas da
+        busca ainda não foram percorridas para esta palavra.
+        """
+        seen = await self.seen_urls.filter_seen_before_run(links) if self.seen_urls is not None and links else set()
+        was_exhausted = state.exhausted
+        state.record_page(page, links, seen, self.incremental_stop_pages)
+        try:
+            self.checkpoints.add('page', state.keyword, page)
+        except OSError as e:
+            self.logger.error(f"❌ Erro ao salvar checkpoint da página: {e}")
+        if state.exhausted and not was_exhausted:
+            reason = "página vazia" if not links else f"{self.incremental_stop_pages} página(s) seguida(s) só com URLs conhecidas"
+            self.logger.info(f"⏹️ {state.keyword}: fim da paginação na página {page} ({reason})")
+            self.crawler.stats.inc_value('search/incremental_stops' if links else 'search/empty_stops')
+
+    def prefetch_search_pages(self, state):
+        """Coloca na fronteira as próximas páginas da busca até SEARCH_PAGE_FANOUT em andamento (enquanto a busca não acabou)."""
+        while (not state.exhausted and state.next_page <= state.total_pages
+               and state.pages_in_flight < self.search_page_fanout):
+            page = state.next_page
+            state.next_page += 1
+            state.page = max(state.page, page)
+            # Página que já estava na fronteira (retomada) não ocupa um lugar a mais
+            if self.enqueue(state, self.construct_page_url(state.keyword, page), self.parse_search_results,
+                            meta={'search_page': page, 'prefetched': True}):
+                state.pages_in_flight += 1
+
+    async def parse_search_results(self, response):
         if response.status == 400:
             self.logger.info(f"Não foi possível acessar a página de pesquisa {response.url}")
 
-        article_links = response.xpath(self.search_results_selector).getall()
+        state = self.keyword_state(response.meta)
+        if state is None:
+            return
+        if response.meta.get('prefetched'):
+            state.pages_in_flight = max(0, state.pages_in_flight - 1)
+
+        article_links = [response.urljoin(link) for link in response.xpath(self.search_results_selector).getall()]
+        state.articles += len(article_links)
+        # As notícias saem da fronteira antes das próximas páginas da busca (prioridade maior)
         for link in article_links:
-            full_link = response.urljoin(link)
-            self.outstanding_requests += 1
-        
-            yield scrapy.Request(
-                url=full_link, 
-                callback=self.parse_item, 
-                errback=self.handle_failure,
-                dont_filter=True  # <--- ADICIONE ISSO (Obrigatório)
-        )
-            
-        next_page = response.xpath(self.next_page_selector).get()
-        if next_page:
-            self.outstanding_requests += 1
-            yield scrapy.Request(url=response.urljoin(next_page), callback=self.parse_search_results)
+            self.enqueue(state, link, self.parse_item, priority=1)
+
+        # Página vazia ou K páginas seguidas só com URLs já vistas: as próximas (mais antigas) não são mais pedidas
+        await self.record_search_page(state, response.meta.get('search_page', state.page), article_links)
 
-        self.outstanding_requests -= 1
-        if self.outstanding_requests == 0:
-            yield from self.check_and_advance()
+        # Na primeira página (ou na primeira que chegar depois de uma retomada)
+        if state.total_pages is None:
+            state.total_pages = self.search_page_count(response)
+            if state.total_pages:
+                self.logger.info(f"📑 {state.keyword}: {state.total_pages} páginas de busca, "
+                                 f"{self.search_page_fanout} pedidas por vez")
+
+        if state.total_pages:
+            self.prefetch_search_pages(state)
+        else:
+            next_page = response.xpath(self.next_page_selector).get()
+            page = response.meta.get('search_page', state.page) + 1
+            # Depois de uma retomada, a próxima página pode já estar na fila ou processada (diário)
+            if next_page and not state.exhausted and not self.search_page_known(state, response.urljoin(next_page), page):
+                state.page = max(state.page, page)
+                self.enqueue(state, response.urljoin(next_page), self.parse_search_results, meta={'search_page': page})
+
+        for request in self.request_done(response.meta):
+            yield request
 
     def parse_item(self, response):
         # Verifica se o artigo é pago
         is_paid = response.xpath(self.payed_articles_selector).get()
         if is_paid:
             self.logger.info(f"Artigo pago detectado: {response.url}. Ignorando.")
-            self.outstanding_requests -= 1
-            if self.outstanding_requests == 0:
-                yield from self.check_and_advance()
+            yield from self.request_done(response.meta)
             return 
             
         self.logger.info(f"Extraindo notícia do link: {response.url}")
@@ -224,91 +513,45 @@ class BaseSpider(scrapy.Spider):
         item['author'] = response.xpath(self.article_author_selector).get()
         item['newspaper'] = self.article_newspaper_selector
         item['article'] = ' '.join(response.xpath(self.article_content_selector).getall()).strip()
-        item['keyword'] = self.current_keyword
+        item['keyword'] = response.meta.get('keyword')
+
+        # Com o ClassificationPipeline ativo, a validação é feita por ele, fora da thread do reator.
+        if self.deferred_classification:
+            yield item
+        else:
+            # O texto normalizado fica em cache (normalized_text), então as duas validações abaixo o reaproveitam
+            gangs_found = self.keyword_manager.search_gangs(item)
+            accepted_keyword = self.keyword_manager.accept_article(item)
+            yield self.apply_classification(item, accepted_keyword, gangs_found)
+
+        yield from self.request_done(response.meta)
 
-        gangs_found = self.keyword_manager.search_gangs(item)
+    def apply_classification(self, item, accepted_keyword, gangs_found):
+        """Preenche 'accepted_by' e 'gangs' com o resultado da validação (chamado aqui ou pelo ClassificationPipeline)."""
         if gangs_found:
             item['gangs'] = gangs_found 
 
-    
-        accepted_keyword = self.keyword_manager.accept_article(item)
         if accepted_keyword:
             item['accepted_by'] = accepted_keyword
-            item['gangs'] = self.keyword_manager.search_gangs(item)
-            yield item
+            item['gangs'] = gangs_found
         else:
             self.logger.info(f"Artigo ignorado: não contém palavras-chave de validação - {item['url']}")
             item['accepted_by'] = None
-            yield item
-
-        self.outstanding_requests -= 1
-        if self.outstanding_requests == 0:
-            yield from self.check_and_advance()
+        return item
 
     def handle_failure(self, failure):
         """
         Chamado quando ocorre um erro na requisição (404, DNS, Timeout)
         OU quando o Middleware ignora a requisição (IgnoreRequest).
         """
-        self.outstanding_requests -= 1
-        if self.outstanding_requests == 0:
-            yield from self.check_and_advance()
-
-    def check_and_advance(self):
-        """
-        Finaliza a palavra atual e avança.
-        Nota: Não decrementa requests aqui, pois o caller já deve ter feito e verificado se é 0.
-        """
-        # Garante que não ficou negativo
-        if self.outstanding_requests < 0:
-            self.outstanding_requests = 0
-
-        # Salva a palavra atual no YAML
-        if self.current_keyword:
-            self.logger.info(f"🎉 Extração finalizada com sucesso para: {self.current_keyword}")
-            self.mark_as_done(self.current_keyword)
-        
-        # Reseta e chama a próxima
-        self.outstanding_requests = 0 
-        yield from self.process_next_keyword()
+        state = self.keyword_state(failure.request.meta)
+        if state is not None and failure.request.meta.get('prefetched'):
+            # Página da busca que falhou: libera o lugar dela para a próxima
+            state.pages_in_flight = max(0, state.pages_in_flight - 1)
+            self.prefetch_search_pages(state)
+        yield from self.request_done(failure.request.meta, failed=True)
         
     
-    def get_last_url(self):
-        if not self.allowed_domains:
-            self.logger.error("allowed_domains está vazio. Não é possível determinar o domínio.")
-            return None
-
-        domain = self.allowed_domains[0]
-        
-        if self.settings.get('OUTPUT_MODE') == 'database':
-            self.logger.info("Buscando última URL no banco de dados")
-            client = MongoClient(self.settings.get('MONGO_URI'))
-            try:
-                db = client[self.settings.get('MONGO_DATABASE')]
-                entries = db['visitedUrls'].find({'url': {'$regex': f'.*busca\\?q={self.user_keyword.replace(" ", "+")}.*page=\\d+.*'}})
-                urls = [entry['url'] for entry in entries]
-
-                if not urls:
-                    self.logger.warning(f"Nenhuma URL encontrada contendo a palavra-chave '{self.user_keyword}'.")
-                    return None
-
-                max_page_url = self._get_max_page_url(urls)
-                self.logger.info(f"Última URL encontrada: {max_page_url}")
-                return max_page_url
-            finally:
-                client.close()
-
-        self.logger.warning("A saída configurada não é 'database'. Nenhuma URL será buscada.")
-        return None
-
-    def _get_max_page_url(self, urls):
-        max_page_url = max(
-            urls,
-            key=lambda url: int(re.search(r'[?&]page=(\d+)', url).group(1)) if re.search(r'[?&]page=(\d+)', url) else 0,
-            default=None
-        )
-        return max_page_url
-        
     def extract_keyword_from_url(self, url):
         if not url:
             self.logger.error("URL inválida fornecida para extração de palavra-chave.")
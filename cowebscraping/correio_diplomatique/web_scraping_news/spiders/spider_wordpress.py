@@ -1,6 +1,8 @@
 import scrapy
 import re
 from .base_spider import BaseSpider
+from crawler_common.page_pool import PagePool
+from crawler_common.route_policy import RoutePolicy
 
 class SpiderDiplomatique(BaseSpider):
     """
@@ -12,6 +14,9 @@ class SpiderDiplomatique(BaseSpider):
     search_url_template = 'https://diplomatique.org.br/page/1/?s={keyword}&orderby=date&order=DESC'
     search_results_selector = '//h3/a/@href | //h2/a/@href'
     next_page_selector = '//a[@class="number nextp"]/@href'
+    # A primeira página mostra os números das páginas: as seguintes são pedidas em paralelo (SEARCH_PAGE_FANOUT)
+    paged_search_url_template = 'https://diplomatique.org.br/page/{page}/?s={keyword}&orderby=date&order=DESC'
+    page_count_selector = '//a[contains(@class, "number")]/text()'
     
     article_title_selector = '//h1[contains(@class, "post-title")]/a/text()'
     article_date_selector = '//time[contains(@class, "entry-date")]/@datetime | //time[contains(@class, "datapublicacao")]/@datetime'
@@ -32,6 +37,14 @@ class SpiderCorreioDoPovo(BaseSpider):
     name = 'correio_do_povo_news'
     allowed_domains = ['correiodopovo.com.br']
 
+    # Bloqueio das requisições da página de busca: mídia, fontes, anúncios/analytics, pixels e iframes.
+    # Os links são lidos do DOM, então CSS e scripts de terceiros (CDN do site) continuam liberados.
+    route_policy = RoutePolicy(block_third_party=False)
+    custom_settings = {
+        **BaseSpider.custom_settings,
+        'PLAYWRIGHT_ABORT_REQUEST': route_policy,
+    }
+
     search_url_template = 'https://www.correiodopovo.com.br/busca?q={keyword}&page={page_number}&sort=date'
     
     # Seletor visual do botão "Próximo" (usado apenas para verificar se existe mais páginas)
@@ -50,152 +63,147 @@ class SpiderCorreioDoPovo(BaseSpider):
     # Exemplo: noticia-titulo-1.54897
     news_pattern = re.compile(r'-\d+\.\d+$') 
 
-    def process_next_keyword(self):
-        if self.keyword_index < len(self.search_keywords):
-            self.current_keyword = self.search_keywords[self.keyword_index]
-            self.keyword_index += 1
-            
-            # Começa sempre na página 1 para a nova palavra-chave
-            search_url = self.search_url_template.format(
-                keyword=self.current_keyword.replace(' ', '+'), 
-                page_number=1
-            )
-            
-            self.logger.info(f"Iniciando busca com a palavra-chave: {self.current_keyword}")
-            self.outstanding_requests = 1
-            
-            yield scrapy.Request(
-                url=search_url, 
-                callback=self.parse_search_results,
-                meta={
-                    'playwright': True,
-                    'playwright_include_page': True,
-                    'errback': self.errback_close_page,
-                }
-            )
-        else:
-            self.logger.info("🏁 Todas as palavras-chave foram processadas.")
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        # Abas do navegador reaproveitadas entre as páginas de busca (ver page_pool.py)
+        spider.pages = PagePool(
+            max_navigations=crawler.settings.getint('PAGE_POOL_MAX_NAVIGATIONS', 50),
+            max_heap_mb=crawler.settings.getint('PAGE_POOL_MAX_HEAP_MB', 256),
+            context_max_pages=crawler.settings.getint('PAGE_POOL_CONTEXT_MAX_PAGES', 10),
+            stats=crawler.stats, logger=spider.logger,
+        )
+        return spider
+
+    def closed(self, reason):
+        """Grava nas stats os contadores de requisições bloqueadas/liberadas por domínio."""
+        self.route_policy.report(self.crawler.stats, self.logger)
+        super().closed(reason)
+
+    def search_request(self, state, page_number):
+        """Coloca uma página da busca na fronteira (pelo navegador)."""
+        search_url = self.search_url_template.format(
+            keyword=state.keyword.replace(' ', '+'),
+            page_number=page_number
+        )
+        state.page = page_number
+        self.enqueue(
+            state, search_url, self.parse_search_results,
+            errback=self.errback_close_page,
+            meta={'playwright': True, 'search_page': page_number},
+        )
+
+    def frontier_request(self, entry):
+        """Páginas da busca saem da fronteira com uma aba do pool (se houver uma livre)."""
+        request = super().frontier_request(entry)
+        if request.meta.get('playwright'):
+            self.pages.borrow(request.meta)
+        return request
+
+    def start_keyword(self, state):
+        self.logger.info(f"Iniciando busca com a palavra-chave: {state.keyword}")
+        # Começa sempre na página 1 para a nova palavra-chave
+        self.search_request(state, 1)
 
     async def parse_search_results(self, response):
-        page = response.meta.get("playwright_page")
-        try:
-            self.logger.info(f"Processando página de busca: {response.url}")
-            
-            # 1. Rola a página para baixo (Trigger de Lazy Load)
+        # As requisições só saem da fronteira (request_done) depois que a aba voltou ao pool:
+        # assim a próxima página da busca já pode reaproveitá-la.
+        next_page_number = None
+        state = self.keyword_state(response.meta)
+        async with self.pages.lease(response.meta) as page:
             try:
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                # Espera curta para garantir carregamento de elementos
-                await page.wait_for_timeout(3000) 
-            except:
-                pass
-
-            # 2. Extração via JS "Bala de Canhão"
-            # Pega TODOS os links da página diretamente do navegador
-            hrefs = await page.evaluate("""() => {
-                return Array.from(document.querySelectorAll('a')).map(a => a.href).filter(h => h);
-            }""")
-
-            self.logger.info(f"O navegador viu {len(hrefs)} links totais.")
-
-            # 3. Filtragem Inteligente (Python)
-            article_links = []
-            for link in hrefs:
-                # Remove lixo básico
-                if not link or 'javascript:' in link or 'mailto:' in link or 'whatsapp:' in link:
-                    continue
+                self.logger.info(f"Processando página de busca: {response.url}")
+            
+                # 1. Rola a página para baixo (Trigger de Lazy Load)
+                try:
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    # Espera curta para garantir carregamento de elementos
+                    await page.wait_for_timeout(3000) 
+                except:
+                    pass
+
+                # 2. Extração via JS "Bala de Canhão"
+                # Pega TODOS os links da página diretamente do navegador
+                hrefs = await page.evaluate("""() => {
+                    return Array.from(document.querySelectorAll('a')).map(a => a.href).filter(h => h);
+                }""")
+
+                self.logger.info(f"O navegador viu {len(hrefs)} links totais.")
+
+                # 3. Filtragem Inteligente (Python)
+                article_links = []
+                for link in hrefs:
+                    # Remove lixo básico
+                    if not link or 'javascript:' in link or 'mailto:' in link or 'whatsapp:' in link:
+                        continue
                 
-                # Garante URL absoluta
-                if not link.startswith('http'):
-                    link = "https://www.correiodopovo.com.br" + (link if link.startswith('/') else '/' + link)
-
-                # FILTRO DE OURO: Verifica se tem o padrão de ID de notícia
-                # Isso garante que só pegamos notícias e ignoramos menus/propagandas
-                if self.news_pattern.search(link):
-                    article_links.append(link)
+                    # Garante URL absoluta
+                    if not link.startswith('http'):
+                        link = "https://www.correiodopovo.com.br" + (link if link.startswith('/') else '/' + link)
+
+                    # FILTRO DE OURO: Verifica se tem o padrão de ID de notícia
+                    # Isso garante que só pegamos notícias e ignoramos menus/propagandas
+                    if self.news_pattern.search(link):
+                        article_links.append(link)
             
-            # Remove duplicatas
-            article_links = list(set(article_links))
-
-            if not article_links:
-                self.logger.warning("Nenhum link de notícia encontrado nesta página.")
-            else:
-                self.logger.info(f"SUCESSO! {len(article_links)} notícias identificadas para extração.")
-
-            # Dispara os requests para as notícias (Modo Estático = Mais Rápido)
-            for full_link in article_links:
-                self.outstanding_requests += 1
-                yield scrapy.Request(
-                    url=full_link, 
-                    callback=self.parse_item,
-                    errback=self.handle_failure, # <--- ADICIONE (Evita travar se der erro 404)
-                    dont_filter=True             # <--- ADICIONE (Evita travar se for duplicada)
-                )
-
-            # -----------------------------------------------------------
-            # 4. PAGINAÇÃO ROBUSTA (Cálculo Manual)
-            # -----------------------------------------------------------
+                # Remove duplicatas
+                article_links = list(set(article_links))
+
+                state.articles += len(article_links)
+                if not article_links:
+                    self.logger.warning("Nenhum link de notícia encontrado nesta página.")
+                else:
+                    self.logger.info(f"SUCESSO! {len(article_links)} notícias identificadas para extração.")
+
+                # Dispara os requests para as notícias (Modo Estático = Mais Rápido)
+                for full_link in article_links:
+                    self.enqueue(
+                        state, full_link, self.parse_item, priority=1,
+                        errback=self.handle_failure, # <--- ADICIONE (Evita travar se der erro 404)
+                    )
+
+                # -----------------------------------------------------------
+                # 4. PAGINAÇÃO ROBUSTA (Cálculo Manual)
+                # -----------------------------------------------------------
             
-            # Descobre a página atual pela URL
-            current_page_match = re.search(r'page=(\d+)', response.url)
-            current_page = int(current_page_match.group(1)) if current_page_match else 1
-            next_page_num = current_page + 1
+                # Descobre a página atual pela URL
+                current_page_match = re.search(r'page=(\d+)', response.url)
+                current_page = int(current_page_match.group(1)) if current_page_match else 1
+                next_page_num = current_page + 1
             
-            # Verifica visualmente se existe um botão "Próximo" ou ícone de seta
-            # Isso evita que o robô tente a página 1000 se ela não existe
-            content = await page.content()
-            selector = scrapy.Selector(text=content)
+                # Verifica visualmente se existe um botão "Próximo" ou ícone de seta
+                # Isso evita que o robô tente a página 1000 se ela não existe
+                content = await page.content()
+                selector = scrapy.Selector(text=content)
             
-            # Procura pelo botão next no HTML renderizado
-            has_next_button = selector.xpath(self.next_page_selector).get()
-
-            if has_next_button:
-                next_page_url = self.search_url_template.format(
-                    keyword=self.current_keyword.replace(' ', '+'), 
-                    page_number=next_page_num
-                )
-                
-                self.logger.info(f"Indo para a próxima página: {next_page_num}")
-                self.outstanding_requests += 1
-                
-                yield scrapy.Request(
-                    url=next_page_url, 
-                    callback=self.parse_search_results,
-                    meta={
-                        'playwright': True,
-                        'playwright_include_page': True,
-                        'errback': self.errback_close_page,
-                    }
-                )
-            else:
-                self.logger.info("Fim da paginação (Botão 'Next' não encontrado).")
-
-        except Exception as e:
-            self.logger.error(f"Erro crítico no Playwright: {e}")
-        
-        finally:
-            # Fecha a aba para liberar memória
-            if page:
-                try:
-                    await page.close()
-                except:
-                    pass
+                # Procura pelo botão next no HTML renderizado
+                has_next_button = selector.xpath(self.next_page_selector).get()
 
-        self.outstanding_requests -= 1
-        if self.outstanding_requests == 0:
-            # NÃO chame process_next_keyword diretamente.
-            # Use check_and_advance para garantir que salva no YAML e reseta o contador.
-            for req in self.check_and_advance():
-                yield req
+                # Modo incremental (busca ordenada por data): para depois de INCREMENTAL_STOP_PAGES páginas
+                # seguidas só com notícias já vistas
+                await self.record_search_page(state, current_page, article_links)
+
+                if has_next_button and not state.exhausted:
+                    self.logger.info(f"Indo para a próxima página: {next_page_num}")
+                    next_page_number = next_page_num
+                elif not has_next_button:
+                    self.logger.info("Fim da paginação (Botão 'Next' não encontrado).")
+
+            except Exception as e:
+                self.logger.error(f"Erro crítico no Playwright: {e}")
+                # Aba em estado desconhecido: descartada em vez de voltar ao pool
+                await self.pages.release(response.meta, failed=True)
+
+        if next_page_number:
+            self.search_request(state, next_page_number)
+
+        # Esta página da busca terminou: se era a última pendente, a palavra-chave é concluída (checkpoint)
+        for req in self.request_done(response.meta):
+            yield req
 
     async def errback_close_page(self, failure):
-        page = failure.request.meta.get("playwright_page")
-        if page:
-            try:
-                await page.close()
-            except:
-                pass
+        # Descarta a aba (se ela chegou a existir) e libera o lugar dela no pool
+        await self.pages.release(failure.request.meta, failed=True)
         self.logger.error(f"Falha na requisição Playwright: {failure}")
-        self.outstanding_requests -= 1
-        if self.outstanding_requests == 0:
-             for req in self.process_next_keyword():
-                yield req
+        for req in self.request_done(failure.request.meta, failed=True):
+            yield req
@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+
+from .seen_index import iter_new_urls, load_sync_marks, save_sync_marks
+
+# Cabeçalho do arquivo: assinatura, nº de bits, nº de funções de hash, itens inseridos e data de criação.
+BLOOM_MAGIC = b'SEENBLM1'
+BLOOM_HEADER = struct.Struct('<8sQQQd')
+
+# Confirmação no MongoDB: URLs por consulta e espera máxima (segundos) para juntar um lote.
+LOOKUP_BATCH_SIZE = 200
+LOOKUP_MAX_DELAY = 0.05
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom gravado em arquivo e aberto com mmap (leitura e escrita).
+
+    O tamanho depende só da capacidade e da taxa de falsos positivos escolhidas (ex: 10 milhões de URLs a 0,1%
+    ocupam ~17 MB), não do histórico real. Um 'não' é definitivo; um 'sim' pode ser falso positivo e precisa
+    ser confirmado no banco. Cada add() escreve direto nas páginas mapeadas, então o filtro em disco é
+    atualizado de forma incremental durante a execução; flush() só sincroniza o cabeçalho e as páginas sujas.
+    """
+    def __init__(self, mapped, num_bits, num_hashes, count, created_at):
+        self.mapped = mapped
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self.created_at = created_at
+        self.bits = memoryview(mapped)[BLOOM_HEADER.size:]
+
+    # Método que calcula o nº de bits e de funções de hash para a capacidade e a taxa de falsos positivos.
+    @staticmethod
+    def optimal_size(capacity, error_rate):
+        num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return num_bits, num_hashes
+
+    # Método que cria um filtro vazio no arquivo (substituindo o anterior de forma atômica).
+    @classmethod
+    def create(cls, path, capacity, error_rate):
+        num_bits, num_hashes = cls.optimal_size(capacity, error_rate)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, num_bits, num_hashes, 0, time.time()))
+            f.truncate(BLOOM_HEADER.size + (num_bits + 7) // 8)
+        os.replace(tmp_path, path)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'r+b') as f:
+            magic, num_bits, num_hashes, count, created_at = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+            if magic != BLOOM_MAGIC:
+                raise ValueError(f"Filtro de Bloom inválido: {path}")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE)
+        return cls(mapped, num_bits, num_hashes, count, created_at)
+
+    # Posições dos bits da URL: dois hashes de 64 bits combinados (double hashing).
+    def positions(self, url):
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, url):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self.positions(url))
+
+    # Método que insere a URL. Retorna True se ela ainda não estava no filtro.
+    def add(self, url):
+        bits = self.bits
+        added = False
+        for p in self.positions(url):
+            mask = 1 << (p & 7)
+            if not bits[p >> 3] & mask:
+                bits[p >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    # Taxa de falsos positivos estimada para a quantidade de itens já inseridos.
+    def estimated_error_rate(self):
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def age(self):
+        return time.time() - self.created_at
+
+    def flush(self):
+        self.mapped[:BLOOM_HEADER.size] = BLOOM_HEADER.pack(
+            BLOOM_MAGIC, self.num_bits, self.num_hashes, self.count, self.created_at)
+        self.mapped.flush()
+
+    def close(self):
+        if self.mapped is not None:
+            self.flush()
+            self.bits.release()
+            self.mapped.close()
+            self.mapped = None
+
+
+class BatchedUrlLookup:
+    """
+    Confirma no MongoDB, em lote, se URLs existem nas coleções informadas (consulta {'url': {'$in': [...]}}, que
+    usa o índice do campo url). Pedidos concorrentes são agrupados por até LOOKUP_MAX_DELAY segundos ou
+    LOOKUP_BATCH_SIZE URLs e a consulta roda numa thread, sem travar o loop do asyncio.
+    """
+    def __init__(self, collections, mongo=None, batch_size=LOOKUP_BATCH_SIZE, max_delay=LOOKUP_MAX_DELAY, logger=None):
+        self.collections = collections
+        # Empréstimo do pool de conexões, devolvido no close()
+        self.mongo = mongo
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.logger = logger
+        self.pending = {}
+        self.timer = None
+        self.queries = 0
+
+    # Método que devolve os nomes das coleções sem índice no campo url (a confirmação vira um scan da coleção).
+    # Só lê index_information(): o índice é criado uma vez, fora do crawler (ver README, "Módulos comuns").
+    def collections_without_url_index(self):
+        missing = []
+        for collection in self.collections:
+            keys = [index['key'][0][0] for index in collection.index_information().values()]
+            if 'url' not in keys:
+                missing.append(collection.name)
+        return missing
+
+    # Método que devolve o subconjunto das URLs que existem no banco.
+    async def find_existing(self, urls):
+        loop = asyncio.get_running_loop()
+        waiting = []
+        for url in urls:
+            future = self.pending.get(url)
+            if future is None:
+                future = self.pending[url] = loop.create_future()
+            waiting.append((url, future))
+
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_delay, self.flush)
+
+        found = await asyncio.gather(*(future for _, future in waiting))
+        return {url for (url, _), exists in zip(waiting, found) if exists}
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        self.queries += 1
+
+        loop = asyncio.get_running_loop()
+        query = loop.run_in_executor(None, self.query, list(batch))
+        query.add_done_callback(lambda done: self.resolve(batch, done))
+
+    def query(self, urls):
+        found = set()
+        for collection in self.collections:
+            remaining = [url for url in urls if url not in found]
+            if not remaining:
+                break
+            found.update(doc['url'] for doc in collection.find({'url': {'$in': remaining}}, {'url': 1, '_id': 0}))
+        return found
+
+    def resolve(self, batch, done):
+        if done.exception():
+            # Banco indisponível: a URL é tratada como nova (mesmo comportamento de quando o histórico não carrega)
+            if self.logger:
+                self.logger.error(f"⚠️ Falha ao confirmar {len(batch)} URLs no banco: {done.exception()}")
+            found = set()
+        else:
+            found = done.result()
+        for url, future in batch.items():
+            if not future.done():
+                future.set_result(url in found)
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.mongo:
+            self.mongo.release()
+            self.mongo = None
+
+
+class BloomSeenUrls:
+    """
+    Histórico de URLs no modo 'bloom': o filtro responde em memória constante e só os acertos vão ao banco.
+
+    Uma URL fora do filtro é nova sem consulta nenhuma; um acerto é confirmado pelo BatchedUrlLookup
+    (o que elimina os falsos positivos). URLs vistas nesta execução são adicionadas ao filtro em disco e
+    guardadas num set local, que responde sem consulta.
+    """
+    def __init__(self, bloom, lookup):
+        self.bloom = bloom
+        self.lookup = lookup
+        self.recent = set()
+        self.hits = 0
+        self.false_positives = 0
+
+    def add(self, url):
+        self.recent.add(url)
+        self.bloom.add(url)
+
+    def __len__(self):
+        return self.bloom.count
+
+    # Método que devolve o subconjunto das URLs já vistas (no banco ou nesta execução).
+    async def filter_seen(self, urls):
+        seen = {url for url in urls if url in self.recent}
+        candidates = [url for url in urls if url not in seen and url in self.bloom]
+        if candidates:
+            self.hits += len(candidates)
+            confirmed = await self.lookup.find_existing(candidates)
+            self.false_positives += len(candidates) - len(confirmed)
+            seen |= confirmed
+        return seen
+
+    async def contains(self, url):
+        return url in await self.filter_seen([url])
+
+    # Método que devolve só as URLs já vistas antes desta execução: as adicionadas nesta execução (que o pipeline
+    # também grava no banco) ficam de fora.
+    async def filter_seen_before_run(self, urls):
+        candidates = [url for url in urls if url not in self.recent]
+        return await self.filter_seen(candidates) if candidates else set()
+
+    def memory_footprint(self):
+        return {'urls': len(self), 'heap_bytes': 0, 'mapped_bytes': len(self.bloom.bits)}
+
+    def describe(self):
+        description = (f"filtro de Bloom com ~{len(self)} URLs em {len(self.bloom.bits) / 2**20:.1f} MB mapeados "
+                       f"(falsos positivos estimados: {self.bloom.estimated_error_rate():.3%})")
+        if self.hits:
+            description += (f"; {self.hits} acertos confirmados no banco em {self.lookup.queries} consultas, "
+                            f"{self.false_positives} falsos positivos")
+        return description
+
+    def close(self):
+        self.lookup.close()
+        self.bloom.close()
+
+
+# Método que abre o filtro salvo (se tiver no máximo max_age segundos) e incorpora só os documentos com _id acima
+# do high-water mark de cada fonte (nome, coleção, filtro); ou cria um novo com capacidade para
+# max(capacity, 2x o histórico atual) e o preenche com tudo. Retorna (filtro, veio_do_disco, documentos lidos).
+def load_bloom_filter(path, max_age, capacity, error_rate, count_documents, sources):
+    names = [name for name, _, _ in sources]
+    if os.path.exists(path):
+        try:
+            bloom = BloomFilter.open(path)
+            marks = load_sync_marks(path)
+            if (max_age <= 0 or bloom.age() <= max_age) and all(name in marks for name in names):
+                new_marks = {}
+                fetched = 0
+                for url in iter_new_urls(sources, marks, new_marks):
+                    bloom.add(url)
+                    fetched += 1
+                bloom.flush()
+                save_sync_marks(path, new_marks)
+                return bloom, True, fetched
+            bloom.close()
+        except (OSError, ValueError, struct.error):
+            pass
+
+    bloom = BloomFilter.create(path, max(capacity, 2 * count_documents()), error_rate)
+    new_marks = {}
+    fetched = 0
+    for url in iter_new_urls(sources, {}, new_marks):
+        bloom.add(url)
+        fetched += 1
+    bloom.flush()
+    save_sync_marks(path, new_marks)
+    return bloom, False, fetched
@@ -0,0 +1,123 @@
+import json
+import os
+
+import yaml
+
+# Registros anexados ao diário antes de compactá-lo (regravá-lo só com as unidades necessárias).
+COMPACT_EVERY = 500
+
+
+class CheckpointJournal:
+    """
+    Checkpoints em um diário só de acréscimo (JSON Lines): cada unidade concluída vira uma linha gravada com
+    fsync, sem reler nem reescrever o arquivo inteiro a cada palavra-chave (como acontecia com o YAML).
+
+    Uma unidade é (tipo, palavra-chave, *detalhes), por exemplo:
+    - ('keyword', 'pcc')                              -> palavra-chave inteira
+    - ('window', 'pcc', '2023-01-01', '2023-01-31')   -> janela de datas de uma palavra-chave
+    - ('page', 'pcc', 3)                              -> página da busca de uma palavra-chave
+
+    As requisições que ainda faltam (a fronteira da coleta) ficam em frontier.py, não aqui.
+
+    Se o processo morrer no meio de uma gravação, só a última linha fica incompleta e é ignorada na leitura.
+    A cada `compact_every` registros o diário é regravado (arquivo temporário + os.replace) sem repetições e sem
+    as unidades de palavras-chave já concluídas. O YAML antigo (`legacy_path`) é lido uma vez como ponto de
+    partida, para não perder os checkpoints de execuções anteriores.
+    """
+    def __init__(self, path, legacy_path=None, legacy_key=None, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.legacy_key = legacy_key
+        self.compact_every = compact_every
+        self.units = set()
+        self.appended = 0
+        self.file = None
+
+    @classmethod
+    def open(cls, path, legacy_path=None, legacy_key=None, compact_every=COMPACT_EVERY):
+        journal = cls(path, legacy_path, legacy_key, compact_every)
+        journal.load()
+        return journal
+
+    # Método que lê o YAML antigo (se houver) e o diário, numa passada só.
+    def load(self):
+        for keyword in self.load_legacy():
+            self.units.add(('keyword', keyword))
+
+        needs_newline = False
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    needs_newline = not line.endswith(b'\n')
+                    try:
+                        self.units.add(tuple(json.loads(line)))
+                    except ValueError:
+                        # Linha cortada por uma queda no meio da gravação
+                        continue
+
+        self.file = open(self.path, 'ab')
+        if needs_newline:
+            self.file.write(b'\n')
+
+    def load_legacy(self):
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return []
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError):
+            return []
+        if self.legacy_key and isinstance(data, dict):
+            data = data.get(self.legacy_key)
+        return data if isinstance(data, list) else []
+
+    def __contains__(self, unit):
+        return tuple(unit) in self.units
+
+    def __len__(self):
+        return len(self.units)
+
+    # Método que grava a unidade concluída. Retorna False se ela já estava registrada.
+    def add(self, kind, keyword, *detail):
+        unit = (kind, keyword, *detail)
+        if unit in self.units:
+            return False
+        self.units.add(unit)
+        self.file.write(json.dumps(unit, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        self.appended += 1
+        if self.compact_every and self.appended >= self.compact_every:
+            self.compact()
+        return True
+
+    # Palavras-chave concluídas por inteiro.
+    def completed_keywords(self):
+        return {unit[1] for unit in self.units if unit[0] == 'keyword'}
+
+    # Detalhes das unidades de um tipo para a palavra-chave. Ex: units_of('window', 'pcc') -> {('2023-01-01', '2023-01-31')}
+    def units_of(self, kind, keyword):
+        return {unit[2:] for unit in self.units if unit[0] == kind and unit[1] == keyword}
+
+    # Método que regrava o diário só com o necessário: as unidades finas de palavras-chave concluídas saem.
+    def compact(self):
+        completed = self.completed_keywords()
+        self.units = {unit for unit in self.units if unit[0] == 'keyword' or unit[1] not in completed}
+
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            for unit in sorted(self.units, key=repr):
+                f.write(json.dumps(unit, ensure_ascii=False).encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.file.close()
+        os.replace(tmp_path, self.path)
+        self.file = open(self.path, 'ab')
+        self.appended = 0
+
+    def close(self):
+        if self.file is not None:
+            self.compact()
+            self.file.close()
+            self.file = None
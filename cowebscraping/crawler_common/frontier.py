@@ -0,0 +1,130 @@
+import json
+import sqlite3
+from collections import namedtuple
+
+# Requisição guardada na fronteira. callback/errback são nomes de métodos do spider.
+FrontierEntry = namedtuple('FrontierEntry', 'id keyword url callback errback meta priority')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    keyword TEXT NOT NULL,
+    url TEXT NOT NULL,
+    callback TEXT NOT NULL,
+    errback TEXT,
+    meta TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    leased INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (keyword, url, callback)
+);
+CREATE INDEX IF NOT EXISTS frontier_order ON frontier (leased, priority DESC, id);
+CREATE INDEX IF NOT EXISTS frontier_keyword ON frontier (keyword, leased);
+CREATE INDEX IF NOT EXISTS frontier_url ON frontier (url, callback);
+CREATE TABLE IF NOT EXISTS finished (
+    url TEXT NOT NULL,
+    callback TEXT NOT NULL,
+    PRIMARY KEY (url, callback)
+) WITHOUT ROWID;
+"""
+
+
+class RequestFrontier:
+    """
+    Fronteira da coleta em disco (SQLite): as requisições entram com `push` e saem em ordem de prioridade
+    (maior primeiro, depois a ordem de chegada) com `pop`, só até o limite que o spider quer em andamento.
+    O resto fica no arquivo, então a memória não cresce com o tamanho do backlog.
+
+    Uma linha só sai da tabela com `done` (processada ou descartada). Ao abrir, as linhas que estavam em
+    andamento quando o processo caiu voltam para a fila: a coleta continua de onde parou sem enumerar tudo de novo.
+    (palavra-chave, url, callback) é único, então pedir a mesma requisição duas vezes não a duplica. A deduplicação
+    é da fronteira: as requisições vão ao Scrapy com dont_filter (uma descartada pelo dupefilter não chamaria
+    callback nem errback e a linha ficaria em andamento para sempre).
+
+    As linhas concluídas ficam registradas (url, callback) em `finished`. Com push(..., unique_url=True) a URL não
+    entra de novo se já está na fila para qualquer palavra-chave ou se já foi concluída nesta coleta. O registro
+    sobrevive a um reinício no meio da coleta e é zerado quando a fronteira abre vazia (coleta nova).
+    """
+    def __init__(self, path):
+        self.path = path
+        self.db = None
+        # Linhas entregues ao Scrapy nesta execução e ainda não concluídas
+        self.leased = 0
+
+    @classmethod
+    def open(cls, path):
+        frontier = cls(path)
+        frontier.db = sqlite3.connect(path)
+        # WAL + synchronous NORMAL: commit barato, e uma queda do processo não perde o que já foi commitado
+        frontier.db.execute('PRAGMA journal_mode=WAL')
+        frontier.db.execute('PRAGMA synchronous=NORMAL')
+        frontier.db.executescript(SCHEMA)
+        with frontier.db:
+            frontier.db.execute('UPDATE frontier SET leased = 0 WHERE leased = 1')
+            if not frontier.count():
+                frontier.db.execute('DELETE FROM finished')
+        return frontier
+
+    # Método que coloca a requisição na fronteira. Retorna False se ela já estava lá.
+    # Com unique_url=True, também se a URL já está na fila por outra palavra-chave ou já foi concluída.
+    def push(self, keyword, url, callback, meta=None, errback=None, priority=0, unique_url=False):
+        values = (keyword, url, callback, errback, json.dumps(meta or {}, ensure_ascii=False), priority)
+        with self.db:
+            if unique_url:
+                cursor = self.db.execute(
+                    'INSERT OR IGNORE INTO frontier (keyword, url, callback, errback, meta, priority) '
+                    'SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM frontier WHERE url = ? AND callback = ?) '
+                    'AND NOT EXISTS (SELECT 1 FROM finished WHERE url = ? AND callback = ?)',
+                    (*values, url, callback, url, callback),
+                )
+            else:
+                cursor = self.db.execute(
+                    'INSERT OR IGNORE INTO frontier (keyword, url, callback, errback, meta, priority) VALUES (?, ?, ?, ?, ?, ?)',
+                    values,
+                )
+        return cursor.rowcount > 0
+
+    # Método que entrega até `limit` requisições da fila (só das palavras-chave em `keywords`, se vier).
+    def pop(self, limit, keywords=None):
+        if limit <= 0 or (keywords is not None and not keywords):
+            return []
+        query = 'SELECT id, keyword, url, callback, errback, meta, priority FROM frontier WHERE leased = 0'
+        params = []
+        if keywords is not None:
+            keywords = list(keywords)
+            query += f" AND keyword IN ({', '.join('?' * len(keywords))})"
+            params += keywords
+        query += ' ORDER BY priority DESC, id LIMIT ?'
+        params.append(limit)
+
+        with self.db:
+            rows = self.db.execute(query, params).fetchall()
+            self.db.executemany('UPDATE frontier SET leased = 1 WHERE id = ?', [(row[0],) for row in rows])
+        self.leased += len(rows)
+        return [FrontierEntry(row_id, keyword, url, callback, errback, json.loads(meta), priority)
+                for row_id, keyword, url, callback, errback, meta, priority in rows]
+
+    # Método que tira a requisição da fronteira (terminou, com ou sem sucesso) e a registra como concluída.
+    def done(self, entry_id):
+        with self.db:
+            self.db.execute('INSERT OR IGNORE INTO finished (url, callback) SELECT url, callback FROM frontier WHERE id = ?',
+                            (entry_id,))
+            cursor = self.db.execute('DELETE FROM frontier WHERE id = ?', (entry_id,))
+        if cursor.rowcount:
+            self.leased = max(0, self.leased - 1)
+
+    def contains(self, keyword, url):
+        return self.db.execute('SELECT 1 FROM frontier WHERE keyword = ? AND url = ? LIMIT 1', (keyword, url)).fetchone() is not None
+
+    # Requisições na fronteira (da palavra-chave, se vier), em andamento ou não.
+    def count(self, keyword=None):
+        if keyword is None:
+            return self.db.execute('SELECT COUNT(*) FROM frontier').fetchone()[0]
+        return self.db.execute('SELECT COUNT(*) FROM frontier WHERE keyword = ?', (keyword,)).fetchone()[0]
+
+    def describe(self):
+        return f"{self.count()} requisições na fronteira, {self.leased} em andamento"
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
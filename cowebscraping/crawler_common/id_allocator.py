@@ -0,0 +1,81 @@
+import asyncio
+from pymongo import ReturnDocument
+
+
+# Alocador atômico de id_event baseado numa coleção de contadores.
+# Cada reserva faz um único find_one_and_update com $inc e devolve um bloco de ids que passa a ser
+# distribuído em memória: um round trip por bloco em vez de um find_one ordenado por notícia, e ids únicos
+# mesmo com vários spiders gravando em paralelo (cada processo recebe blocos disjuntos).
+# Ids de um bloco não usados até o fim da execução ficam como lacunas na sequência.
+class IdEventAllocator:
+    def __init__(self, counters_collection, counter_name, block_size=100):
+        self.counters_collection = counters_collection
+        self.counter_name = counter_name
+        self.block_size = block_size
+
+        # Próximo id a entregar e último id do bloco reservado (bloco vazio no início).
+        self.next_id = 1
+        self.block_end = 0
+
+    # Método que alinha o contador com o maior id_event já gravado na coleção de destino.
+    # Usa $max, então é seguro chamar em todo início de execução, mesmo com outros processos reservando blocos.
+    def seed(self, target_collection):
+        last_record = target_collection.find_one({'id_event': {'$ne': None}}, {'id_event': 1}, sort=[('id_event', -1)])
+        last_id = last_record['id_event'] if last_record else 0
+        self.counters_collection.update_one(
+            {'_id': self.counter_name}, {'$max': {'value': last_id}}, upsert=True)
+        return last_id
+
+    # Método que reserva o próximo bloco de ids no banco.
+    def reserve_block(self):
+        counter = self.counters_collection.find_one_and_update(
+            {'_id': self.counter_name},
+            {'$inc': {'value': self.block_size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self.block_end = counter['value']
+        self.next_id = self.block_end - self.block_size + 1
+
+    # Método que devolve o próximo id_event (só vai ao banco quando o bloco acaba).
+    def next(self):
+        if self.next_id > self.block_end:
+            self.reserve_block()
+        id_event = self.next_id
+        self.next_id += 1
+        return id_event
+
+
+# Versão para drivers assíncronos (motor): mesma lógica, com as chamadas ao banco aguardadas.
+# O lock evita que várias gravações concorrentes reservem blocos ao mesmo tempo.
+class AsyncIdEventAllocator(IdEventAllocator):
+    def __init__(self, counters_collection, counter_name, block_size=100):
+        super().__init__(counters_collection, counter_name, block_size)
+        self.lock = None
+
+    async def seed(self, target_collection):
+        last_record = await target_collection.find_one({'id_event': {'$ne': None}}, {'id_event': 1}, sort=[('id_event', -1)])
+        last_id = last_record['id_event'] if last_record else 0
+        await self.counters_collection.update_one(
+            {'_id': self.counter_name}, {'$max': {'value': last_id}}, upsert=True)
+        return last_id
+
+    async def reserve_block(self):
+        counter = await self.counters_collection.find_one_and_update(
+            {'_id': self.counter_name},
+            {'$inc': {'value': self.block_size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self.block_end = counter['value']
+        self.next_id = self.block_end - self.block_size + 1
+
+    async def next(self):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            if self.next_id > self.block_end:
+                await self.reserve_block()
+            id_event = self.next_id
+            self.next_id += 1
+            return id_event
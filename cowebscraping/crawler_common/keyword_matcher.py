@@ -0,0 +1,90 @@
+import re
+
+from .normalized_text import normalize_text
+
+# Caracteres que, logo após um literal, o tornam opcional ou repetível no padrão.
+QUANTIFIERS = '?*+{'
+
+
+# Método que extrai a âncora de um padrão: o prefixo literal obrigatório logo após o '\b' inicial.
+# Ex: r'\bcomando\s*vermelho\b' -> 'comando' | r'\bbicheiros?\b' -> 'bicheiro' | r'\bcarte(?:l|is)\b' -> 'carte'
+# Sem '\b' inicial não há garantia de que o padrão começa um token, então a âncora fica vazia (sempre candidato).
+def extract_anchor(pattern):
+    if not pattern.startswith(r'\b'):
+        return ''
+
+    body = pattern[2:]
+    anchor = []
+    for i, char in enumerate(body):
+        if not (char.isascii() and char.isalnum()):
+            break
+        if i + 1 < len(body) and body[i + 1] in QUANTIFIERS:
+            break
+        anchor.append(char.lower())
+    return ''.join(anchor)
+
+
+class MatchResult:
+    """
+    Resultado de uma varredura: para cada categoria, os padrões que casaram (na ordem original da lista).
+    """
+    def __init__(self, normalized, hits):
+        self.normalized = normalized
+        self.text = normalized.lowered
+        self.hits = hits
+
+    def first(self, *categories):
+        """Primeiro padrão que casou, percorrendo as categorias na ordem informada (ou False)."""
+        for category in categories:
+            if self.hits.get(category):
+                return self.hits[category][0]
+        return False
+
+
+class KeywordMatcher:
+    """
+    Motor de validação compilado a partir de um dicionário VALIDATION_KEYWORDS.
+
+    Cada padrão é compilado uma única vez e indexado pela sua âncora literal. Numa varredura o texto é
+    normalizado e tokenizado uma vez (via NormalizedText); só os padrões cuja âncora aparece no vocabulário
+    do texto são confirmados com o regex original, então o resultado é idêntico ao de rodar re.findall
+    padrão a padrão.
+    """
+    def __init__(self, validation_keywords):
+        self.categories = {}
+        for category, patterns in validation_keywords.items():
+            self.categories[category] = [
+                (pattern, re.compile(pattern, re.IGNORECASE), extract_anchor(pattern))
+                for pattern in patterns
+            ]
+
+    def candidates(self, index, category):
+        for pattern, compiled, anchor in self.categories.get(category, []):
+            if index.has_prefix(anchor):
+                yield pattern, compiled
+
+    def scan(self, article, categories=None):
+        """
+        Varre a forma minúscula e sem acento do artigo (str ou NormalizedText) e devolve um MatchResult
+        com os padrões encontrados em todas as categorias pedidas (por padrão, todas).
+        """
+        normalized = normalize_text(article)
+        text = normalized.lowered
+        index = normalized.token_index('lowered')
+        hits = {}
+        for category in (categories or self.categories):
+            hits[category] = [pattern for pattern, compiled in self.candidates(index, category) if compiled.search(text)]
+        return MatchResult(normalized, hits)
+
+    def findall(self, article, category):
+        """
+        Equivalente a concatenar re.findall(p, unidecode(article), re.IGNORECASE) para cada padrão da categoria.
+        O texto mantém a caixa original, como no preenchimento do campo 'gangs'.
+        """
+        normalized = normalize_text(article)
+        text = normalized.folded
+        index = normalized.token_index('folded')
+        found = []
+        for pattern, compiled in self.candidates(index, category):
+            found += compiled.findall(text)
+        return found
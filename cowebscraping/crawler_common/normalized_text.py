@@ -0,0 +1,114 @@
+import hashlib
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+from unidecode import unidecode
+
+# Tokens de palavra do texto já normalizado (o unidecode garante texto ASCII).
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Quantidade máxima de textos normalizados mantidos em memória.
+CACHE_SIZE = 1024
+
+
+class TokenIndex:
+    """
+    Vocabulário ordenado de um texto normalizado.
+    Permite testar em O(log n) se algum token começa com uma âncora, sem reler o texto.
+    """
+    def __init__(self, text, spans):
+        self.text = text
+        self.tokens = sorted({text[start:end].lower() for start, end in spans})
+
+    def has_prefix(self, anchor):
+        if not anchor:
+            return True
+        i = bisect_left(self.tokens, anchor)
+        return i < len(self.tokens) and self.tokens[i].startswith(anchor)
+
+
+class NormalizedText:
+    """
+    Formas normalizadas de um artigo, calculadas uma única vez e reaproveitadas por todos os matchers:
+    - folded: sem acentos, mantendo a caixa original (usado no campo 'gangs');
+    - lowered: minúsculo e sem acentos (usado na validação de aceite).
+    Cada forma, os offsets dos seus tokens e o vocabulário são calculados sob demanda e guardados.
+    """
+    def __init__(self, raw):
+        self.raw = raw
+        self._texts = {}
+        self._spans = {}
+        self._indexes = {}
+        self._words = None
+
+    def __bool__(self):
+        return bool(self.raw)
+
+    @property
+    def folded(self):
+        return self.text('folded')
+
+    @property
+    def lowered(self):
+        return self.text('lowered')
+
+    def text(self, variant):
+        if variant not in self._texts:
+            self._texts[variant] = unidecode(self.raw) if variant == 'folded' else unidecode(self.raw.lower())
+        return self._texts[variant]
+
+    def token_spans(self, variant='lowered'):
+        """Lista de (início, fim) de cada token na forma pedida."""
+        if variant not in self._spans:
+            self._spans[variant] = [match.span() for match in TOKEN_PATTERN.finditer(self.text(variant))]
+        return self._spans[variant]
+
+    def token_index(self, variant='lowered'):
+        if variant not in self._indexes:
+            self._indexes[variant] = TokenIndex(self.text(variant), self.token_spans(variant))
+        return self._indexes[variant]
+
+    @property
+    def words(self):
+        """Palavras separadas por espaço da forma minúscula (equivalente a lowered.split())."""
+        if self._words is None:
+            self._words = frozenset(self.lowered.split())
+        return self._words
+
+
+class NormalizedTextCache:
+    """
+    Cache LRU de NormalizedText indexado pelo hash do conteúdo.
+    Artigos recoletados ou replicados entre portais não passam pelo unidecode de novo.
+    """
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, raw):
+        key = hashlib.sha1(raw.encode('utf-8', 'surrogatepass')).digest()
+        normalized = self.entries.get(key)
+        if normalized is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return normalized
+
+        self.misses += 1
+        normalized = NormalizedText(raw)
+        self.entries[key] = normalized
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return normalized
+
+
+# Cache compartilhado pelo processo inteiro.
+NORMALIZED_TEXT_CACHE = NormalizedTextCache()
+
+
+# Método que devolve a forma normalizada de um texto, reaproveitando o cache (aceita também um NormalizedText pronto).
+def normalize_text(text):
+    if isinstance(text, NormalizedText):
+        return text
+    return NORMALIZED_TEXT_CACHE.get(text)
@@ -0,0 +1,143 @@
+from collections import defaultdict
+
+# Contexto usado pelo scrapy-playwright quando a requisição não informa 'playwright_context'.
+DEFAULT_CONTEXT = 'default'
+
+# Navegações por página antes de fechá-la e abrir uma nova (limita o acúmulo de memória da aba).
+PAGE_MAX_NAVIGATIONS = 50
+# Heap de JavaScript (MB) a partir do qual a página é descartada na devolução, mesmo antes do limite de navegações.
+PAGE_MAX_HEAP_MB = 256
+# Páginas descartadas por contexto antes de fechar o contexto inteiro (cache, cookies e service workers acumulados).
+CONTEXT_MAX_PAGES = 10
+
+# performance.memory só existe no Chromium; nos outros navegadores a medida fica em 0 e só vale o limite de navegações.
+HEAP_SCRIPT = "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+
+
+class PagePool:
+    """
+    Pool de páginas do Playwright, separadas por contexto do navegador.
+
+    Em vez de abrir uma aba nova para cada requisição e fechá-la no callback, a página volta para o pool e a
+    próxima requisição do mesmo contexto a recebe já aquecida via meta['playwright_page'] (o scrapy-playwright
+    navega nela no lugar de criar outra). A página é descartada depois de `max_navigations` navegações ou quando
+    o heap de JavaScript passa de `max_heap_mb`; depois de `context_max_pages` descartes o contexto é fechado e o
+    scrapy-playwright cria um novo na próxima requisição.
+
+    A devolução é garantida pelo lease() no callback e pelo release() no errback, que aceitam meta sem a
+    chave 'playwright_page' (requisição que falhou antes de a página existir).
+    """
+    def __init__(self, max_navigations=PAGE_MAX_NAVIGATIONS, max_heap_mb=PAGE_MAX_HEAP_MB,
+                 context_max_pages=CONTEXT_MAX_PAGES, stats=None, logger=None):
+        self.max_navigations = max_navigations
+        self.max_heap_bytes = max_heap_mb * 2**20
+        self.context_max_pages = context_max_pages
+        self.stats = stats
+        self.logger = logger
+        # Páginas livres por contexto, navegações de cada página e requisições com página em uso por contexto
+        self.idle = defaultdict(list)
+        self.navigations = {}
+        self.in_use = defaultdict(int)
+        self.retired = defaultdict(int)
+        self.discarded = 0
+
+    def inc_stat(self, key):
+        if self.stats is not None:
+            self.stats.inc_value(f'page_pool/{key}')
+
+    # Método que prepara o meta da requisição: empresta uma página livre do contexto, se houver.
+    # Sem página livre, o scrapy-playwright cria uma e ela entra no pool na devolução.
+    def borrow(self, meta):
+        meta['playwright_include_page'] = True
+        meta['page_pool_lease'] = True
+        context = meta.get('playwright_context', DEFAULT_CONTEXT)
+        self.in_use[context] += 1
+        idle = self.idle[context]
+        while idle:
+            page = idle.pop()
+            if not page.is_closed():
+                meta['playwright_page'] = page
+                self.inc_stat('reused')
+                return meta
+            self.navigations.pop(page, None)
+        meta.pop('playwright_page', None)
+        self.inc_stat('created')
+        return meta
+
+    # Método que devolve a página do meta ao pool (ou a descarta). failed=True sempre descarta.
+    # Pode ser chamado mais de uma vez para o mesmo meta: só a primeira devolução conta.
+    async def release(self, meta, failed=False):
+        context = meta.get('playwright_context', DEFAULT_CONTEXT)
+        if meta.pop('page_pool_lease', False):
+            self.in_use[context] -= 1
+        page = meta.pop('playwright_page', None)
+        if page is None:
+            return
+        self.navigations[page] = self.navigations.get(page, 0) + 1
+
+        reason = 'failed' if failed else await self.retire_reason(page)
+        if reason is None:
+            self.idle[context].append(page)
+            return
+        self.inc_stat(f'retired/{reason}')
+        await self.close_page(page)
+        self.discarded += 1
+        self.retired[context] += 1
+        if self.context_max_pages and self.retired[context] >= self.context_max_pages and not self.in_use[context]:
+            await self.close_context(context, page)
+
+    # Motivo para descartar a página (ou None se ela pode voltar ao pool).
+    async def retire_reason(self, page):
+        if page.is_closed():
+            return 'closed'
+        if self.navigations[page] >= self.max_navigations:
+            return 'navigations'
+        if self.max_heap_bytes:
+            try:
+                if await page.evaluate(HEAP_SCRIPT) >= self.max_heap_bytes:
+                    return 'memory'
+            except Exception:
+                return 'unresponsive'
+        return None
+
+    async def close_page(self, page):
+        self.navigations.pop(page, None)
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"⚠️ Erro ao fechar página do pool: {e}")
+
+    # Método que fecha o contexto (e as páginas livres dele). O scrapy-playwright o recria sob o mesmo nome.
+    async def close_context(self, context, page):
+        for idle_page in self.idle.pop(context, []):
+            await self.close_page(idle_page)
+        self.retired[context] = 0
+        self.inc_stat('contexts_recycled')
+        try:
+            await page.context.close()
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"⚠️ Erro ao fechar o contexto '{context}': {e}")
+
+    # Context manager para o callback: devolve a página ao sair (descartando-a se o bloco levantou exceção).
+    def lease(self, meta):
+        return PageLease(self, meta)
+
+    def describe(self):
+        idle = sum(len(pages) for pages in self.idle.values())
+        return f"{idle} páginas livres em {len(self.idle)} contextos, {self.discarded} descartadas"
+
+
+class PageLease:
+    def __init__(self, pool, meta):
+        self.pool = pool
+        self.meta = meta
+
+    async def __aenter__(self):
+        return self.meta.get('playwright_page')
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.pool.release(self.meta, failed=exc_type is not None)
+        return False
@@ -0,0 +1,92 @@
+import json
+import os
+import re
+import time
+from urllib.parse import urlparse
+
+# Segmentos de caminho que variam de uma URL para outra (números, datas, ids) não entram no padrão.
+VARIABLE_SEGMENT = re.compile(r'^[\d.\-_]+$|\d{4,}')
+
+
+# Método que resume a URL no padrão usado pelo cache: host + primeiro segmento fixo do caminho.
+# Ex: https://g1.globo.com/sp/sao-paulo/noticia/2023/... -> 'g1.globo.com/sp'
+def url_pattern(url):
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    for segment in parsed.path.split('/'):
+        if segment and not VARIABLE_SEGMENT.search(segment):
+            return f'{host}/{segment}'
+    return host
+
+
+def url_domain(url):
+    return (urlparse(url).hostname or '').lower()
+
+
+class RenderDecisionCache:
+    """
+    Cache persistente (JSON) de qual caminho baixa cada padrão de URL: 'static' (HTTP simples) ou 'browser'
+    (Playwright). As decisões são gravadas por padrão (host + primeiro segmento) e por domínio; o domínio só é
+    consultado quando o padrão ainda não tem decisão. Decisões tomadas há mais de `ttl` segundos são ignoradas,
+    então o padrão volta a ser testado pelo caminho estático de tempos em tempos. A idade conta de `decided_at`, que
+    só muda quando a decisão muda ou quando um novo teste pelo caminho estático a confirma depois de vencer (`updated`
+    é só o último download registrado).
+    """
+    def __init__(self, path=None, ttl=0):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path, ttl=0):
+        cache = cls(path, ttl)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cache.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+        return cache
+
+    def fresh(self, entry):
+        if entry is None:
+            return False
+        # Caches gravados antes de `decided_at` existir usam `updated`
+        return self.ttl <= 0 or time.time() - entry.get('decided_at', entry.get('updated', 0)) <= self.ttl
+
+    # Método que devolve a decisão para a URL ('static', 'browser') ou None se ela ainda precisa ser testada.
+    def mode(self, url):
+        for key in (url_pattern(url), url_domain(url)):
+            entry = self.entries.get(key)
+            if self.fresh(entry):
+                return entry['mode']
+        return None
+
+    # Método que registra o resultado de um download: mode é o caminho que trouxe o conteúdo e tested diz se ele passou
+    # pela tentativa estática (False quando foi direto ao navegador pela decisão em cache, que assim não se renova).
+    def record(self, url, mode, tested=True):
+        now = time.time()
+        for key in (url_pattern(url), url_domain(url)):
+            entry = self.entries.setdefault(key, {'mode': mode, 'static': 0, 'browser': 0,
+                                                  'updated': now, 'decided_at': now})
+            stale = tested and not self.fresh(entry)
+            entry[mode] += 1
+            entry['updated'] = now
+            # O padrão segue o último resultado; o domínio, a maioria dos resultados dos seus padrões
+            decision = mode if '/' in key else ('browser' if entry['browser'] > entry['static'] else 'static')
+            if decision != entry['mode'] or stale:
+                entry['mode'] = decision
+                entry['decided_at'] = now
+        self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        with open(f'{self.path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(f'{self.path}.tmp', self.path)
+        self.dirty = False
+
+    def describe(self):
+        modes = [entry['mode'] for key, entry in self.entries.items() if '/' in key]
+        return f"{modes.count('static')} padrões estáticos, {modes.count('browser')} pelo navegador"
@@ -0,0 +1,154 @@
+import asyncio
+from collections import defaultdict
+from urllib.parse import urlparse
+
+# Domínios de anúncios, analytics e rastreamento (bloqueados também com subdomínios: 'ads.x.doubleclick.net').
+AD_DOMAINS = (
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'googletagmanager.com',
+    'googletagservices.com', 'google-analytics.com', 'analytics.google.com', 'adservice.google.com',
+    'facebook.net', 'facebook.com', 'connect.facebook.net', 'scorecardresearch.com', 'chartbeat.com',
+    'chartbeat.net', 'taboola.com', 'outbrain.com', 'hotjar.com', 'newrelic.com', 'nr-data.net',
+    'amazon-adsystem.com', 'criteo.com', 'criteo.net', 'adnxs.com', 'rubiconproject.com', 'pubmatic.com',
+    'casalemedia.com', 'smartadserver.com', 'teads.tv', 'quantserve.com', 'clarity.ms',
+    'tiktok.com', 'twitter.com', 'ads-twitter.com', 'linkedin.com', 'onesignal.com', 'navdmp.com',
+    'cxense.com', 'permutive.com', 'permutive.app', 'sentry.io', 'marfeel.com', 'tail.digital',
+)
+
+# Trechos de URL típicos de pixels de rastreamento (imagens 1x1 e beacons).
+PIXEL_PATTERNS = ('/pixel', 'pixel.', '/beacon', '/collect?', '/track', '1x1.', '/impression', '/__utm.gif')
+
+# Tipos de recurso bloqueados por padrão: não mudam o HTML que é extraído.
+DEFAULT_BLOCKED_TYPES = ('image', 'media', 'font', 'ping')
+
+
+# Método que diz se o host é o domínio ou um subdomínio dele.
+def matches_domain(host, domains):
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class RoutePolicy:
+    """
+    Política de bloqueio das requisições feitas pelas páginas do Playwright (PLAYWRIGHT_ABORT_REQUEST).
+
+    Uma instância por spider decide, para cada requisição da página, se ela é abortada:
+    - tipos de recurso em `blocked_types` (imagens, mídia, fontes, beacons...);
+    - domínios de anúncios/analytics (`blocked_domains`, com subdomínios);
+    - com `first_party` informado, tudo que não é do próprio site (terceiros), se `block_third_party`;
+    - pixels de rastreamento (`PIXEL_PATTERNS`) e iframes (documentos de subframes);
+    - XHR/fetch cujo caminho não contém nenhum trecho de `xhr_allow` (None = todos liberados).
+
+    Os contadores são por domínio: requisições bloqueadas/liberadas e bytes baixados das liberadas
+    (medidos com request.sizes() quando a resposta termina). Bytes bloqueados não têm como ser medidos e são
+    estimados pela média dos bytes liberados do mesmo tipo de recurso (tipos sempre bloqueados ficam de fora).
+    """
+    def __init__(self, first_party=(), blocked_domains=AD_DOMAINS, blocked_types=DEFAULT_BLOCKED_TYPES,
+                 block_third_party=True, block_iframes=True, block_pixels=True, xhr_allow=None):
+        self.first_party = tuple(first_party)
+        self.blocked_domains = tuple(blocked_domains)
+        self.blocked_types = set(blocked_types)
+        self.block_third_party = block_third_party and bool(self.first_party)
+        self.block_iframes = block_iframes
+        self.block_pixels = block_pixels
+        self.xhr_allow = tuple(xhr_allow) if xhr_allow is not None else None
+
+        # Contadores por domínio e por motivo; bytes por tipo de recurso (para estimar o que foi bloqueado)
+        self.domains = defaultdict(lambda: defaultdict(int))
+        self.reasons = defaultdict(int)
+        self.type_bytes = defaultdict(int)
+        self.type_count = defaultdict(int)
+        self.blocked_types_count = defaultdict(int)
+        self.measuring = set()
+
+    # Motivo para abortar a requisição (ou None para deixá-la seguir).
+    def decide(self, request, host):
+        resource_type = request.resource_type
+        # A navegação da própria página nunca é bloqueada
+        if resource_type == 'document' and not self.is_subframe(request):
+            return None
+        if resource_type in self.blocked_types:
+            return resource_type
+        if matches_domain(host, self.blocked_domains):
+            return 'ads'
+        if self.block_third_party and not matches_domain(host, self.first_party):
+            return 'third_party'
+        if self.block_pixels and any(pattern in request.url for pattern in PIXEL_PATTERNS):
+            return 'pixel'
+        if self.block_iframes and resource_type == 'document' and self.is_subframe(request):
+            return 'iframe'
+        if self.xhr_allow is not None and resource_type in ('xhr', 'fetch'):
+            if not any(pattern in request.url for pattern in self.xhr_allow):
+                return 'xhr'
+        return None
+
+    @staticmethod
+    def is_subframe(request):
+        try:
+            return request.frame.parent_frame is not None
+        except Exception:
+            # Requisições de service worker não têm frame
+            return False
+
+    # Chamado pelo scrapy-playwright para cada requisição da página: True = abortar.
+    def __call__(self, request):
+        host = urlparse(request.url).hostname or ''
+        reason = self.decide(request, host)
+        counters = self.domains[host]
+        if reason is not None:
+            counters['blocked_requests'] += 1
+            self.reasons[reason] += 1
+            self.blocked_types_count[request.resource_type] += 1
+            return True
+
+        counters['allowed_requests'] += 1
+        task = asyncio.ensure_future(self.measure(request, counters))
+        self.measuring.add(task)
+        task.add_done_callback(self.measuring.discard)
+        return False
+
+    # Método que soma os bytes (cabeçalhos + corpo) da resposta quando ela termina de chegar.
+    async def measure(self, request, counters):
+        try:
+            response = await request.response()
+            if response is None:
+                return
+            await response.finished()
+            sizes = await request.sizes()
+        except Exception:
+            return
+        size = max(0, sizes.get('responseHeadersSize', 0)) + max(0, sizes.get('responseBodySize', 0))
+        counters['allowed_bytes'] += size
+        self.type_bytes[request.resource_type] += size
+        self.type_count[request.resource_type] += 1
+
+    # Bytes evitados, estimados pela média dos recursos liberados do mesmo tipo.
+    def estimated_blocked_bytes(self):
+        total = 0
+        for resource_type, count in self.blocked_types_count.items():
+            if self.type_count[resource_type]:
+                total += count * self.type_bytes[resource_type] // self.type_count[resource_type]
+        return total
+
+    # Método que grava os contadores nas stats do Scrapy e registra os domínios mais bloqueados.
+    def report(self, stats, logger=None, top=10):
+        for host, counters in self.domains.items():
+            for key, value in counters.items():
+                stats.set_value(f'route/{host}/{key}', value)
+        for reason, count in self.reasons.items():
+            stats.set_value(f'route/blocked_by/{reason}', count)
+
+        blocked = sum(counters['blocked_requests'] for counters in self.domains.values())
+        allowed = sum(counters['allowed_requests'] for counters in self.domains.values())
+        allowed_bytes = sum(counters['allowed_bytes'] for counters in self.domains.values())
+        stats.set_value('route/blocked_requests', blocked)
+        stats.set_value('route/allowed_requests', allowed)
+        stats.set_value('route/allowed_bytes', allowed_bytes)
+        stats.set_value('route/estimated_blocked_bytes', self.estimated_blocked_bytes())
+
+        if logger and (blocked or allowed):
+            logger.info(f"🚧 Rotas: {blocked} requisições bloqueadas (~{self.estimated_blocked_bytes() / 2**20:.1f} MB "
+                        f"evitados), {allowed} liberadas ({allowed_bytes / 2**20:.1f} MB)")
+            ranking = sorted(self.domains.items(), key=lambda item: item[1]['blocked_requests'], reverse=True)
+            for host, counters in ranking[:top]:
+                if counters['blocked_requests']:
+                    logger.info(f"   {host}: {counters['blocked_requests']} bloqueadas, "
+                                f"{counters['allowed_requests']} liberadas ({counters['allowed_bytes'] / 1024:.0f} KB)")
@@ -0,0 +1,272 @@
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+from bson import ObjectId
+
+# Cabeçalho do snapshot: assinatura, quantidade de fingerprints e data de criação (24 bytes, alinhado a 8).
+SNAPSHOT_MAGIC = b'SEENIDX1'
+SNAPSHOT_HEADER = struct.Struct('<8sQd')
+
+# Documentos trazidos do MongoDB por round trip ao percorrer o cursor.
+CURSOR_BATCH_SIZE = 10000
+
+# Margem (segundos) aplicada ao high-water mark na sincronização incremental: ObjectIds gerados por processos
+# diferentes (ou gravados em lote com atraso) não chegam ao banco em ordem estrita. Reler alguns minutos é barato.
+SYNC_LAG = 10 * 60
+
+# Fingerprints ordenados por vez na construção. Só o pedaço vira lista de ints do Python (~40 MB por pedaço);
+# o resto fica no array('Q'), a 8 bytes por fingerprint.
+SORT_CHUNK_SIZE = 1000000
+
+
+# Método que transforma a URL num fingerprint de 64 bits.
+# Colisões são desprezíveis: ~1 em 3 milhões de chances com 10 milhões de URLs.
+def url_fingerprint(url):
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+# Método que ordena e remove repetidos de um array('Q') de fingerprints (o array é reordenado no lugar): cada pedaço
+# é ordenado de volta na própria fatia do array e os pedaços são intercalados por memoryviews, sem cópias.
+def sort_unique(fingerprints):
+    starts = range(0, len(fingerprints), SORT_CHUNK_SIZE)
+    for start in starts:
+        fingerprints[start:start + SORT_CHUNK_SIZE] = array('Q', sorted(fingerprints[start:start + SORT_CHUNK_SIZE]))
+    view = memoryview(fingerprints)
+    return merge_unique(*(view[start:start + SORT_CHUNK_SIZE] for start in starts))
+
+
+# Método que intercala sequências já ordenadas num array('Q') sem repetidos.
+def merge_unique(*sorted_sequences):
+    merged = array('Q')
+    last = None
+    for fingerprint in heapq.merge(*sorted_sequences):
+        if fingerprint != last:
+            merged.append(fingerprint)
+            last = fingerprint
+    return merged
+
+
+class SeenUrlIndex:
+    """
+    Índice compacto das URLs já vistas (substitui o set() de strings carregado no início do crawler).
+
+    Cada URL vira um fingerprint de 64 bits guardado num array('Q') ordenado (8 bytes por URL, contra
+    ~100 bytes de uma str dentro de um set) e a busca é binária. URLs vistas durante a execução ficam
+    num set pequeno à parte. O índice pode ser salvo num snapshot local e reaberto com mmap: o reinício
+    não consulta o banco e o sistema operacional só carrega as páginas do arquivo que forem usadas.
+
+    Usa a mesma interface do set que substitui: 'url in index', index.add(url) e len(index).
+    """
+    def __init__(self, fingerprints=None, created_at=None):
+        # Fingerprints ordenados e únicos (array em memória ou memoryview sobre o snapshot mapeado)
+        self.base = fingerprints if fingerprints is not None else array('Q')
+        # Fingerprints adicionados depois da construção
+        self.recent = set()
+        self.created_at = created_at if created_at is not None else time.time()
+        self.mapped = None
+
+    @classmethod
+    def from_urls(cls, urls):
+        fingerprints = array('Q')
+        for url in urls:
+            if url:
+                fingerprints.append(url_fingerprint(url))
+        return cls(sort_unique(fingerprints))
+
+    # Método que constrói o índice percorrendo cursores do MongoDB em lotes, sem montar listas de URLs.
+    @classmethod
+    def from_cursors(cls, *cursors, batch_size=CURSOR_BATCH_SIZE):
+        def urls():
+            for cursor in cursors:
+                for doc in cursor.batch_size(batch_size):
+                    yield doc.get('url')
+        return cls.from_urls(urls())
+
+    def __contains__(self, url):
+        fingerprint = url_fingerprint(url)
+        return fingerprint in self.recent or self.in_base(fingerprint)
+
+    def in_base(self, fingerprint):
+        i = bisect_left(self.base, fingerprint)
+        return i < len(self.base) and self.base[i] == fingerprint
+
+    def __len__(self):
+        return len(self.base) + len(self.recent)
+
+    def add(self, url):
+        if url not in self:
+            self.recent.add(url_fingerprint(url))
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    # Mesma interface do BloomSeenUrls (modo 'bloom'), em que a confirmação pode ir ao banco.
+    async def filter_seen(self, urls):
+        return {url for url in urls if url in self}
+
+    async def contains(self, url):
+        return url in self
+
+    # Só as URLs que já eram conhecidas antes desta execução (as adicionadas depois ficam em `recent`).
+    async def filter_seen_before_run(self, urls):
+        return {url for url in urls if self.in_base(url_fingerprint(url))}
+
+    # Idade (segundos) dos dados vindos do banco.
+    def age(self):
+        return time.time() - self.created_at
+
+    # Método que grava o índice (incluindo as URLs vistas nesta execução) num snapshot, de forma atômica.
+    def save(self, path):
+        fingerprints = merge_unique(self.base, sorted(self.recent))
+        if sys.byteorder != 'little':
+            fingerprints.byteswap()
+
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(fingerprints), self.created_at))
+            fingerprints.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return len(fingerprints)
+
+    # Método que abre um snapshot. Com use_mmap=True os fingerprints são lidos direto do arquivo mapeado.
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        with open(path, 'rb') as f:
+            magic, count, created_at = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"Snapshot inválido: {path}")
+
+            if count == 0:
+                return cls(array('Q'), created_at)
+
+            if use_mmap and sys.byteorder == 'little':
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                start = SNAPSHOT_HEADER.size
+                index = cls(memoryview(mapped)[start:start + count * 8].cast('Q'), created_at)
+                index.mapped = mapped
+                return index
+
+            fingerprints = array('Q')
+            fingerprints.fromfile(f, count)
+            if sys.byteorder != 'little':
+                fingerprints.byteswap()
+            return cls(fingerprints, created_at)
+
+    # Método que libera o arquivo mapeado (se houver).
+    def close(self):
+        if self.mapped is not None:
+            self.base.release()
+            self.base = array('Q')
+            self.mapped.close()
+            self.mapped = None
+
+    # Método que mede a memória usada: bytes no heap do Python e bytes mapeados do snapshot.
+    def memory_footprint(self):
+        recent_bytes = sys.getsizeof(self.recent) + 32 * len(self.recent)
+        if self.mapped is not None:
+            return {'urls': len(self), 'heap_bytes': recent_bytes, 'mapped_bytes': self.base.nbytes}
+        base_bytes = sys.getsizeof(self.base)
+        return {'urls': len(self), 'heap_bytes': base_bytes + recent_bytes, 'mapped_bytes': 0}
+
+    def describe(self):
+        footprint = self.memory_footprint()
+        description = f"{footprint['urls']} URLs em {footprint['heap_bytes'] / 2**20:.1f} MB de memória"
+        if footprint['mapped_bytes']:
+            description += f" (+{footprint['mapped_bytes'] / 2**20:.1f} MB mapeados do snapshot)"
+        return description
+
+
+# Arquivo (ao lado do snapshot) com o high-water mark de cada coleção: o maior _id já incorporado.
+def sync_marks_path(snapshot_path):
+    return f'{snapshot_path}.sync.json'
+
+
+def load_sync_marks(snapshot_path):
+    try:
+        with open(sync_marks_path(snapshot_path), 'r', encoding='utf-8') as f:
+            return {name: ObjectId(mark) if mark else None for name, mark in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+# Gravado só depois do snapshot: se o processo cair no meio, o mark antigo apenas faz reler um pouco mais.
+def save_sync_marks(snapshot_path, marks):
+    path = sync_marks_path(snapshot_path)
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump({name: str(mark) if mark else None for name, mark in marks.items()}, f)
+    os.replace(f'{path}.tmp', path)
+
+
+# Método que devolve o maior _id da coleção (o high-water mark atual) ou None se estiver vazia.
+def latest_id(collection, query):
+    doc = collection.find_one(query, {'_id': 1}, sort=[('_id', -1)])
+    return doc['_id'] if doc else None
+
+
+# Método que monta o filtro dos documentos mais novos que o mark (com a margem SYNC_LAG).
+def newer_than(query, mark):
+    if mark is None:
+        return dict(query)
+    since = ObjectId.from_datetime(mark.generation_time - timedelta(seconds=SYNC_LAG))
+    return {**query, '_id': {'$gt': since}}
+
+
+# Método que percorre só os documentos novos de cada fonte (nome, coleção, filtro), devolvendo as URLs em
+# streaming e preenchendo new_marks. O mark novo é lido antes da varredura, então nada inserido durante a
+# leitura fica para trás.
+def iter_new_urls(sources, marks, new_marks, batch_size=CURSOR_BATCH_SIZE):
+    for name, collection, query in sources:
+        new_marks[name] = latest_id(collection, query) or marks.get(name)
+        for doc in collection.find(newer_than(query, marks.get(name)), {'url': 1, '_id': 0}).batch_size(batch_size):
+            if doc.get('url'):
+                yield doc['url']
+
+
+# Método que abre o índice de URLs vistas.
+# sources: lista de (nome, coleção, filtro) com o histórico no banco.
+# - Com snapshot (max_age > 0) recente e com marks: reabre via mmap e busca só os documentos com _id acima do
+#   high-water mark de cada coleção, incorporando-os e regravando o snapshot.
+# - Sem snapshot, mais velho que max_age (reconstrução completa periódica) ou max_age = 0: lê tudo do banco.
+# Retorna (índice, veio_do_snapshot, documentos lidos do banco).
+def load_seen_index(snapshot_path, max_age, sources):
+    enabled = bool(snapshot_path) and max_age > 0
+    names = [name for name, _, _ in sources]
+
+    if enabled and os.path.exists(snapshot_path):
+        try:
+            index = SeenUrlIndex.load(snapshot_path)
+            marks = load_sync_marks(snapshot_path)
+            if index.age() <= max_age and all(name in marks for name in names):
+                new_marks = {}
+                fetched = 0
+                for url in iter_new_urls(sources, marks, new_marks):
+                    index.add(url)
+                    fetched += 1
+                save_sync_marks(snapshot_path, new_marks)
+                if index.recent:
+                    # Reabre o snapshot regravado: o que veio do banco vai para a base e `recent` fica só com esta execução
+                    index.save(snapshot_path)
+                    index.close()
+                    index = SeenUrlIndex.load(snapshot_path)
+                return index, True, fetched
+            index.close()
+        except (OSError, ValueError, struct.error):
+            pass
+
+    new_marks = {}
+    index = SeenUrlIndex.from_urls(iter_new_urls(sources, {}, new_marks))
+    if enabled:
+        index.save(snapshot_path)
+        save_sync_marks(snapshot_path, new_marks)
+    return index, False, len(index)
@@ -0,0 +1,252 @@
+import os
+import socket
+import sqlite3
+import time
+from collections import namedtuple
+
+from pymongo import ReturnDocument, UpdateOne
+
+LEASE_SECONDS = 300     # Tempo que uma unidade fica com o processo sem heartbeat antes de voltar para a fila
+MAX_ATTEMPTS = 3        # Tentativas (reservas que terminaram em falha ou lease vencido) antes de a unidade ser dada como falha
+
+# Unidade de trabalho: palavra-chave e, se houver, o intervalo de datas ('YYYY-MM-DD'; vazio = busca inteira).
+WorkUnit = namedtuple('WorkUnit', 'id keyword start end')
+
+
+def default_owner():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+# Método que separa os arquivos locais (diário, fronteira) de cada processo da mesma máquina: com -a worker=N,
+# 'frontier.sqlite3' vira 'frontier.w2.sqlite3'. O processo que voltar com o mesmo N retoma os próprios arquivos.
+def worker_path(path, worker=None):
+    if not worker:
+        return path
+    root, ext = os.path.splitext(path)
+    return f'{root}.w{worker}{ext}'
+
+
+class WorkQueue:
+    """
+    Fila de trabalho compartilhada entre processos/máquinas com reserva por tempo (lease). Cada processo reserva
+    (`claim`) uma unidade por vez quando tem lugar livre, renova as suas com `heartbeat` e, ao terminar, a marca
+    como concluída (`complete`) ou a devolve (`release`). Se o processo morre, o lease vence e outro processo
+    pega a unidade. Assim quem termina primeiro pega mais trabalho, em vez de cada processo ficar com um pedaço
+    fixo das palavras-chave.
+
+    `queue` separa filas diferentes na mesma coleção/arquivo (ex: 'g1:2023'). `seed` só insere as unidades
+    que ainda não existem, então todos os processos podem semear a mesma lista ao iniciar.
+    """
+    def __init__(self, queue, owner=None, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.queue = queue
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Unidades reservadas por este processo: id -> WorkUnit
+        self.claimed = {}
+
+    def unit_id(self, keyword, start='', end=''):
+        return f'{self.queue}|{keyword}|{start}|{end}'
+
+    # Método que insere as unidades (palavra-chave, início, fim, prioridade) que ainda não estão na fila.
+    def seed(self, units):
+        raise NotImplementedError
+
+    def claim(self):
+        raise NotImplementedError
+
+    def heartbeat(self):
+        raise NotImplementedError
+
+    def complete(self, unit_id):
+        raise NotImplementedError
+
+    def release(self, unit_id, failed=False):
+        raise NotImplementedError
+
+    def counts(self):
+        raise NotImplementedError
+
+    # Método que devolve à fila tudo o que este processo ainda tem reservado (encerramento sem terminar).
+    def release_all(self):
+        for unit_id in list(self.claimed):
+            self.release(unit_id)
+
+    def describe(self):
+        counts = self.counts()
+        return ', '.join(f'{counts.get(state, 0)} {state}' for state in ('pending', 'leased', 'done', 'failed'))
+
+    def close(self):
+        pass
+
+
+class MongoWorkQueue(WorkQueue):
+    """Fila de trabalho numa coleção do MongoDB (um documento por unidade)."""
+    def __init__(self, collection, queue, owner=None, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        super().__init__(queue, owner, lease_seconds, max_attempts)
+        self.collection = collection
+        self.collection.create_index([('queue', 1), ('state', 1), ('priority', -1)])
+
+    def seed(self, units):
+        operations = [
+            UpdateOne({'_id': self.unit_id(keyword, start, end)},
+                      {'$setOnInsert': {'queue': self.queue, 'keyword': keyword, 'start': start, 'end': end,
+                                        'priority': priority, 'state': 'pending', 'owner': None,
+                                        'lease_until': 0, 'attempts': 0}},
+                      upsert=True)
+            for keyword, start, end, priority in units
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def claim(self):
+        now = time.time()
+        # Leases vencidos sem tentativas sobrando não voltam mais para a fila
+        self.collection.update_many(
+            {'queue': self.queue, 'state': 'leased', 'lease_until': {'$lt': now}, 'attempts': {'$gte': self.max_attempts}},
+            {'$set': {'state': 'failed', 'owner': None}},
+        )
+        doc = self.collection.find_one_and_update(
+            {'queue': self.queue, '$or': [{'state': 'pending'}, {'state': 'leased', 'lease_until': {'$lt': now}}]},
+            {'$set': {'state': 'leased', 'owner': self.owner, 'lease_until': now + self.lease_seconds},
+             '$inc': {'attempts': 1}},
+            sort=[('priority', -1), ('_id', 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            return None
+        unit = WorkUnit(doc['_id'], doc['keyword'], doc['start'], doc['end'])
+        self.claimed[unit.id] = unit
+        return unit
+
+    # Método que renova os leases deste processo. Retorna as unidades perdidas (o lease venceu e outro as pegou).
+    def heartbeat(self):
+        if not self.claimed:
+            return []
+        ids = list(self.claimed)
+        self.collection.update_many(
+            {'_id': {'$in': ids}, 'owner': self.owner, 'state': 'leased'},
+            {'$set': {'lease_until': time.time() + self.lease_seconds}},
+        )
+        owned = {doc['_id'] for doc in self.collection.find({'_id': {'$in': ids}, 'owner': self.owner}, {'_id': 1})}
+        return [self.claimed.pop(unit_id) for unit_id in ids if unit_id not in owned]
+
+    def complete(self, unit_id):
+        self.claimed.pop(unit_id, None)
+        self.collection.update_one({'_id': unit_id, 'owner': self.owner},
+                                   {'$set': {'state': 'done', 'owner': None, 'lease_until': 0}})
+
+    # failed=False (encerramento) não conta como tentativa.
+    def release(self, unit_id, failed=False):
+        self.claimed.pop(unit_id, None)
+        doc = self.collection.find_one({'_id': unit_id, 'owner': self.owner}, {'attempts': 1})
+        if doc is None:
+            return
+        exhausted = failed and doc['attempts'] >= self.max_attempts
+        self.collection.update_one(
+            {'_id': unit_id, 'owner': self.owner},
+            {'$set': {'state': 'failed' if exhausted else 'pending', 'owner': None, 'lease_until': 0},
+             '$inc': {'attempts': 0 if failed else -1}},
+        )
+
+    def counts(self):
+        return {row['_id']: row['count'] for row in self.collection.aggregate([
+            {'$match': {'queue': self.queue}},
+            {'$group': {'_id': '$state', 'count': {'$sum': 1}}},
+        ])}
+
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    Fila de trabalho num arquivo SQLite: para vários processos na mesma máquina (ou testes, sem banco).
+    A reserva roda numa transação BEGIN IMMEDIATE, então dois processos nunca pegam a mesma unidade.
+    """
+    def __init__(self, path, queue, owner=None, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        super().__init__(queue, owner, lease_seconds, max_attempts)
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS work_units (
+                id TEXT PRIMARY KEY,
+                queue TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                start TEXT NOT NULL,
+                "end" TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_until REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )""")
+        self.db.execute('CREATE INDEX IF NOT EXISTS work_units_claim ON work_units (queue, state, priority DESC, id)')
+
+    def transaction(self, statements):
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            result = statements()
+            self.db.execute('COMMIT')
+            return result
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+
+    def seed(self, units):
+        rows = [(self.unit_id(keyword, start, end), self.queue, keyword, start, end, priority)
+                for keyword, start, end, priority in units]
+        self.transaction(lambda: self.db.executemany(
+            'INSERT OR IGNORE INTO work_units (id, queue, keyword, start, "end", priority) VALUES (?, ?, ?, ?, ?, ?)', rows))
+
+    def claim(self):
+        def statements():
+            now = time.time()
+            self.db.execute("UPDATE work_units SET state = 'failed', owner = NULL WHERE queue = ? AND state = 'leased' "
+                            "AND lease_until < ? AND attempts >= ?", (self.queue, now, self.max_attempts))
+            row = self.db.execute(
+                "SELECT id, keyword, start, \"end\" FROM work_units WHERE queue = ? AND "
+                "(state = 'pending' OR (state = 'leased' AND lease_until < ?)) ORDER BY priority DESC, id LIMIT 1",
+                (self.queue, now)).fetchone()
+            if row is not None:
+                self.db.execute("UPDATE work_units SET state = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 "
+                                "WHERE id = ?", (self.owner, now + self.lease_seconds, row[0]))
+            return row
+
+        row = self.transaction(statements)
+        if row is None:
+            return None
+        unit = WorkUnit(*row)
+        self.claimed[unit.id] = unit
+        return unit
+
+    def heartbeat(self):
+        if not self.claimed:
+            return []
+        ids = list(self.claimed)
+        marks = ', '.join('?' * len(ids))
+
+        def statements():
+            self.db.execute(f"UPDATE work_units SET lease_until = ? WHERE id IN ({marks}) AND owner = ? AND state = 'leased'",
+                            (time.time() + self.lease_seconds, *ids, self.owner))
+            return {row[0] for row in self.db.execute(f'SELECT id FROM work_units WHERE id IN ({marks}) AND owner = ?',
+                                                      (*ids, self.owner))}
+
+        owned = self.transaction(statements)
+        return [self.claimed.pop(unit_id) for unit_id in ids if unit_id not in owned]
+
+    def complete(self, unit_id):
+        self.claimed.pop(unit_id, None)
+        self.transaction(lambda: self.db.execute(
+            "UPDATE work_units SET state = 'done', owner = NULL, lease_until = 0 WHERE id = ? AND owner = ?",
+            (unit_id, self.owner)))
+
+    def release(self, unit_id, failed=False):
+        self.claimed.pop(unit_id, None)
+        self.transaction(lambda: self.db.execute(
+            "UPDATE work_units SET state = CASE WHEN ? AND attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "owner = NULL, lease_until = 0, attempts = attempts - ? WHERE id = ? AND owner = ?",
+            (int(failed), self.max_attempts, 0 if failed else 1, unit_id, self.owner)))
+
+    def counts(self):
+        return dict(self.db.execute('SELECT state, COUNT(*) FROM work_units WHERE queue = ? GROUP BY state', (self.queue,)))
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,119 @@
+import json
+import os
+from pymongo import InsertOne, DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+# Escritor em lote das coleções de notícias aceitas e não aceitas.
+# Acumula as operações em memória e grava tudo com bulk_write (não ordenado), trocando vários round trips
+# pelo túnel SSH por item por um único round trip por coleção a cada lote.
+class BufferedNewsWriter:
+    def __init__(self, accepted_collection, unaccepted_collection, batch_size=100, logger=None):
+        self.accepted_collection = accepted_collection
+        self.unaccepted_collection = unaccepted_collection
+        self.batch_size = batch_size
+        self.logger = logger
+
+        # Documentos aceitos aguardando o insert.
+        self.pending_accepted = []
+        # Operação pendente na coleção de não aceitos, por URL (a última decisão sobre a URL é a que vale).
+        self.pending_unaccepted = {}
+
+    def __len__(self):
+        return len(self.pending_accepted) + len(self.pending_unaccepted)
+
+    # Método que enfileira uma notícia aceita: insert em aceitos + remoção da URL dos não aceitos.
+    def add_accepted(self, data):
+        self.pending_accepted.append(data)
+        self.pending_unaccepted[data.get('url')] = ('delete', data.get('url'))
+        return self.is_full()
+
+    # Método que enfileira uma notícia não aceita: upsert só com a URL (não duplica se já existir).
+    def add_unaccepted(self, url):
+        self.pending_unaccepted[url] = ('upsert', url)
+        return self.is_full()
+
+    def is_full(self):
+        return len(self) >= self.batch_size
+
+    # Método que grava as operações pendentes. Retorna False se o banco falhou (as pendências continuam no buffer).
+    def flush(self):
+        if not len(self):
+            return True
+
+        if self.pending_accepted:
+            try:
+                result = self.accepted_collection.bulk_write(
+                    [InsertOne(data) for data in self.pending_accepted], ordered=False)
+                self.log_info(f"💾 [MONGODB] Lote gravado: {result.inserted_count} notícias ACEITAS.")
+            except BulkWriteError as e:
+                # Erros por documento (ex: duplicata) não são recuperáveis com nova tentativa.
+                details = e.details or {}
+                self.log_error(
+                    f"⚠️ [MONGODB] {len(details.get('writeErrors', []))} notícias aceitas recusadas pelo banco "
+                    f"({details.get('nInserted', 0)} inseridas).")
+            except PyMongoError as e:
+                self.log_error(f"❌ [MONGODB] Falha ao gravar lote de aceitas ({len(self.pending_accepted)} pendentes): {e}")
+                return False
+            self.pending_accepted = []
+
+        if self.pending_unaccepted:
+            operations = []
+            for action, url in self.pending_unaccepted.values():
+                if action == 'delete':
+                    operations.append(DeleteOne({'url': url}))
+                else:
+                    operations.append(UpdateOne({'url': url}, {'$setOnInsert': {'url': url}}, upsert=True))
+            try:
+                result = self.unaccepted_collection.bulk_write(operations, ordered=False)
+                self.log_info(
+                    f"💾 [MONGODB] Lote gravado: {result.upserted_count} URLs UNACCEPTED novas, "
+                    f"{result.matched_count} já existiam, {result.deleted_count} removidas.")
+            except BulkWriteError as e:
+                details = e.details or {}
+                self.log_error(f"⚠️ [MONGODB] {len(details.get('writeErrors', []))} operações em unaccepted recusadas pelo banco.")
+            except PyMongoError as e:
+                self.log_error(f"❌ [MONGODB] Falha ao gravar lote de unaccepted ({len(self.pending_unaccepted)} pendentes): {e}")
+                return False
+            self.pending_unaccepted = {}
+
+        return True
+
+    # Método que salva em disco o que não pôde ser gravado no banco (ex: túnel caiu no encerramento).
+    def dump(self, path):
+        with open(path, 'a', encoding='utf-8') as f:
+            for data in self.pending_accepted:
+                # O _id gerado pelo pymongo é descartado; o banco gera outro na próxima tentativa.
+                data = {key: value for key, value in data.items() if key != '_id'}
+                f.write(json.dumps({'action': 'insert', 'data': data}, ensure_ascii=False, default=str) + '\n')
+            for action, url in self.pending_unaccepted.values():
+                f.write(json.dumps({'action': action, 'url': url}, ensure_ascii=False) + '\n')
+        count = len(self)
+        self.pending_accepted = []
+        self.pending_unaccepted = {}
+        return count
+
+    # Método que recoloca no buffer as operações salvas por dump() numa execução anterior.
+    def restore(self, path):
+        if not os.path.exists(path):
+            return 0
+
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry['action'] == 'insert':
+                    self.pending_accepted.append(entry['data'])
+                else:
+                    self.pending_unaccepted[entry['url']] = (entry['action'], entry['url'])
+                count += 1
+        os.remove(path)
+        return count
+
+    def log_info(self, message):
+        if self.logger: self.logger.info(message)
+
+    def log_error(self, message):
+        if self.logger: self.logger.error(message)
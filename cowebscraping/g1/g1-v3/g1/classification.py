@@ -0,0 +1,42 @@
+from time import perf_counter
+
+from .keywords import VALIDATION_KEYWORDS
+from crawler_common.keyword_matcher import KeywordMatcher
+from crawler_common.normalized_text import normalize_text
+
+# Padrões de validação compilados uma única vez por processo (o spider e cada worker têm o seu).
+VALIDATION_MATCHER = KeywordMatcher(VALIDATION_KEYWORDS)
+
+
+# Método que preenche a lista de gangues ['gangs']
+def search_gangs(art):
+    if not art: return []
+    return VALIDATION_MATCHER.findall(art, 'GANGS')
+
+
+# Método que preenche o atributo 'accepted_by'.
+def accept_article(art):
+    if not art: return False
+    result = VALIDATION_MATCHER.scan(art)
+    org_patterns = VALIDATION_KEYWORDS['GANGS'] + VALIDATION_KEYWORDS['ORGANIZED CRIME']
+    # 'pcc' como palavra isolada aceita o grupo de cara (registrando o primeiro padrão da lista, como antes).
+    if 'pcc' in result.normalized.words:
+        org = org_patterns[0] if org_patterns else False
+    else:
+        org = result.first('GANGS', 'ORGANIZED CRIME')
+    act = result.first('DRUGS', 'ARMED INTERACTIONS')
+    return f"{org} - {act}" if (org and act) else False
+
+
+# Método que classifica o artigo de uma vez: devolve (accepted_by, gangs). As gangues só são buscadas se aceito.
+def classify_article(art):
+    normalized = normalize_text(art) if art else art
+    accepted = accept_article(normalized)
+    return accepted, (search_gangs(normalized) if accepted else None)
+
+
+# Método executado nos workers do ClassificationPipeline: classifica e mede o tempo gasto fora do reator.
+def timed_classify_article(art):
+    start = perf_counter()
+    accepted, gangs = classify_article(art)
+    return accepted, gangs, perf_counter() - start
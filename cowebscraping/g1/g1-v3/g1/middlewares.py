@@ -4,10 +4,14 @@
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.http import TextResponse
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from crawler_common.render_cache import RenderDecisionCache
+
 
 class G1SpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -101,3 +105,93 @@ class G1DownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info('Spider opened: %s' % spider.name)
+
+
+class StaticFirstMiddleware:
+    """
+    Baixa primeiro por HTTP simples e só escala para o Playwright quando o conteúdo não vem no HTML.
+
+    Vale para as requisições cujo callback está em `spider.static_first_callbacks` e que não pediram o
+    navegador explicitamente (meta 'playwright'). A resposta estática é conferida com os seletores de conteúdo
+    do spider (`article_content_selector` em XPath e/ou `body_selectors` em CSS): se todos vierem vazios, a mesma
+    requisição é refeita com o Playwright. O caminho que trouxe o conteúdo fica gravado por padrão de URL e por
+    domínio (ver render_cache.RenderDecisionCache), e as próximas URLs do mesmo padrão vão direto para ele.
+    """
+    def __init__(self, cache_file='render_decisions_{}.json', cache_ttl=0, stats=None):
+        self.cache_file = cache_file
+        self.cache_ttl = cache_ttl
+        self.stats = stats
+        self.cache = RenderDecisionCache()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('STATIC_FIRST_ENABLED', True):
+            raise NotConfigured
+        middleware = cls(
+            cache_file=crawler.settings.get('STATIC_FIRST_CACHE_FILE', 'render_decisions_{}.json'),
+            cache_ttl=crawler.settings.getfloat('STATIC_FIRST_CACHE_TTL', 0),
+            stats=crawler.stats,
+        )
+        crawler.signals.connect(middleware.open_spider, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.close_spider, signal=signals.spider_closed)
+        return middleware
+
+    def open_spider(self, spider):
+        self.cache = RenderDecisionCache.load(self.cache_file.format(spider.name), self.cache_ttl)
+        if self.cache.entries:
+            spider.logger.info(f"🧭 Decisões de renderização carregadas: {self.cache.describe()}")
+
+    def close_spider(self, spider):
+        try:
+            self.cache.save()
+        except OSError as e:
+            spider.logger.error(f"Erro ao salvar as decisões de renderização: {e}")
+        spider.logger.info(f"🧭 Decisões de renderização: {self.cache.describe()}")
+
+    def applies_to(self, request, spider):
+        callback = getattr(request.callback, '__name__', None)
+        return callback in getattr(spider, 'static_first_callbacks', ()) and (
+            'playwright' not in request.meta or request.meta.get('static_first'))
+
+    def process_request(self, request, spider):
+        if not self.applies_to(request, spider) or 'static_first' in request.meta:
+            return None
+        if self.cache.mode(request.url) == 'browser':
+            # Padrão que só funciona no navegador: vai direto, sem a tentativa estática
+            request.meta['playwright'] = True
+            request.meta['static_first'] = 'browser'
+            self.stats.inc_value('static_first/browser_direct')
+        else:
+            request.meta['static_first'] = 'static'
+        return None
+
+    def process_response(self, request, response, spider):
+        step = request.meta.get('static_first')
+        if step is None or not self.applies_to(request, spider) or response.status != 200:
+            return response
+
+        if self.has_content(response, spider):
+            self.cache.record(request.url, step if step != 'escalated' else 'browser', tested=step != 'browser')
+            self.stats.inc_value(f'static_first/{step}_ok')
+            return response
+
+        if step == 'static':
+            # HTML sem o conteúdo (renderizado por JS): refaz a mesma requisição pelo Playwright
+            self.stats.inc_value('static_first/escalated')
+            spider.logger.debug(f"Conteúdo vazio no HTML estático, usando o navegador: {request.url}")
+            return request.replace(meta={**request.meta, 'playwright': True, 'static_first': 'escalated'},
+                                   dont_filter=True)
+        # Vazio também no navegador: a página não tem o conteúdo, a decisão fica como estava
+        self.stats.inc_value('static_first/empty')
+        return response
+
+    # Método que confere se algum dos seletores de conteúdo do spider encontrou texto na resposta.
+    @staticmethod
+    def has_content(response, spider):
+        if not isinstance(response, TextResponse):
+            return False
+        xpath = getattr(spider, 'article_content_selector', None)
+        if xpath and any(text.strip() for text in response.xpath(xpath).getall()):
+            return True
+        return any(text.strip() for selector in getattr(spider, 'body_selectors', ())
+                   for text in response.css(selector).getall())
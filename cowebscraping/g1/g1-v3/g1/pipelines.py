@@ -1,9 +1,25 @@
-from sshtunnel import open_tunnel
-import pymongo 
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import deferred_from_coro
+from twisted.internet import defer
 import sys
+import os
 import yaml
 
 from .items import G1Item
+from .bulk_writer import BufferedNewsWriter
+from crawler_common.id_allocator import IdEventAllocator, AsyncIdEventAllocator
+from crawler_common.mongo_pool import acquire_mongo_client, close_spider_without_database
+from .classification import classify_article, timed_classify_article
+
+# Driver assíncrono (opcional, só para o AsyncMongoDBPipeline): pip install motor
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:
+    AsyncIOMotorClient = None
 
 # Abre as credenciais do MongoDB que estão no arquivo config.yaml
 try:
@@ -15,51 +31,189 @@ except FileNotFoundError:
     # O programa terminou com erro (com o 0 seria sucesso).
     sys.exit(1)
 
+# Etapa opcional que tira a validação (accept_article + search_gangs) da thread do reator, usando um pool de processos.
+# Ativação: scrapy crawl scrape -s CLASSIFICATION_ENABLED=True [-s CLASSIFICATION_WORKERS=4]
+class ClassificationPipeline:
+    def __init__(self, workers, stats):
+        self.workers = workers
+        self.stats = stats
+        self.executor = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('CLASSIFICATION_ENABLED'):
+            raise NotConfigured
+        workers = crawler.settings.getint('CLASSIFICATION_WORKERS', os.cpu_count() or 1)
+        return cls(workers, crawler.stats)
+
+    # Método que avisa o spider para não classificar nos callbacks e sobe os workers (0 workers = modo inline).
+    def open_spider(self, spider):
+        spider.deferred_classification = True
+        if self.workers > 0:
+            try:
+                # 'spawn' evita herdar por fork as threads do Playwright/reator
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+                spider.logger.info(f"Classificação em {self.workers} processo(s) fora do reator.")
+            except (OSError, NotImplementedError) as e:
+                spider.logger.warning(f"⚠️ Não foi possível criar o pool de classificação ({e}). Classificando inline.")
+        else:
+            spider.logger.info("Classificação inline (CLASSIFICATION_WORKERS = 0).")
+
+    # Método que encerra os workers e mostra quanto tempo de CPU deixou de ser gasto no reator.
+    def close_spider(self, spider):
+        if self.executor:
+            self.executor.shutdown(wait=True)
+        offloaded_time = self.stats.get_value('classification/offloaded_time', 0)
+        offloaded_items = self.stats.get_value('classification/offloaded_items', 0)
+        inline_items = self.stats.get_value('classification/inline_items', 0)
+        spider.logger.info(
+            f"⏱️ Classificação: {offloaded_items} itens nos workers ({offloaded_time:.2f}s poupados do reator), "
+            f"{inline_items} itens inline.")
+
+    # Método que envia o artigo para o pool e devolve um Deferred (o reator segue livre até o resultado chegar).
+    def process_item(self, item, spider):
+        if self.executor is None:
+            return self.classify_inline(item, spider)
+
+        try:
+            future = self.executor.submit(timed_classify_article, item.get('article'))
+        except (BrokenProcessPool, RuntimeError) as e:
+            spider.logger.warning(f"⚠️ Pool de classificação indisponível ({e}). Seguindo inline.")
+            self.executor = None
+            return self.classify_inline(item, spider)
+
+        # Importado aqui para não instalar o reator padrão antes do AsyncioSelectorReactor do Scrapy.
+        from twisted.internet import reactor
+
+        deferred = defer.Deferred()
+        future.add_done_callback(lambda done: reactor.callFromThread(deferred.callback, done))
+        deferred.addCallback(self.on_classified, item, spider)
+        return deferred
+
+    def on_classified(self, future, item, spider):
+        try:
+            accepted, gangs, elapsed = future.result()
+        except Exception as e:
+            spider.logger.warning(f"⚠️ Falha no worker de classificação ({e}). Classificando inline: {item.get('url')}")
+            return self.classify_inline(item, spider)
+
+        self.stats.inc_value('classification/offloaded_items')
+        self.stats.inc_value('classification/offloaded_time', elapsed)
+        return spider.apply_classification(item, accepted, gangs)
+
+    def classify_inline(self, item, spider):
+        accepted, gangs = classify_article(item.get('article'))
+        self.stats.inc_value('classification/inline_items')
+        return spider.apply_classification(item, accepted, gangs)
+
+
 # MongoDB LaMCAD
 class MongoDBPipeline:
-    def __init__(self):
+    def __init__(self, batch_size=100, flush_interval=5.0, id_block_size=100, counters_collection='counters'):
         self.mongodb_uri = configs['mongodb_lamcad']['uri']
         self.mongodb_database = configs['mongodb_lamcad']['database']
         self.mongodb_accepted_news_collection = configs['mongodb_lamcad']['accepted_news_collection']
         self.mongodb_unaccepted_news_collection = configs['mongodb_lamcad']['unaccepted_news_collection']
         
-        self.server = None
+        self.mongo = None
         self.client = None
+        
+        # Escrita em lote: grava quando o buffer enche ou a cada flush_interval segundos.
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.writer = None
+        self.flush_loop = None
+        
+        # id_event reservado em blocos numa coleção de contadores (único entre spiders paralelos).
+        self.id_block_size = id_block_size
+        self.mongodb_counters_collection = counters_collection
+        self.id_allocator = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        # Com MONGODB_ASYNC = True quem grava é o AsyncMongoDBPipeline
+        if crawler.settings.getbool('MONGODB_ASYNC'):
+            raise NotConfigured
+        return cls(
+            batch_size=crawler.settings.getint('MONGODB_BATCH_SIZE', 100),
+            flush_interval=crawler.settings.getfloat('MONGODB_FLUSH_INTERVAL', 5.0),
+            id_block_size=crawler.settings.getint('ID_EVENT_BLOCK_SIZE', 100),
+            counters_collection=crawler.settings.get('ID_EVENT_COUNTERS_COLLECTION', 'counters'),
+        )
 
-    # Método que inicia o pipeline settando as credenciais do arquivo .yaml no SSH e conectando ao MongoDB.
+    # Arquivo onde ficam as gravações que não chegaram ao banco no encerramento (reaplicadas na próxima execução).
+    def pending_writes_file(self, spider):
+        return f'pending_writes_{spider.name}.jsonl'
+
+    # Método que inicia o pipeline pegando o túnel SSH e o cliente do MongoDB no pool do processo.
     def open_spider(self, spider):
-        # Fazendo a conexão ssh com o servidor
-        lamcad_configs = configs['lamcad']
         try:
-            self.server = open_tunnel(
-                (lamcad_configs['server_ip'], lamcad_configs['server_port']),
-                ssh_username=lamcad_configs['ssh_username'],
-                ssh_password=lamcad_configs['ssh_password'],
-                local_bind_address=(lamcad_configs['local_bind_ip'], lamcad_configs['local_bind_port']),
-                remote_bind_address=(lamcad_configs['remote_bind_ip'], lamcad_configs['remote_bind_port'])
-            )
-            self.server.start()
+            # Túnel e cliente compartilhados (porta local livre escolhida automaticamente)
+            self.mongo = acquire_mongo_client(configs['lamcad'], self.mongodb_uri)
             spider.logger.info(
-                f"Conexão com o LamCAD criada com o seguinte IP e porta: {self.server.local_bind_address}")
+                f"Conexão com o LamCAD criada na porta local: {self.mongo.local_bind_port}")
 
             # Obtendo acesso ao banco de dados
-            self.client = pymongo.MongoClient(self.mongodb_uri)
+            self.client = self.mongo.client
             database = self.client[self.mongodb_database]
             self.accepted_news_collection = database[self.mongodb_accepted_news_collection]
             self.unaccepted_news_collection = database[self.mongodb_unaccepted_news_collection]
+
+            self.id_allocator = IdEventAllocator(
+                database[self.mongodb_counters_collection], self.mongodb_accepted_news_collection,
+                block_size=self.id_block_size)
+            last_id_event = self.id_allocator.seed(self.accepted_news_collection)
+            spider.logger.info(f"Contador de id_event alinhado (maior id no banco: {last_id_event}).")
         except Exception as e:
             spider.logger.error(f"Erro crítico ao conectar no banco ou SSH: {e}")
+            close_spider_without_database(spider)
+            return
+
+        self.writer = BufferedNewsWriter(
+            self.accepted_news_collection, self.unaccepted_news_collection,
+            batch_size=self.batch_size, logger=spider.logger)
+
+        restored = self.writer.restore(self.pending_writes_file(spider))
+        if restored:
+            spider.logger.info(f"♻️ [MONGODB] {restored} gravações pendentes da execução anterior recolocadas na fila.")
+
+        if self.flush_interval > 0:
+            from twisted.internet import task
+            self.flush_loop = task.LoopingCall(self.flush)
+            self.flush_loop.start(self.flush_interval, now=False)
             
             
-    # Método que interrompe o pipeline.
+    # Método que interrompe o pipeline, gravando antes tudo o que ainda está no buffer.
     def close_spider(self, spider):
-        if self.client:
-            self.client.close()
-        if self.server:
-            self.server.stop()
+        if self.flush_loop and self.flush_loop.running:
+            self.flush_loop.stop()
+
+        if self.writer and len(self.writer) and not self.flush():
+            # Banco indisponível no encerramento: nada se perde, as gravações vão para o disco.
+            pending_file = self.pending_writes_file(spider)
+            count = self.writer.dump(pending_file)
+            spider.logger.error(f"❌ [MONGODB] {count} gravações salvas em {pending_file} para a próxima execução.")
+
+        # Devolve o cliente ao pool (o túnel fecha quando ninguém mais o usa)
+        if self.mongo:
+            self.mongo.release()
+
+    # Método que grava o buffer; se o banco falhar, reabre o túnel (caso tenha caído) e tenta de novo.
+    def flush(self):
+        if self.writer.flush():
+            return True
+        try:
+            if self.mongo.ensure_connected():
+                return self.writer.flush()
+        except Exception as e:
+            self.writer.log_error(f"❌ [MONGODB] Falha ao reabrir o túnel SSH: {e}")
+        return False
     
-    # Método que insere as notícias aceitas e não aceitas nas respectivas coleções.
+    # Método que enfileira as notícias aceitas e não aceitas para as respectivas coleções.
     def process_item(self, item, spider):
+        if self.writer is None:
+            return item
+
         # Transforma o item Scrapy em um dicionário Python
         data = dict(G1Item(item))
         
@@ -68,30 +222,19 @@ class MongoDBPipeline:
 
         if is_accepted:
             self.set_news_data(data)
-            print(f"✅ [MONGODB] Inserindo notícia ACEITA: {data.get('url')}")
+            print(f"✅ [MONGODB] Enfileirando notícia ACEITA: {data.get('url')}")
             
-            # Insere na coleção de aceitos com todos os dados
-            self.accepted_news_collection.insert_one(data)
-            
-            # Remove da coleção de não aceitos se já estiver lá (para evitar duplicidade entre coleções)
-            self.unaccepted_news_collection.delete_one({'url': data.get('url')})
+            # Insere na coleção de aceitos com todos os dados e remove da coleção de não aceitos
+            # (para evitar duplicidade entre coleções)
+            is_full = self.writer.add_accepted(data)
             
         else:
-            # Verifica se a URL já existe na coleção para não duplicar
-            if not self.unaccepted_news_collection.find_one({'url': data.get('url')}):
-                print(f"🚫 [MONGODB] Salvando na coleção UNACCEPTED (Apenas URL): {data.get('url')}")
-                
-                
-                # Formatação da notícia não aceita: composta pelo id (preenchido automaticamente pelo MongoDB) e pela URL
-                minimal_data = {
-                    'url': data.get('url')
-                }
-                
-                self.unaccepted_news_collection.insert_one(minimal_data)
-            else:
-                # Exibe no terminal se a URL já está na coleção de notícias não aceitas.
-                print(f"⏭️ URL já existe no Unaccepted (Pulando): {data.get('url')}")
-                pass
+            # Upsert só com a URL: não duplica se ela já estiver na coleção de não aceitas
+            print(f"🚫 [MONGODB] Enfileirando na coleção UNACCEPTED (Apenas URL): {data.get('url')}")
+            is_full = self.writer.add_unaccepted(data.get('url'))
+
+        if is_full:
+            self.flush()
                 
         return item
         
@@ -101,27 +244,22 @@ class MongoDBPipeline:
         return self.accepted_news_collection.count_documents({}) # sem filtro, ou seja, qualquer coisa escrita vai somar no contador
         
     
+    # Método que devolve o próximo id_event (reservado em blocos pelo IdEventAllocator).
     def get_next_id_event(self): 
-        last_record = self.accepted_news_collection.find_one(sort=[('id_event', -1)])
-        
-        if last_record and 'id_event' in last_record:
-            return last_record['id_event'] + 1
-            
-        # é como se tivesse um else aqui, para caso o banco esteja vazio, daí retorna 1.
-        return 1 
+        return self.id_allocator.next()
 
 
 
     # Método que adiciona os campos que serão preenchidos via LLM do Davi 
-    def set_news_data(self, news):
-        # Define todos os campos extras como None e insere o id obtido em get_next_id_event.
+    def set_news_data(self, news, id_event=None):
+        # Define todos os campos extras como None e insere o id recebido (ou obtido em get_next_id_event).
         
         news['manual_relevance_class'] = None
         news['automatic_relevance_class'] = None
         news['relevance_model'] = None
         news['certainty_level'] = None
         news['relevance_classification_date'] = None
-        news['id_event'] = self.get_next_id_event()
+        news['id_event'] = id_event if id_event is not None else self.get_next_id_event()
         news['confidence_relevance_class'] = None
         news['resumo'] = None
         news['data_evento'] = None
@@ -138,3 +276,105 @@ class MongoDBPipeline:
         news['ator2_nome'] = None
         news['ator2_cod'] = None
         news['tipo_relacao_entre_atores'] = None
+
+
+# Versão assíncrona do MongoDBPipeline (motor/asyncio): process_item é uma corrotina e as gravações rodam
+# no loop do asyncio, sem travar o navegador do Playwright. No máximo MONGODB_MAX_IN_FLIGHT gravações ficam
+# em andamento; com a fila cheia o process_item espera, o que segura o crawler quando o banco está lento.
+# Ativação: MONGODB_ASYNC = True (requer o pacote motor).
+class AsyncMongoDBPipeline(MongoDBPipeline):
+    def __init__(self, max_in_flight=16, id_block_size=100, counters_collection='counters', stats=None):
+        super().__init__(id_block_size=id_block_size, counters_collection=counters_collection)
+        self.max_in_flight = max_in_flight
+        self.stats = stats
+        self.database = None
+        self.slots = None
+        self.tasks = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('MONGODB_ASYNC'):
+            raise NotConfigured
+        if AsyncIOMotorClient is None:
+            raise NotConfigured("MONGODB_ASYNC requer o pacote 'motor' (pip install motor).")
+        return cls(
+            max_in_flight=crawler.settings.getint('MONGODB_MAX_IN_FLIGHT', 16),
+            id_block_size=crawler.settings.getint('ID_EVENT_BLOCK_SIZE', 100),
+            counters_collection=crawler.settings.get('ID_EVENT_COUNTERS_COLLECTION', 'counters'),
+            stats=crawler.stats,
+        )
+
+    def open_spider(self, spider):
+        return deferred_from_coro(self.open(spider))
+
+    def close_spider(self, spider):
+        return deferred_from_coro(self.close(spider))
+
+    # Método que pega no pool o túnel SSH compartilhado e um cliente assíncrono.
+    async def open(self, spider):
+        try:
+            self.mongo = acquire_mongo_client(configs['lamcad'], self.mongodb_uri, AsyncIOMotorClient)
+            spider.logger.info(
+                f"Conexão com o LamCAD criada na porta local: {self.mongo.local_bind_port}")
+
+            self.client = self.mongo.client
+            database = self.client[self.mongodb_database]
+            self.accepted_news_collection = database[self.mongodb_accepted_news_collection]
+            self.unaccepted_news_collection = database[self.mongodb_unaccepted_news_collection]
+
+            self.id_allocator = AsyncIdEventAllocator(
+                database[self.mongodb_counters_collection], self.mongodb_accepted_news_collection,
+                block_size=self.id_block_size)
+            last_id_event = await self.id_allocator.seed(self.accepted_news_collection)
+            spider.logger.info(f"Contador de id_event alinhado (maior id no banco: {last_id_event}).")
+        except Exception as e:
+            spider.logger.error(f"Erro crítico ao conectar no banco ou SSH: {e}")
+            close_spider_without_database(spider)
+            return
+
+        self.database = database
+        self.slots = asyncio.Semaphore(self.max_in_flight)
+
+    # Método que espera as gravações em andamento antes de fechar a conexão.
+    async def close(self, spider):
+        if self.tasks:
+            spider.logger.info(f"Aguardando {len(self.tasks)} gravações pendentes no MongoDB...")
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.mongo:
+            self.mongo.release()
+
+    async def process_item(self, item, spider):
+        if self.database is None:
+            return item
+
+        # Backpressure: sem vaga na fila de gravações, o item espera aqui (e o Scrapy deixa de alimentar o pipeline).
+        if self.slots.locked() and self.stats:
+            self.stats.inc_value('mongodb/backpressure_waits')
+        await self.slots.acquire()
+
+        task = asyncio.ensure_future(self.write(dict(G1Item(item)), spider))
+        self.tasks.add(task)
+        task.add_done_callback(lambda done: self.on_write_done(done, spider))
+        return item
+
+    def on_write_done(self, task, spider):
+        self.tasks.discard(task)
+        self.slots.release()
+        if not task.cancelled() and task.exception():
+            spider.logger.error(f"❌ [MONGODB] Falha na gravação assíncrona: {task.exception()}")
+
+    # Método que grava a notícia nas respectivas coleções (mesmas regras do MongoDBPipeline).
+    async def write(self, data, spider):
+        if data.get('accepted_by'):
+            self.set_news_data(data, id_event=await self.id_allocator.next())
+            print(f"✅ [MONGODB] Inserindo notícia ACEITA: {data.get('url')}")
+            await self.accepted_news_collection.insert_one(data)
+            await self.unaccepted_news_collection.delete_one({'url': data.get('url')})
+        else:
+            # Upsert só com a URL: não duplica se ela já estiver na coleção de não aceitas
+            result = await self.unaccepted_news_collection.update_one(
+                {'url': data.get('url')}, {'$setOnInsert': {'url': data.get('url')}}, upsert=True)
+            if result.upserted_id is not None:
+                print(f"🚫 [MONGODB] Salvando na coleção UNACCEPTED (Apenas URL): {data.get('url')}")
+            else:
+                print(f"⏭️ URL já existe no Unaccepted (Pulando): {data.get('url')}")
@@ -0,0 +1,110 @@
+from scrapy_playwright.page import PageMethod
+
+# Por que usar um script de JS? Porque o G1 possui rolagem infinita.
+# A ideia é rolar até encontrar a última notícia. Após encontrar o final da página, extrair cada uma das notícias do dia.
+
+# Lógica do código:
+# 0. Espera (até timeoutMs) a lista de resultados ou o aviso de busca sem resultados. Sem a lista, retorna
+#    reason 'no-list' (empty diz se o aviso apareceu): a janela não tem notícias, não é uma falha.
+# 1. Conta os cards da lista.
+# 2. Desce tudo.
+# 3. Espera os próximos cards chegarem (MutationObserver na lista), sem pausa fixa:
+#    - chegaram cards novos: repete o processo na hora;
+#    - nenhuma requisição (fetch/XHR) começou logo após a rolagem (quietMs) e nenhuma está em andamento:
+#      não há mais nada para carregar, acabou;
+#    - passou idleMs sem card novo: acabou.
+# 4. Para também ao atingir maxItems cards ou maxScrolls rolagens (0 = sem limite) e marca a página como saturada.
+# Retorna quantos cards, quantas rolagens, se saturou, o motivo da parada e o tempo gasto rolando (ms).
+SCROLL_SCRIPT = """
+    async ({listSelector, itemSelector, emptySelector, maxScrolls, maxItems, idleMs, quietMs, timeoutMs}) => {
+        const started = performance.now();
+        const count = () => document.querySelectorAll(itemSelector).length;
+        const waitForList = () => new Promise(resolve => {
+            const found = () => document.querySelector(listSelector) || (emptySelector && document.querySelector(emptySelector));
+            if (found()) return resolve();
+            const finish = () => { observer.disconnect(); clearTimeout(timer); resolve(); };
+            const observer = new MutationObserver(() => { if (found()) finish(); });
+            observer.observe(document.documentElement, {childList: true, subtree: true});
+            const timer = setTimeout(finish, timeoutMs);
+        });
+        await waitForList();
+        const list = document.querySelector(listSelector);
+        if (!list) {
+            return {items: 0, scrolls: 0, saturated: false, reason: 'no-list',
+                    empty: Boolean(emptySelector && document.querySelector(emptySelector)),
+                    elapsed: Math.round(performance.now() - started)};
+        }
+
+        // Rastreia as requisições da página (fetch/XHR): quando começou a última e quantas estão em andamento.
+        if (!window.__scrollNetwork) {
+            const net = window.__scrollNetwork = {lastStart: 0, pending: 0};
+            const track = (promise) => {
+                net.lastStart = performance.now(); net.pending++;
+                return promise.finally(() => { net.pending--; });
+            };
+            const originalFetch = window.fetch;
+            window.fetch = (...args) => track(originalFetch(...args));
+            const originalSend = XMLHttpRequest.prototype.send;
+            XMLHttpRequest.prototype.send = function (...args) {
+                track(new Promise(resolve => this.addEventListener('loadend', resolve)));
+                return originalSend.apply(this, args);
+            };
+        }
+        const net = window.__scrollNetwork;
+
+        const waitForNewItems = (before, scrolledAt) => new Promise(resolve => {
+            let observer = null, poll = null;
+            const finish = (grew) => { observer.disconnect(); clearInterval(poll); resolve(grew); };
+            observer = new MutationObserver(() => { if (count() > before) finish(true); });
+            observer.observe(list, {childList: true, subtree: true});
+            poll = setInterval(() => {
+                const waited = performance.now() - scrolledAt;
+                if (count() > before) finish(true);
+                else if (waited >= quietMs && net.lastStart < scrolledAt && !net.pending) finish(false);
+                else if (waited >= idleMs) finish(false);
+            }, 50);
+        });
+
+        let scrolls = 0;
+        let reason = 'end';
+        while (true) {
+            if (maxItems && count() >= maxItems) { reason = 'max-items'; break; }
+            if (maxScrolls && scrolls >= maxScrolls) { reason = 'max-scrolls'; break; }
+
+            const before = count();
+            const scrolledAt = performance.now();
+            window.scrollTo(0, document.body.scrollHeight);
+            scrolls++;
+            if (!(await waitForNewItems(before, scrolledAt))) break;
+        }
+        return {items: count(), scrolls: scrolls, saturated: reason !== 'end', reason: reason,
+                elapsed: Math.round(performance.now() - started)};
+    }
+"""
+
+# Espera máxima (ms) por cards novos depois de uma rolagem que disparou requisições.
+SCROLL_IDLE_MS = 2000
+# Sem nenhuma requisição de rede até este tempo (ms) depois da rolagem, a lista chegou ao fim.
+SCROLL_QUIET_MS = 400
+
+
+# Método que monta a PageMethod do Playwright que roda o driver de rolagem. A espera pela lista (ou pelo aviso de
+# busca sem resultados, empty_selector) é feita dentro do script: uma busca vazia não vira erro de timeout.
+# O resultado do driver fica em response.meta['playwright_page_methods'][-1].result (ver scroll_report).
+def scroll_page_methods(list_selector, item_selector, empty_selector=None, max_scrolls=0, max_items=0,
+                        idle_ms=SCROLL_IDLE_MS, quiet_ms=SCROLL_QUIET_MS, timeout=15000):
+    return [
+        PageMethod("evaluate", SCROLL_SCRIPT, {
+            'listSelector': list_selector, 'itemSelector': item_selector, 'emptySelector': empty_selector,
+            'maxScrolls': max_scrolls, 'maxItems': max_items, 'idleMs': idle_ms, 'quietMs': quiet_ms,
+            'timeoutMs': timeout,
+        }),
+    ]
+
+
+# Método que devolve o relatório do driver de rolagem da resposta (dict vazio se ele não rodou).
+def scroll_report(response):
+    page_methods = response.meta.get('playwright_page_methods') or []
+    if not page_methods:
+        return {}
+    return page_methods[-1].result or {}
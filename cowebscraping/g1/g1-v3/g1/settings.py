@@ -1,5 +1,14 @@
 # settings.py
 
+import os
+import sys
+
+# Módulos divididos com o outro projeto (cowebscraping/crawler_common): a pasta cowebscraping entra no sys.path
+# para o `scrapy crawl` rodado na pasta do scrapy.cfg (o run_spiders.py já roda de lá)
+cowebscraping_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+if cowebscraping_dir not in sys.path:
+    sys.path.append(cowebscraping_dir)
+
 BOT_NAME = 'g1'
 
 SPIDER_MODULES = ['g1.spiders']
@@ -40,3 +49,39 @@ LOG_LEVEL = 'INFO'
 # Configurações padrão do Scrapy
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
 # FEED_EXPORT_ENCODING = "utf-8"
+
+# --- CLASSIFICAÇÃO FORA DO REATOR (opcional) ---
+# Envia accept_article + search_gangs para um pool de processos (g1.pipelines.ClassificationPipeline).
+CLASSIFICATION_ENABLED = False
+# Quantidade de processos do pool. 0 = classifica inline, na própria thread do reator.
+# CLASSIFICATION_WORKERS = 4
+
+
+# --- ESCRITA EM LOTE NO MONGODB ---
+# Quantidade de operações acumuladas antes de um bulk_write.
+MONGODB_BATCH_SIZE = 100
+# Intervalo máximo (segundos) entre gravações, mesmo com o buffer incompleto.
+MONGODB_FLUSH_INTERVAL = 5.0
+
+# --- ALOCAÇÃO DE id_event ---
+# Quantidade de ids reservada por round trip na coleção de contadores (compartilhada entre spiders).
+ID_EVENT_BLOCK_SIZE = 100
+ID_EVENT_COUNTERS_COLLECTION = 'counters'
+
+# --- GRAVAÇÃO ASSÍNCRONA NO MONGODB (opcional, requer: pip install motor) ---
+# Troca o MongoDBPipeline pelo AsyncMongoDBPipeline, que não bloqueia o reator do asyncio.
+MONGODB_ASYNC = False
+# Máximo de gravações em andamento; com a fila cheia o crawler espera o banco (backpressure).
+MONGODB_MAX_IN_FLIGHT = 16
+
+
+# --- NOTÍCIAS POR HTTP SIMPLES PRIMEIRO ---
+# O StaticFirstMiddleware baixa as notícias sem navegador e só usa o Playwright se os body_selectors vierem vazios.
+DOWNLOADER_MIDDLEWARES = {
+    'g1.middlewares.StaticFirstMiddleware': 545,
+}
+STATIC_FIRST_ENABLED = True
+# Caminho escolhido (estático ou navegador) por padrão de URL/domínio, reaproveitado entre execuções.
+STATIC_FIRST_CACHE_FILE = 'render_decisions_{}.json'
+# Segundos até o padrão voltar a ser testado pelo HTTP simples (0 = nunca expira).
+STATIC_FIRST_CACHE_TTL = 7 * 24 * 60 * 60
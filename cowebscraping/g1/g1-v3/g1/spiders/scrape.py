@@ -1,91 +1,174 @@
 import scrapy
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+from twisted.internet import task
 from datetime import datetime, timedelta
 from urllib.parse import quote, parse_qs, urlparse
-from sshtunnel import open_tunnel
 import pytz
-import pymongo
-import re
 import yaml
-from unidecode import unidecode
 import sys
-import os  # Necessário para verificar existência do arquivo de checkpoint
-from scrapy_playwright.page import PageMethod
 
 from ..items import G1Item
-from ..keywords import SEARCH_KEYWORDS, VALIDATION_KEYWORDS, SEARCH_KEYWORDS_CHUNKS
+from ..keywords import SEARCH_KEYWORDS, SEARCH_KEYWORDS_CHUNKS
+from .. import classification
+from crawler_common.mongo_pool import acquire_mongo_client
+from crawler_common.seen_index import SeenUrlIndex, load_seen_index
+from crawler_common.bloom_filter import BloomSeenUrls, BatchedUrlLookup, load_bloom_filter
+from ..window_scheduler import DayWindowScheduler
+from ..scroll_driver import scroll_page_methods, scroll_report
+from crawler_common.page_pool import PagePool
+from crawler_common.route_policy import RoutePolicy
+from crawler_common.checkpoint_journal import CheckpointJournal
+from crawler_common.frontier import RequestFrontier
+from crawler_common.work_queue import MongoWorkQueue, SqliteWorkQueue, worker_path
 
 # Configurações globais.
 ORDER = 'recent'
 SPECIES = quote('notícias')
 SEARCH_DATE_FORMAT = r'%Y-%m-%d'
 PAGE_SEARCH_URL_TEMPLATE = 'https://g1.globo.com/busca/?q={}&order={}&from={}T00%3A00%3A00-0300&to={}T23%3A59%3A59-0300&species={}'
-CHECKPOINT_FILE = 'checkpoints.yaml'
-
-
-# Método complementar para bloquear medias como vídeo e imagem -> Poupar tempo e memória RAM a ser consumida durante o crawler.
-def should_abort_request(request):
-    return request.resource_type in ["image", "media", "font", "stylesheet"]
+CHECKPOINT_FILE = 'checkpoints.yaml'                # Formato antigo (só lido na primeira execução com o diário)
+CHECKPOINT_JOURNAL = 'checkpoints.journal'      # Diário de checkpoints: palavras-chave e janelas concluídas (ver checkpoint_journal.py)
+WINDOW_CONCURRENCY = 4                          # Janelas (palavra-chave x dia) renderizadas ao mesmo tempo, uma por contexto do navegador
+ACTIVE_KEYWORDS = 4                             # Palavras-chave intercaladas na fila ao mesmo tempo
+WINDOW_MAX_ATTEMPTS = 3                         # Tentativas por janela antes de desistir (a palavra-chave fica sem checkpoint)
+SEARCH_WINDOW_MODE = 'daily'                    # 'daily' (um dia por busca) ou 'adaptive' (janelas largas divididas só quando saturam). Ex: -a window=adaptive
+ADAPTIVE_INITIAL_WINDOW_DAYS = 32               # Tamanho inicial das janelas no modo adaptativo (~1 mês)
+ADAPTIVE_SPLIT_RESULTS = 100                    # Resultados a partir dos quais a janela é considerada perto do limite da busca e é dividida
+ADAPTIVE_MAX_SCROLLS = 30                       # Rolagens por janela no modo adaptativo; atingir o limite = rolagem saturada (divide a janela)
+SEARCH_FETCH_MODE = 'static'                    # 'static' (HTML paginado por HTTP, navegador só como fallback) ou 'browser' (sempre Playwright). Ex: -a fetch=browser
+STATIC_MAX_PAGES = 50                           # Páginas (page=N) por janela no modo estático; atingir o limite com "Veja mais" = janela saturada
+STATIC_LOAD_MORE_SELECTOR = "div.pagination a.pagination__load-more"
+SEARCH_EMPTY_SELECTOR = "div.no-results, .results__empty"  # Aviso de busca sem resultados (a página vem sem ul.results__list)
+PAGE_MAX_NAVIGATIONS = 50                       # Janelas renderizadas por aba antes de trocá-la por uma nova (ver page_pool.py)
+PAGE_MAX_HEAP_MB = 256                          # Heap de JS (MB) a partir do qual a aba é trocada antes do limite de navegações
+CONTEXT_MAX_PAGES = 10                          # Abas trocadas por contexto (slot) antes de recriar o contexto inteiro
+FRONTIER_FILE = 'frontier.sqlite3'              # Fronteira em disco das notícias a baixar (sobrevive a reinícios; ver frontier.py)
+FRONTIER_MAX_IN_FLIGHT = 32                     # Notícias entregues ao Scrapy ao mesmo tempo; o resto espera no arquivo
+WORK_QUEUE_MODE = None                          # None (cada processo com a sua lista: -a k / -a c=N), 'mongo' (várias máquinas) ou 'sqlite' (uma máquina). Ex: -a queue=mongo
+WORK_QUEUE_FILE = 'work_queue.sqlite3'          # Arquivo da fila no modo 'sqlite'
+WORK_QUEUE_COLLECTION = 'workQueue'             # Coleção da fila no modo 'mongo'
+WORK_QUEUE_HEARTBEAT = 60                       # Segundos entre as renovações dos leases (vencem em work_queue.LEASE_SECONDS)
+
+SEEN_URLS_MODE = 'index'                        # 'index' (fingerprints de todas as URLs) ou 'bloom' (memória constante + confirmação no banco)
+SEEN_INDEX_SNAPSHOT_FILE = 'seen_urls_{}.idx'
+SEEN_INDEX_SNAPSHOT_MAX_AGE = 7 * 24 * 60 * 60  # Segundos até reconstruir o snapshot do zero (antes disso, só busca o que é novo). 0 = sem snapshot
+SEEN_BLOOM_FILE = 'seen_urls_{}.bloom'
+SEEN_BLOOM_CAPACITY = 10000000                  # URLs previstas (o filtro é recriado com o dobro do histórico se ele for maior)
+SEEN_BLOOM_ERROR_RATE = 0.001                   # Taxa de falsos positivos (cada um custa uma URL a mais na consulta de confirmação)
+SEEN_BLOOM_MAX_AGE = 30 * 24 * 60 * 60          # Segundos até o filtro ser recriado do zero (antes disso, só busca o que é novo). 0 = nunca
+
+
+# Política de bloqueio das requisições das páginas do Playwright -> Poupar tempo e memória RAM a ser consumida durante o crawler.
+# Bloqueia medias (vídeo, imagem, fontes, CSS), anúncios/analytics, pixels, iframes, tudo fora da Globo e os XHR que não
+# são da busca (o "Veja mais" da rolagem infinita vem de /busca/). Contadores por domínio no encerramento (ver route_policy.py).
+ROUTE_POLICY = RoutePolicy(
+    first_party=('globo.com', 'glbimg.com'),
+    blocked_types=('image', 'media', 'font', 'stylesheet', 'ping'),
+    xhr_allow=('/busca/',),
+)
 
 
 # Método que constrói a URL a ser pesquisada com cada uma das palavras-chave. Ex: "pcc"
-def build_page_search_url(keyword, date):
+# Sem end_date a busca cobre só o dia; com end_date, o intervalo [date, end_date] (modo adaptativo).
+def build_page_search_url(keyword, date, end_date=None):
     day_str = date.strftime(SEARCH_DATE_FORMAT)
-    return PAGE_SEARCH_URL_TEMPLATE.format(quote(keyword), ORDER, day_str, day_str, SPECIES)
+    end_str = (end_date or date).strftime(SEARCH_DATE_FORMAT)
+    return PAGE_SEARCH_URL_TEMPLATE.format(quote(keyword), ORDER, day_str, end_str, SPECIES)
+
 
+# Método que empresta do pool a conexão com o banco e devolve as fontes do histórico (aceitas [+ recusadas]).
+def connect_history_collections(load_unaccepted=True):
+    with open('config.yaml', 'r') as f:
+        configs = yaml.safe_load(f)
+    
+    lc = configs['lamcad']
+    mg = configs['mongodb_lamcad']
+    
+    # Túnel e cliente vêm do pool do processo: o pipeline reaproveita a mesma conexão logo depois.
+    mongo = acquire_mongo_client(lc, mg['uri'])
+    db = mongo.client[mg['database']]
+    
+    # 1. ACEITAS + 2. RECUSADAS, como fontes (nome, coleção, filtro) do histórico
+    names = [mg['accepted_news_collection']]
+    if load_unaccepted:
+        names.append(mg['unaccepted_news_collection'])
+    return mongo, [(name, db[name], {}) for name in names]
 
-# Método que retorna a quantidade de notícias aceitas e não aceitas.
+
+# Método que abre a fila de trabalho compartilhada (ver work_queue.py). Retorna (fila, conexão emprestada do pool ou None).
+def open_work_queue(mode, queue):
+    if mode == 'sqlite':
+        return SqliteWorkQueue(WORK_QUEUE_FILE, queue), None
+
+    with open('config.yaml', 'r') as f:
+        configs = yaml.safe_load(f)
+    mg = configs['mongodb_lamcad']
+    mongo = acquire_mongo_client(configs['lamcad'], mg['uri'])
+    return MongoWorkQueue(mongo.client[mg['database']][WORK_QUEUE_COLLECTION], queue), mongo
+
+
+# Método que retorna o histórico de URLs já vistas (notícias aceitas e não aceitas).
 def get_seen_urls_from_mongodb(load_unaccepted=True):
     """
-    Conecta ao MongoDB via SSH e retorna uma lista de URLs que já existem no banco.
+    Conecta ao MongoDB via SSH e retorna o histórico de URLs que já existem no banco:
+    - SEEN_URLS_MODE = 'index': SeenUrlIndex com todas as URLs (com SEEN_INDEX_SNAPSHOT_MAX_AGE > 0, reabre
+      via mmap o snapshot local se ele for recente o bastante);
+    - SEEN_URLS_MODE = 'bloom': BloomSeenUrls, filtro de Bloom em disco + confirmação em lote no banco.
     """
-    print("\n🔄 [INICIALIZAÇÃO] Conectando ao Banco para carregar histórico...")
-    
-    seen_urls = []
-    server = None
-    client = None
+    scope = 'all' if load_unaccepted else 'accepted'
+    if SEEN_URLS_MODE == 'bloom':
+        return get_seen_urls_bloom(load_unaccepted, SEEN_BLOOM_FILE.format(scope))
 
-    try:
-        with open('config.yaml', 'r') as f:
-            configs = yaml.safe_load(f)
-        
-        lc = configs['lamcad']
-        mg = configs['mongodb_lamcad']
-        
-        server = open_tunnel(
-            (lc['server_ip'], lc['server_port']),
-            ssh_username=lc['ssh_username'],
-            ssh_password=lc['ssh_password'],
-            local_bind_address=(lc['local_bind_ip'], lc['local_bind_port']),
-            remote_bind_address=(lc['remote_bind_ip'], lc['remote_bind_port'])
-        )
-        server.start()
+    snapshot_file = SEEN_INDEX_SNAPSHOT_FILE.format(scope)
+    mongo = None
 
-        client = pymongo.MongoClient(mg['uri'])
-        db = client[mg['database']]
-        
-        # 1. Carregando ACEITAS
-        accepted_col = db[mg['accepted_news_collection']]
-        accepted_urls = [doc['url'] for doc in accepted_col.find({}, {'url': 1})]
-        print(f"   -> Encontradas {len(accepted_urls)} notícias ACEITAS.")
-        seen_urls.extend(accepted_urls)
-
-        # 2. Carregando RECUSADAS
-        if load_unaccepted:
-            unaccepted_col = db[mg['unaccepted_news_collection']]
-            unaccepted_urls = [doc['url'] for doc in unaccepted_col.find({}, {'url': 1})]
-            print(f"   -> Encontradas {len(unaccepted_urls)} notícias RECUSADAS.")
-            seen_urls.extend(unaccepted_urls)
-        
-        print(f"✅ [SUCESSO] Total de {len(seen_urls)} URLs carregadas na memória.\n")
+    print("\n🔄 [INICIALIZAÇÃO] Conectando ao Banco para carregar histórico...")
+    try:
+        # Com snapshot, só os documentos acima do high-water mark (_id) atravessam o túnel
+        mongo, sources = connect_history_collections(load_unaccepted)
+        seen_urls, from_snapshot, fetched = load_seen_index(snapshot_file, SEEN_INDEX_SNAPSHOT_MAX_AGE, sources)
+        origin = f"snapshot {snapshot_file} + {fetched} URLs novas do banco" if from_snapshot else "banco"
+        print(f"✅ [SUCESSO] Histórico carregado do {origin}: {seen_urls.describe()}.\n")
         
     except Exception as e:
         print(f"⚠️ [ERRO] Falha ao carregar histórico do banco: {e}")
         print("   -> O crawler vai iniciar zerado.")
+        seen_urls = SeenUrlIndex()
     finally:
-        if client: client.close()
-        if server: server.stop()
+        if mongo: mongo.release()
     
-    return set(seen_urls)
+    return seen_urls
+
+
+# Método que abre (ou cria a partir do banco) o filtro de Bloom do histórico. A conexão fica emprestada até o
+# encerramento do spider, para as confirmações dos acertos do filtro.
+def get_seen_urls_bloom(load_unaccepted, bloom_file):
+    print("\n🔄 [INICIALIZAÇÃO] Conectando ao Banco para abrir o filtro de Bloom do histórico...")
+    mongo = None
+    try:
+        mongo, sources = connect_history_collections(load_unaccepted)
+        collections = [col for _, col, _ in sources]
+        bloom, from_disk, fetched = load_bloom_filter(
+            bloom_file, SEEN_BLOOM_MAX_AGE, SEEN_BLOOM_CAPACITY, SEEN_BLOOM_ERROR_RATE,
+            count_documents=lambda: sum(col.estimated_document_count() for col in collections),
+            sources=sources,
+        )
+        lookup = BatchedUrlLookup(collections, mongo)
+        # A confirmação de cada lote é uma consulta $in: sem índice no campo url, cada lote percorre a coleção
+        missing = lookup.collections_without_url_index()
+        if missing:
+            print(f"⚠️ [AVISO] Sem índice no campo url em {missing}: crie-o uma vez com createIndex({{url: 1}}).")
+        seen_urls = BloomSeenUrls(bloom, lookup)
+        origin = f"arquivo {bloom_file} + {fetched} URLs novas do banco" if from_disk else "banco"
+        print(f"✅ [SUCESSO] Histórico carregado do {origin}: {seen_urls.describe()}.\n")
+        return seen_urls
+
+    except Exception as e:
+        print(f"⚠️ [ERRO] Falha ao abrir o filtro de Bloom do histórico: {e}")
+        print("   -> O crawler vai iniciar zerado.")
+        if mongo: mongo.release()
+        return SeenUrlIndex()
 
 
 # Classe do spider G1
@@ -93,6 +176,26 @@ class ScrapeSpider(scrapy.Spider):
     name = "scrape"
     allowed_domains = ["g1.globo.com", "globo.com"]
     
+    # Ativado pelo ClassificationPipeline quando a validação roda fora do reator.
+    deferred_classification = False
+    
+    # Seletores do corpo da notícia: layout moderno (parse_news_v2) e antigo (parse_news_v1).
+    body_selectors_v2 = [
+        "article p.content-text__container::text",
+        "div.mc-column.content-text p::text",
+        "article[itemprop='articleBody'] p::text",
+        "div.widget--info__text-container p::text",
+    ]
+    body_selectors_v1 = [
+        "div#materia-letra p::text",
+        "div.entry-content p::text",
+        "div.post-content p::text",
+    ]
+    # Usados pelo StaticFirstMiddleware: as notícias vêm por HTTP simples e só vão para o Playwright se todos
+    # vierem vazios.
+    body_selectors = body_selectors_v2 + body_selectors_v1
+    static_first_callbacks = ('parse_news',)
+    
     # Configurações do crawler
     custom_settings = {
         'DOWNLOAD_HANDLERS': {
@@ -102,20 +205,48 @@ class ScrapeSpider(scrapy.Spider):
         'TWISTED_REACTOR': 'twisted.internet.asyncioreactor.AsyncioSelectorReactor',
         'PLAYWRIGHT_LAUNCH_OPTIONS': {'headless': True, 'timeout': 20000},             # headless : True faz com que não apareça o navegador simulado.
         'CONCURRENT_REQUESTS': 4,
-        'PLAYWRIGHT_ABORT_REQUEST': should_abort_request, 
+        'PLAYWRIGHT_ABORT_REQUEST': ROUTE_POLICY,
         'ITEM_PIPELINES': {
-            'g1.pipelines.MongoDBPipeline': 300,
+            'g1.pipelines.ClassificationPipeline': 200,                                 # Só atua com CLASSIFICATION_ENABLED = True
+            'g1.pipelines.MongoDBPipeline': 300,                                        # Desativado com MONGODB_ASYNC = True
+            'g1.pipelines.AsyncMongoDBPipeline': 300,                                   # Só atua com MONGODB_ASYNC = True
         }
     }
     
     
+    # Método que liga o spider_idle: se a fronteira ainda tem notícias, o spider não fecha.
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        return spider
+    
+    
+    # Método usado pelo executor conjunto (run_spiders.py): coleções (nome, filtro) do histórico consultadas por este spider,
+    # para que o executor carregue um índice só de URLs vistas para todos os spiders do processo. None = o spider carrega o
+    # próprio histórico (modo 'bloom', que já fica em disco).
+    @classmethod
+    def shared_seen_url_sources(cls, settings, mongo_configs, kwargs):
+        if SEEN_URLS_MODE == 'bloom':
+            return None
+        names = [mongo_configs['accepted_news_collection']]
+        if kwargs.get('recheck') != 'True':
+            names.append(mongo_configs['unaccepted_news_collection'])
+        return [(name, {}) for name in names]
+    
+    
     # Método que inicia o crawler; Carrega as palavras-chave; Recebe as palavras-chave para passar como parâmetro [scrapy crawl scrape -a k="pcc" I scrapy crawl scrape -a c=1]
     def __init__(self, name=None, **kwargs):
         super().__init__(name, **kwargs)
         self.items = [] 
         
         is_recheck = kwargs.get('recheck') == 'True'
-        self.seen_urls = get_seen_urls_from_mongodb(load_unaccepted=not is_recheck)
+        self.seen_urls_snapshot = SEEN_INDEX_SNAPSHOT_FILE.format('accepted' if is_recheck else 'all')
+        # No executor conjunto (run_spiders.py) o histórico já vem carregado e é compartilhado com os outros spiders
+        # do processo: quem o salva e fecha é o executor.
+        shared_seen_urls = kwargs.get('shared_seen_urls')
+        self.owns_seen_urls = shared_seen_urls is None
+        self.seen_urls = get_seen_urls_from_mongodb(load_unaccepted=not is_recheck) if self.owns_seen_urls else shared_seen_urls
         
         # Carrega todas as palavras-chave
         raw_keywords = []
@@ -124,6 +255,12 @@ class ScrapeSpider(scrapy.Spider):
         else: raw_keywords = SEARCH_KEYWORDS
     
         # Lógica de checkpoint
+        self.is_recheck = is_recheck
+        # Vários processos na mesma máquina (fila de trabalho): cada um com o seu diário e a sua fronteira (-a worker=N)
+        worker = kwargs.get('worker')
+        self.checkpoints = CheckpointJournal.open(worker_path(CHECKPOINT_JOURNAL, worker), legacy_path=CHECKPOINT_FILE,
+                                                  legacy_key='completed_keywords')
+        self.frontier = RequestFrontier.open(worker_path(FRONTIER_FILE, worker))
         if not is_recheck:
             completed_keywords = self.load_checkpoints()
             self.keywords = [k for k in raw_keywords if k not in completed_keywords]
@@ -134,135 +271,407 @@ class ScrapeSpider(scrapy.Spider):
             self.keywords = raw_keywords
 
         self.target_year = int(kwargs.get('y')) if kwargs.get('y') else 2023
+        self.adaptive_windows = kwargs.get('window', SEARCH_WINDOW_MODE) == 'adaptive'
+        self.static_search = kwargs.get('fetch', SEARCH_FETCH_MODE) == 'static'
+
+        # Fila de trabalho: as palavras-chave (x ano) são semeadas na fila e cada processo reserva uma por vez,
+        # até ACTIVE_KEYWORDS; quando uma termina, o processo reserva a próxima (ver keyword_finished).
+        self.work_queue, self.work_queue_mongo, self.work_units = None, None, {}
+        queue_mode = kwargs.get('queue', WORK_QUEUE_MODE)
+        if queue_mode:
+            queue = f"{self.name}:{self.target_year}{':recheck' if is_recheck else ''}"
+            self.work_queue, self.work_queue_mongo = open_work_queue(queue_mode, queue)
+            self.work_queue.seed((k, f'{self.target_year}-01-01', f'{self.target_year}-12-31', 0) for k in self.keywords)
+            self.keywords = [k for k in (self.claim_keyword() for _ in range(ACTIVE_KEYWORDS)) if k]
+            print(f"🤝 [FILA] {queue}: {self.work_queue.describe()}")
         
         print(f"--- SPIDER PRONTO: {len(self.keywords)} palavras-chave restantes para processar ---")
 
 
     # Método que inicia as requisições do Playwright para simular a navegação do navegador.
     def start_requests(self):
-        # Logo abaixo tem-se um trecho de código em JavaScript para simular a navegação.
-        # Lógica do código:
-        
-        # 1. Mede a página.
-        # 2. Desce tudo.
-        # 3. Espera 2 segundos.
-        # 4. Mede de novo.
-        # 5. Cresceu? Repete o processo.
-        # 6. Não cresceu? Acabou, pode sair e coletar os links.
-        
-        
-        scroll_script = """
-            async () => {
-                let lastHeight = document.body.scrollHeight;
-                while (true) {
-                    window.scrollTo(0, document.body.scrollHeight);
-                    await new Promise(resolve => setTimeout(resolve, 2000));
-                    
-                    let newHeight = document.body.scrollHeight;
-                    if (newHeight === lastHeight) {
-                        break;
-                    }
-                    lastHeight = newHeight;
-                }
-            }
-        """
-        # Por que usar um script de JS? Porque o G1 possui rolagem infinita.
-        # A ideia é rolar até encontrar a última notícia. Após encontrar o final da página, extrair cada uma das notícias do dia.
-        
         start_date = datetime(self.target_year, 1, 1)
         end_date = datetime.now() if self.target_year == datetime.now().year else datetime(self.target_year, 12, 31)
 
-        for keyword in self.keywords:
-            self.logger.info(f"🚀 INICIANDO KEYWORD: {keyword}")
-            curr = start_date
-            while curr <= end_date:
-                url = build_page_search_url(keyword, curr)
-                
-                meta = {
-                    'keyword': keyword, 'date': curr,
-                    'playwright': True, 'playwright_include_page': True,
-                    'playwright_page_methods': [
-                        PageMethod("wait_for_selector", "ul.results__list", timeout=15000),
-                        # Agora a variável scroll_script existe e contém o código JS
-                        PageMethod("evaluate", scroll_script),
-                        # Uma espera final de segurança
-                        PageMethod("wait_for_timeout", 1000), 
-                    ]
-                }
-                
-                yield scrapy.Request(url, self.parse_results_page, meta=meta, errback=self.errback_close, dont_filter=True)
-                curr += timedelta(days=1)
-            
-            self.save_checkpoint(keyword)
-            self.logger.info(f"💾 PALAVRA-CHAVE '{keyword}' foi totalmente processada. Salvando no arquivo.")
+        # As janelas (palavra-chave x dia) saem de uma fila de prioridade: só WINDOW_CONCURRENCY ficam em
+        # andamento e cada uma que termina libera a próxima (ver parse_results_page / errback_close).
+        self.scheduler = DayWindowScheduler(
+            self.keywords, start_date, end_date,
+            concurrency=WINDOW_CONCURRENCY, active_keywords=ACTIVE_KEYWORDS, max_attempts=WINDOW_MAX_ATTEMPTS,
+            initial_window_days=ADAPTIVE_INITIAL_WINDOW_DAYS if self.adaptive_windows else 1,
+            # Janelas concluídas numa execução interrompida não são buscadas de novo
+            done_days={} if self.is_recheck else self.load_done_days(self.keywords),
+        )
+        # Abas reaproveitadas entre as janelas do mesmo slot (cada slot tem o seu contexto)
+        self.pages = PagePool(PAGE_MAX_NAVIGATIONS, PAGE_MAX_HEAP_MB, CONTEXT_MAX_PAGES,
+                              stats=self.crawler.stats, logger=self.logger)
+        if self.frontier.count():
+            self.logger.info(f"♻️ [CHECKPOINT] Retomando a fronteira: {self.frontier.describe()}")
+        if self.work_queue:
+            self.heartbeat_loop = task.LoopingCall(self.work_heartbeat)
+            self.heartbeat_loop.start(WORK_QUEUE_HEARTBEAT, now=False)
+        yield from self.feed_frontier()
+        yield from self.next_window_requests()
+
+
+    # Método que reserva a próxima palavra-chave da fila de trabalho (None se a fila acabou).
+    # Palavras já concluídas neste diário local são dadas como feitas na fila sem buscar de novo.
+    def claim_keyword(self):
+        while True:
+            unit = self.work_queue.claim()
+            if unit is None:
+                return None
+            if not self.is_recheck and unit.keyword in self.checkpoints.completed_keywords():
+                self.work_queue.complete(unit.id)
+                continue
+            self.work_units[unit.keyword] = unit
+            return unit.keyword
+
+
+    # Método que renova os leases das palavras reservadas (chamado a cada WORK_QUEUE_HEARTBEAT segundos).
+    def work_heartbeat(self):
+        try:
+            lost = self.work_queue.heartbeat()
+        except Exception as e:
+            self.logger.error(f"Erro ao renovar os leases da fila de trabalho: {e}")
+            return
+        for unit in lost:
+            self.work_units.pop(unit.keyword, None)
+            self.logger.warning(f"⚠️ KW: {unit.keyword} - lease perdido (outro processo reservou a palavra-chave).")
+
+
+    # Método que monta as requisições das próximas janelas que cabem nos slots livres.
+    # Modo 'static': a janela começa pelo HTML paginado da busca (HTTP simples); o navegador só entra como fallback.
+    def next_window_requests(self):
+        # Palavras-chave que já estavam inteiras no checkpoint por janela
+        while self.scheduler.finished:
+            self.keyword_finished(self.scheduler.finished.pop(0))
+        for window in self.scheduler.next_windows():
+            if window.attempts == 1 and window.date == self.scheduler.days[0]:
+                self.logger.info(f"🚀 INICIANDO KEYWORD: {window.keyword}")
+            if self.static_search:
+                yield self.static_search_request(window.keyword, window.date, window.end)
+            else:
+                yield self.browser_search_request(window.keyword, window.date, window.end, window.slot)
+
+
+    # Método que monta a requisição da janela renderizada pelo Playwright (rolagem infinita).
+    def browser_search_request(self, keyword, date, end_date, slot):
+        url = build_page_search_url(keyword, date, end_date)
+        max_scrolls = ADAPTIVE_MAX_SCROLLS if self.adaptive_windows else 0
+        # No modo adaptativo também não adianta carregar mais cards que o limite: a janela vai ser dividida
+        max_items = ADAPTIVE_SPLIT_RESULTS if self.adaptive_windows else 0
+        
+        meta = {
+            'keyword': keyword, 'date': date, 'end_date': end_date,
+            'playwright': True, 'playwright_include_page': True,
+            # Um contexto do navegador por slot: WINDOW_CONCURRENCY contextos sempre ocupados
+            'playwright_context': f'janela-{slot}',
+            # Driver de rolagem: para assim que os cards param de chegar (ver scroll_driver.py)
+            'playwright_page_methods': scroll_page_methods(
+                "ul.results__list", "li.widget--card", empty_selector=SEARCH_EMPTY_SELECTOR,
+                max_scrolls=max_scrolls, max_items=max_items),
+        }
+        self.crawler.stats.inc_value('search/browser_windows')
+        # Aba livre do slot, se houver (senão o scrapy-playwright abre uma e ela entra no pool na devolução)
+        self.pages.borrow(meta)
+        return scrapy.Request(url, self.parse_results_page, meta=meta, errback=self.errback_close, dont_filter=True)
+
+
+    # Método que monta a requisição de uma página (page=N) do HTML da busca, sem navegador.
+    def static_search_request(self, keyword, date, end_date, page=1, found=0):
+        url = f"{build_page_search_url(keyword, date, end_date)}&page={page}"
+        meta = {'keyword': keyword, 'date': date, 'end_date': end_date, 'search_page': page, 'search_found': found}
+        self.crawler.stats.inc_value('search/static_pages')
+        return scrapy.Request(url, self.parse_static_results_page, meta=meta, errback=self.errback_close, dont_filter=True)
+
+
+    # Método chamado quando a página de resultados de uma janela foi processada.
+    def window_parsed(self, keyword, date, end_date=None):
+        self.save_window_checkpoint(keyword, date, end_date)
+        finished = self.scheduler.complete(keyword, date, end_date)
+        if finished:
+            self.keyword_finished(finished)
+
+
+    # Método do modo adaptativo: se a janela saturou (resultados perto do limite, ou rolagem/paginação que não
+    # terminou), a devolve para a fila dividida ao meio em vez de concluí-la.
+    def window_saturated(self, keyword, date, end_date, results, saturated):
+        if not self.adaptive_windows:
+            return False
+        if results < ADAPTIVE_SPLIT_RESULTS and not saturated:
+            return False
+
+        was_split, finished = self.scheduler.split(keyword, date, end_date)
+        if was_split:
+            self.logger.info(f"✂️ [{date.strftime('%d/%m')}-{end_date.strftime('%d/%m')}] KW: {keyword} - "
+                             f"{results} resultados (saturada: {saturated}). Dividindo a janela.")
+        else:
+            # Janela de um dia não tem como dividir: conta como concluída
+            self.save_window_checkpoint(keyword, date, end_date)
+        if finished:
+            self.keyword_finished(finished)
+        return True
+
+
+    # Método chamado quando a janela falhou (requisição ou processamento).
+    def window_failed(self, keyword, date, reason, end_date=None):
+        retry, finished = self.scheduler.fail(keyword, date, end_date)
+        if retry:
+            self.logger.warning(f"🔁 [{date.strftime('%d/%m')}] KW: {keyword} - janela falhou ({reason}). Tentando de novo.")
+        else:
+            self.logger.error(f"❌ [{date.strftime('%d/%m')}] KW: {keyword} - janela descartada após {WINDOW_MAX_ATTEMPTS} tentativas ({reason}).")
+        if finished:
+            self.keyword_finished(finished)
 
 
-    # Método que lê o arquivo .yaml e retorna uma lista das palavras-chave já finalizadas
+    # Método chamado quando todas as janelas da palavra-chave terminaram: só grava o checkpoint se nenhuma falhou.
+    def keyword_finished(self, progress):
+        self.crawler.stats.set_value(f'windows_per_minute/{progress.keyword}', round(progress.throughput(), 2))
+        if progress.complete:
+            self.save_checkpoint(progress.keyword)
+            self.logger.info(f"💾 PALAVRA-CHAVE '{progress.keyword}' foi totalmente processada ({progress.describe()}). Salvando no arquivo.")
+        else:
+            self.logger.warning(f"⚠️ PALAVRA-CHAVE '{progress.keyword}' terminou com janelas faltando ({progress.describe()}). Sem checkpoint.")
+
+        if self.work_queue:
+            # Concluída na fila (ou devolvida para outra tentativa) e a próxima palavra entra no lugar
+            unit = self.work_units.pop(progress.keyword, None)
+            if unit is not None:
+                if progress.complete:
+                    self.work_queue.complete(unit.id)
+                else:
+                    self.work_queue.release(unit.id, failed=True)
+            keyword = self.claim_keyword()
+            if keyword:
+                self.logger.info(f"🤝 [FILA] Reservada a palavra-chave '{keyword}' ({self.work_queue.describe()})")
+                self.scheduler.add_keyword(keyword, None if self.is_recheck else self.load_done_days([keyword]).get(keyword))
+
+
+    # Método chamado no encerramento: atualiza o snapshot do histórico com as URLs vistas nesta execução.
+    # (No modo 'bloom' o filtro já é atualizado em disco a cada add(); close() sincroniza e devolve a conexão.)
+    def closed(self, reason):
+        if self.owns_seen_urls and isinstance(self.seen_urls, SeenUrlIndex) and SEEN_INDEX_SNAPSHOT_MAX_AGE > 0 and self.seen_urls.recent:
+            try:
+                count = self.seen_urls.save(self.seen_urls_snapshot)
+                self.logger.info(f"💾 Snapshot do histórico atualizado: {count} URLs em {self.seen_urls_snapshot}")
+            except OSError as e:
+                self.logger.error(f"Erro ao salvar snapshot do histórico: {e}")
+        self.logger.info(f"📦 Histórico de URLs no encerramento: {self.seen_urls.describe()}")
+        scheduler = getattr(self, 'scheduler', None)
+        if scheduler:
+            for progress in scheduler.progress.values():
+                if progress.started_at is not None:
+                    self.logger.info(f"⏱️ KW: {progress.keyword} - {progress.describe()}")
+        pages = self.crawler.stats.get_value('scroll/pages', 0)
+        if pages:
+            self.logger.info(f"🖱️ Rolagem: {pages} páginas, média de "
+                             f"{self.crawler.stats.get_value('scroll/time_ms', 0) / pages:.0f} ms por página")
+            self.logger.info(f"🗂️ Pool de abas: {self.pages.describe()}")
+        ROUTE_POLICY.report(self.crawler.stats, self.logger)
+        if self.owns_seen_urls:
+            self.seen_urls.close()
+        self.checkpoints.close()
+        self.logger.info(f"🧭 Fronteira no encerramento: {self.frontier.describe()}")
+        self.frontier.close()
+        if self.work_queue:
+            if getattr(self, 'heartbeat_loop', None) and self.heartbeat_loop.running:
+                self.heartbeat_loop.stop()
+            # O que não terminou volta para a fila (sem contar tentativa) para outro processo continuar
+            self.work_queue.release_all()
+            self.logger.info(f"🤝 Fila de trabalho no encerramento: {self.work_queue.describe()}")
+            self.work_queue.close()
+            if self.work_queue_mongo:
+                self.work_queue_mongo.release()
+
+
+    # Método que retorna as palavras-chave já finalizadas (diário de checkpoints + YAML antigo)
     def load_checkpoints(self):
-        if not os.path.exists(CHECKPOINT_FILE):
-            return []
-        try:
-            with open(CHECKPOINT_FILE, 'r') as f:
-                data = yaml.safe_load(f)
-                if data and 'completed_keywords' in data:
-                    return data['completed_keywords']
-        except Exception as e:
-            print(f"⚠️ Erro ao ler checkpoint: {e}")
-        return []
+        return self.checkpoints.completed_keywords()
 
 
-    # Método que adiciona a palvra-chave que foi totalmente processada no arquivo .yaml (checkpoint).
+    # Método que adiciona a palvra-chave que foi totalmente processada no diário de checkpoints (uma linha, com fsync).
     def save_checkpoint(self, keyword):
-        completed = self.load_checkpoints()
-        if keyword not in completed:
-            completed.append(keyword)
-            try:
-                with open(CHECKPOINT_FILE, 'w') as f:
-                    yaml.dump({'completed_keywords': completed}, f)
-            except Exception as e:
-                self.logger.error(f"Erro ao salvar checkpoint: {e}")
+        try:
+            self.checkpoints.add('keyword', keyword)
+        except OSError as e:
+            self.logger.error(f"Erro ao salvar checkpoint: {e}")
+
+
+    # Método que grava a janela (palavra-chave x intervalo de dias) concluída no diário de checkpoints.
+    def save_window_checkpoint(self, keyword, date, end_date=None):
+        try:
+            self.checkpoints.add('window', keyword, date.strftime(SEARCH_DATE_FORMAT), (end_date or date).strftime(SEARCH_DATE_FORMAT))
+        except OSError as e:
+            self.logger.error(f"Erro ao salvar checkpoint da janela: {e}")
+
+
+    # Método que monta, a partir das janelas do diário, os dias já cobertos de cada palavra-chave.
+    def load_done_days(self, keywords):
+        done_days = {}
+        for keyword in keywords:
+            for start, end in self.checkpoints.units_of('window', keyword):
+                day, last = datetime.strptime(start, SEARCH_DATE_FORMAT), datetime.strptime(end, SEARCH_DATE_FORMAT)
+                while day <= last:
+                    done_days.setdefault(keyword, set()).add(day)
+                    day += timedelta(days=1)
+        return done_days
     
     
-    # Método que, para cada link, verifica se está no banco de dados [unaccepted], caso não estiver, chama o método de parse_news para extrair a notícia.
+    # Método que extrai os links das notícias dos cards da busca (desembrulhando o redirecionamento 'u=').
+    def extract_result_links(self, response):
+        links = response.css("li.widget--card a.widget--info__media::attr(href)").getall() or \
+                response.css("li.widget--card a.widget--info__text-container::attr(href)").getall()
+        
+        clean_links = []
+        for l in links:
+            if 'u=' in l:
+                try: l = parse_qs(urlparse(l).query)['u'][0]
+                except: pass
+            clean_links.append(l)
+        return clean_links
+
+
+    # Método que, para cada link, verifica se está no banco de dados [unaccepted] e coloca os novos na fronteira.
+    # A mesma notícia encontrada por várias palavras-chave (ou janelas) é baixada uma vez só: a fronteira ignora a URL
+    # que já está na fila ou já foi concluída nesta coleta, mesmo que a página não tenha gerado item (unique_url).
+    # Retorna as requisições de parse_news que cabem agora em FRONTIER_MAX_IN_FLIGHT (o resto espera no disco).
+    async def news_requests(self, response, clean_links):
+        # Uma verificação para a página inteira (no modo 'bloom', os acertos vão ao banco num único lote)
+        seen = await self.seen_urls.filter_seen(clean_links)
+        for url in clean_links:
+            if url in seen:
+                # Se já está na memória, avisamos no terminal e pulamos
+                print(f"⏭️  Pulando URL [JÁ ESTÁ NO BANCO]: {url}")
+            else:
+                self.frontier.push(response.meta['keyword'], url, 'parse_news', meta={'keyword': response.meta['keyword']},
+                                   errback='errback_news', unique_url=True)
+        return list(self.feed_frontier())
+
+
+    # Método que tira da fronteira as notícias que cabem nos lugares livres e monta as requisições delas.
+    def feed_frontier(self):
+        for entry in self.frontier.pop(FRONTIER_MAX_IN_FLIGHT - self.frontier.leased):
+            yield scrapy.Request(entry.url, getattr(self, entry.callback), errback=getattr(self, entry.errback),
+                                 meta=dict(entry.meta, frontier_id=entry.id), dont_filter=True)
+
+
+    # Método chamado quando o Scrapy fica sem requisições: continua enquanto houver notícias na fronteira.
+    def spider_idle(self):
+        requests = list(self.feed_frontier())
+        for request in requests:
+            self.crawler.engine.crawl(request)
+        if requests:
+            raise DontCloseSpider
+
+
+    # Método que processa a janela renderizada pelo Playwright.
+    # A aba volta para o pool ao final (o lease devolve mesmo se algo der errado, com ou sem 'playwright_page').
     async def parse_results_page(self, response):
-        page = response.meta["playwright_page"]
+        keyword, date, end_date = response.meta['keyword'], response.meta['date'], response.meta.get('end_date')
+        async with self.pages.lease(response.meta):
+            try:
+                clean_links = self.extract_result_links(response)
+                self.logger.info(f"[{date.strftime('%d/%m')}] KW: {keyword} - qtd. URLs encontradas: {len(clean_links)}")
+                requests = await self.news_requests(response, clean_links)
+            except Exception as e:
+                self.window_failed(keyword, date, e, end_date)
+                requests = []
+            else:
+                # Tempo gasto rolando a página (relatório do driver de rolagem)
+                scroll = scroll_report(response)
+                self.crawler.stats.inc_value('scroll/pages')
+                self.crawler.stats.inc_value('scroll/time_ms', scroll.get('elapsed', 0))
+                self.crawler.stats.inc_value(f"scroll/stop_{scroll.get('reason', 'unknown')}")
+                self.logger.debug(f"[{date.strftime('%d/%m')}] KW: {keyword} - rolagem: {scroll.get('scrolls', 0)} vezes, "
+                                  f"{scroll.get('items', 0)} cards, {scroll.get('elapsed', 0)} ms ({scroll.get('reason')})")
+                if scroll.get('reason') == 'no-list' and not scroll.get('empty'):
+                    # Nem lista nem aviso de busca vazia até o timeout: a janela é concluída vazia do mesmo jeito
+                    # (tentar de novo só atrasaria o checkpoint da palavra-chave), mas fica registrada
+                    self.crawler.stats.inc_value('scroll/no_list_unmarked')
+                    self.logger.warning(f"[{date.strftime('%d/%m')}] KW: {keyword} - página sem a lista de resultados "
+                                        f"e sem o aviso de busca vazia. Janela concluída sem notícias.")
+                # As URLs já encontradas seguem mesmo quando a janela é dividida
+                # (a fronteira não baixa de novo as URLs que se repetem nas metades)
+                if not self.window_saturated(keyword, date, end_date, len(clean_links), bool(scroll.get('saturated'))):
+                    self.window_parsed(keyword, date, end_date)
+
+        for request in requests:
+            yield request
+        # Slot liberado: entra a próxima janela da fila
+        for request in self.next_window_requests():
+            yield request
+
+
+    # Método que processa uma página do HTML da busca (modo 'static'): segue para page=N+1 enquanto houver
+    # "Veja mais"; se a primeira página vier sem a lista de resultados (conteúdo só via JS), cai para o Playwright.
+    async def parse_static_results_page(self, response):
+        meta = response.meta
+        keyword, date, end_date = meta['keyword'], meta['date'], meta['end_date']
+        page, found = meta['search_page'], meta['search_found']
         try:
-            links = response.css("li.widget--card a.widget--info__media::attr(href)").getall() or \
-                    response.css("li.widget--card a.widget--info__text-container::attr(href)").getall()
-            
-            clean_links = []
-            for l in links:
-                if 'u=' in l:
-                    try: l = parse_qs(urlparse(l).query)['u'][0]
-                    except: pass
-                clean_links.append(l)
-
-            self.logger.info(f"[{response.meta['date'].strftime('%d/%m')}] KW: {response.meta['keyword']} - qtd. URLs encontradas: {len(clean_links)}")
-
-            for url in clean_links:
-                if url in self.seen_urls:
-                    # Se já está na memória, avisamos no terminal e pulamos
-                    print(f"⏭️  Pulando URL [JÁ ESTÁ NO BANCO]: {url}")
-                else:
-                    news_meta = response.meta.copy()
-                    news_meta.pop('playwright', None)
-                    news_meta.pop('playwright_include_page', None)
-                    news_meta.pop('playwright_page_methods', None)
-                    
-                    yield scrapy.Request(url, self.parse_news, meta=news_meta)
-        finally:
-            await page.close()
-
-
-    # Método que, caso a requisição do navegador falhe (abrir a página), fecha a página para não sobrecarregar a memória RAM.
+            clean_links = self.extract_result_links(response)
+            if page == 1 and not clean_links and not response.css("ul.results__list"):
+                self.crawler.stats.inc_value('search/static_fallbacks')
+                window = self.scheduler.in_flight.get((keyword, date, end_date))
+                self.logger.info(f"[{date.strftime('%d/%m')}] KW: {keyword} - busca estática sem lista de resultados. Usando o navegador.")
+                yield self.browser_search_request(keyword, date, end_date, window.slot if window else 0)
+                return
+
+            found += len(clean_links)
+            has_more = bool(clean_links) and bool(response.css(STATIC_LOAD_MORE_SELECTOR))
+            self.logger.info(f"[{date.strftime('%d/%m')}] KW: {keyword} - página {page}: {len(clean_links)} URLs encontradas")
+            requests = await self.news_requests(response, clean_links)
+        except Exception as e:
+            self.window_failed(keyword, date, e, end_date)
+            requests = []
+        else:
+            # No modo adaptativo não adianta paginar além do limite: a janela já vai ser dividida
+            split_pending = self.adaptive_windows and found >= ADAPTIVE_SPLIT_RESULTS
+            if has_more and page < STATIC_MAX_PAGES and not split_pending:
+                # A janela continua com o mesmo slot na próxima página
+                requests.append(self.static_search_request(keyword, date, end_date, page + 1, found))
+                for request in requests:
+                    yield request
+                return
+            self.crawler.stats.inc_value('search/static_windows')
+            if not self.window_saturated(keyword, date, end_date, found, has_more):
+                self.window_parsed(keyword, date, end_date)
+
+        for request in requests:
+            yield request
+        # Slot liberado: entra a próxima janela da fila
+        for request in self.next_window_requests():
+            yield request
+
+
+    # Método que, caso a requisição do navegador falhe (abrir a página), descarta a aba para não sobrecarregar a memória RAM.
+    # A janela volta para a fila (ou é descartada após WINDOW_MAX_ATTEMPTS) e o slot passa para a próxima.
     async def errback_close(self, failure):
-        if failure.request.meta.get("playwright_page"):
-            await failure.request.meta["playwright_page"].close()
+        meta = failure.request.meta
+        await self.pages.release(meta, failed=True)
+        if 'keyword' in meta:
+            self.window_failed(meta['keyword'], meta['date'], failure.getErrorMessage(), meta.get('end_date'))
+            for request in self.next_window_requests():
+                yield request
     
     
+    # Método que, se a notícia falhar de vez (após os retries), a tira da fronteira e libera o lugar para a próxima.
+    def errback_news(self, failure):
+        meta = failure.request.meta
+        self.frontier.done(meta['frontier_id'])
+        self.logger.warning(f"⚠️ KW: {meta['keyword']} - falha ao baixar a notícia {failure.request.url}: {failure.getErrorMessage()}")
+        yield from self.feed_frontier()
+
+
     # Método que chama dois métodos de parse (layout antigo e novo).
-    def parse_news(self, response):
-        if response.url in self.seen_urls: return
+    async def parse_news(self, response):
+        # A notícia sai da fronteira e o lugar dela já vai para a próxima
+        self.frontier.done(response.meta['frontier_id'])
+        for request in self.feed_frontier():
+            yield request
+
+        if await self.seen_urls.contains(response.url): return
 
         title = response.css("h1.content-head__title::text").get() or response.css("h1.entry-title::text").get()
         if not title: return
@@ -310,18 +719,31 @@ class ScrapeSpider(scrapy.Spider):
         item = G1Item()
         item['url'] = response.url
         item['keyword'] = response.meta['keyword']
-        
-        accepted = self.accept_article(article)
-        item['accepted_by'] = accepted 
+        item['acquisition_date'] = datetime.now(pytz.timezone('America/Sao_Paulo')).strftime(r'%d-%m-%Y')
+        item['newspaper'] = 'G1'
+        item['title'] = response.css("h1.content-head__title::text").get() or response.css("h1.entry-title::text").get()
+        item['article'] = article
+        item['publication_date'] = date_obj 
+        item['id_event'] = None 
+
+        # Com o ClassificationPipeline ativo, a validação é feita por ele, fora da thread do reator.
+        if self.deferred_classification:
+            return item
+
+        accepted, gangs = classification.classify_article(article)
+        return self.apply_classification(item, accepted, gangs)
+
+
+    # Método que aplica o resultado da validação no item: aceitas recebem as gangues, recusadas ficam só com URL e palavra-chave.
+    def apply_classification(self, item, accepted, gangs):
+        item['accepted_by'] = accepted
 
         if accepted:
-            item['acquisition_date'] = datetime.now(pytz.timezone('America/Sao_Paulo')).strftime(r'%d-%m-%Y')
-            item['newspaper'] = 'G1'
-            item['title'] = response.css("h1.content-head__title::text").get() or response.css("h1.entry-title::text").get()
-            item['article'] = article
-            item['gangs'] = self.search_gangs(article)
-            item['publication_date'] = date_obj 
-            item['id_event'] = None 
+            item['gangs'] = gangs
+        else:
+            for field in list(item.keys()):
+                if field not in ('url', 'keyword', 'accepted_by'):
+                    del item[field]
         
         return item
     
@@ -341,15 +763,8 @@ class ScrapeSpider(scrapy.Spider):
         sub = response.css('h2::text').getall()
         sub = ' '.join([s.strip() for s in sub if s.strip()])
         
-        # Seletores para o corpo
-        body_selectors = [
-            "div#materia-letra p::text",
-            "div.entry-content p::text",
-            "div.post-content p::text"
-        ]
-        
         art = None
-        for selector in body_selectors:
+        for selector in self.body_selectors_v1:
             texts = response.css(selector).getall()
             art = self.clean_text(texts)
             if art: break
@@ -366,16 +781,10 @@ class ScrapeSpider(scrapy.Spider):
         sub = response.css("h2.content-head__subtitle::text").get() or \
               response.css("h2[itemprop='alternativeHeadline']::text").get() or ""
         
-        texts = response.css("article p.content-text__container::text").getall()
-
-        if not texts:
-            texts = response.css("div.mc-column.content-text p::text").getall()
-
-        if not texts:
-            texts = response.css("article[itemprop='articleBody'] p::text").getall()
-
-        if not texts:
-            texts = response.css("div.widget--info__text-container p::text").getall()
+        texts = []
+        for selector in self.body_selectors_v2:
+            texts = response.css(selector).getall()
+            if texts: break
 
         art = self.clean_text(texts)
         
@@ -389,22 +798,9 @@ class ScrapeSpider(scrapy.Spider):
 
     # Método que preenche a lista de gangues ['gangs']
     def search_gangs(self, art):
-        if not art: return []
-        found = []
-        for p in VALIDATION_KEYWORDS['GANGS']:
-            found += re.findall(p, unidecode(art), re.IGNORECASE)
-        return found
+        return classification.search_gangs(art)
     
     
     # Método que preenche o atributo 'accepted_by'.
     def accept_article(self, art):
-        if not art: return False
-        org = False
-        for p in VALIDATION_KEYWORDS['GANGS'] + VALIDATION_KEYWORDS['ORGANIZED CRIME']:
-            if re.findall(p, unidecode(art.lower()), re.IGNORECASE) or 'pcc' in unidecode(art.lower()).split():
-                org = p; break
-        act = False
-        for p in VALIDATION_KEYWORDS['DRUGS'] + VALIDATION_KEYWORDS['ARMED INTERACTIONS']:
-            if re.findall(p, unidecode(art.lower()), re.IGNORECASE):
-                act = p; break
-        return f"{org} - {act}" if (org and act) else False
+        return classification.accept_article(art)
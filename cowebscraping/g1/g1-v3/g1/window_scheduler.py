@@ -0,0 +1,220 @@
+import heapq
+from datetime import timedelta
+from time import monotonic
+
+
+# Janela de busca: uma palavra-chave num intervalo de dias [date, end] (no modo diário, date == end).
+class SearchWindow:
+    def __init__(self, keyword, date, end=None):
+        self.keyword = keyword
+        self.date = date
+        self.end = end or date
+        self.attempts = 0
+        self.slot = None
+
+    @property
+    def key(self):
+        return (self.keyword, self.date, self.end)
+
+    @property
+    def days(self):
+        return (self.end - self.date).days + 1
+
+
+# Progresso de uma palavra-chave: dias cobertos/falhos, janelas renderizadas e medição de vazão.
+class KeywordProgress:
+    def __init__(self, keyword, total):
+        self.keyword = keyword
+        # Dias do intervalo (parsed/failed também contam dias, já que uma janela pode cobrir vários)
+        self.total = total
+        self.parsed = 0
+        self.failed = 0
+        self.windows = 0
+        self.splits = 0
+        # Dias já cobertos por janelas concluídas numa execução anterior (checkpoint por janela)
+        self.resumed = 0
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.parsed + self.failed >= self.total
+
+    @property
+    def complete(self):
+        return self.parsed >= self.total
+
+    def elapsed_minutes(self):
+        if self.started_at is None:
+            return 0.0
+        return ((self.finished_at or monotonic()) - self.started_at) / 60
+
+    # Janelas processadas por minuto desde a primeira janela despachada.
+    def throughput(self):
+        elapsed = self.elapsed_minutes()
+        return self.windows / elapsed if elapsed > 0 else 0.0
+
+    def describe(self):
+        description = (f"{self.parsed}/{self.total} dias em {self.windows} janelas, {self.elapsed_minutes():.1f} min "
+                       f"({self.throughput():.1f} janelas/min, {self.failed} dias com falha")
+        if self.splits:
+            description += f", {self.splits} divisões"
+        if self.resumed:
+            description += f", {self.resumed} dias retomados do checkpoint"
+        return description + ")"
+
+
+class DayWindowScheduler:
+    """
+    Escalonador das janelas de busca (palavra-chave x dia) do G1.
+
+    No lugar de gerar todas as requisições de uma palavra-chave e depois da próxima, mantém uma fila de
+    prioridade com as janelas de até `active_keywords` palavras-chave ao mesmo tempo, intercaladas por dia,
+    e no máximo `concurrency` janelas em andamento (uma por slot, cada slot com o seu contexto do navegador).
+    Cada janela concluída (ou que falhou) libera o slot para a próxima.
+
+    Uma palavra-chave só é dada como concluída quando todas as suas janelas foram de fato processadas.
+    Janelas que falham voltam para a frente da fila até `max_attempts` tentativas.
+
+    `done_days` (palavra-chave -> dias) vem do checkpoint por janela: janelas com todos os dias já cobertos não
+    entram na fila. Palavras-chave que terminam assim, sem janela nenhuma, ficam em `finished` para o spider.
+
+    Modo adaptativo (initial_window_days > 1): as janelas começam largas (ex: um mês) e só são divididas ao
+    meio (split) quando a lista de resultados satura; palavras-chave com poucas notícias cobrem o ano com
+    poucas renderizações e as movimentadas descem até o dia, sem perder cobertura.
+    """
+    def __init__(self, keywords, start_date, end_date, concurrency=4, active_keywords=4, max_attempts=3,
+                 initial_window_days=1, done_days=None):
+        self.concurrency = concurrency
+        self.active_keywords = max(1, active_keywords)
+        self.max_attempts = max_attempts
+        self.initial_window_days = max(1, initial_window_days)
+        self.done_days = done_days or {}
+        self.finished = []
+
+        self.days = []
+        curr = start_date
+        while curr <= end_date:
+            self.days.append(curr)
+            curr += timedelta(days=1)
+
+        # Sem dias no intervalo não há janela a despachar
+        self.waiting_keywords = list(keywords) if self.days else []
+        self.progress = {keyword: KeywordProgress(keyword, len(self.days)) for keyword in keywords}
+        self.queue = []
+        self.sequence = 0
+        self.active = 0
+        self.free_slots = list(range(concurrency))
+        self.in_flight = {}
+
+        self.activate_keywords()
+
+    # Método que acrescenta uma palavra-chave depois de criado o agendador (ex: reservada na fila de trabalho).
+    def add_keyword(self, keyword, done_days=None):
+        self.progress[keyword] = KeywordProgress(keyword, len(self.days))
+        if done_days:
+            self.done_days[keyword] = done_days
+        if self.days:
+            self.waiting_keywords.append(keyword)
+        self.activate_keywords()
+
+    # Método que coloca na fila as janelas das próximas palavras-chave, até o limite de palavras ativas.
+    def activate_keywords(self):
+        while self.waiting_keywords and self.active < self.active_keywords:
+            keyword = self.waiting_keywords.pop(0)
+            self.active += 1
+            rank = len(self.progress) - len(self.waiting_keywords)
+            progress = self.progress[keyword]
+            done = self.done_days.get(keyword, ())
+            # Prioridade (dia, ordem da palavra): as palavras ativas avançam juntas, uma janela de cada
+            for day_index in range(0, len(self.days), self.initial_window_days):
+                last = min(day_index + self.initial_window_days, len(self.days)) - 1
+                window = SearchWindow(keyword, self.days[day_index], self.days[last])
+                if done and all(day in done for day in self.days[day_index:last + 1]):
+                    progress.parsed += window.days
+                    progress.resumed += window.days
+                    continue
+                self.push((1, day_index, rank), window)
+
+            if progress.done:
+                # Todas as janelas já estavam no checkpoint
+                progress.started_at = progress.finished_at = monotonic()
+                self.active -= 1
+                self.finished.append(progress)
+
+    def push(self, priority, window):
+        heapq.heappush(self.queue, (priority, self.sequence, window))
+        self.sequence += 1
+
+    def __len__(self):
+        return len(self.queue) + len(self.in_flight)
+
+    # Método que devolve as janelas que cabem nos slots livres agora.
+    def next_windows(self):
+        windows = []
+        while self.free_slots and self.queue:
+            _, _, window = heapq.heappop(self.queue)
+            window.slot = self.free_slots.pop(0)
+            window.attempts += 1
+            self.in_flight[window.key] = window
+
+            progress = self.progress[window.keyword]
+            if progress.started_at is None:
+                progress.started_at = monotonic()
+            windows.append(window)
+        return windows
+
+    # Método que libera o slot da janela.
+    def release(self, keyword, date, end=None):
+        window = self.in_flight.pop((keyword, date, end or date), None)
+        if window is not None:
+            self.free_slots.append(window.slot)
+        return window
+
+    # Método chamado quando a página de resultados foi processada. Retorna o progresso se a palavra-chave terminou.
+    def complete(self, keyword, date, end=None):
+        window = self.release(keyword, date, end)
+        if window is None:
+            return None
+        progress = self.progress[keyword]
+        progress.parsed += window.days
+        progress.windows += 1
+        return self.finish_if_done(progress)
+
+    # Método chamado quando a janela saturou: volta para a fila dividida ao meio (as duas metades na frente,
+    # para a palavra-chave continuar avançando). Janela de um dia não tem como dividir e conta como concluída.
+    # Retorna (dividiu, progresso se a palavra-chave terminou).
+    def split(self, keyword, date, end=None):
+        window = self.in_flight.get((keyword, date, end or date))
+        if window is None or window.days <= 1:
+            return False, self.complete(keyword, date, end)
+        self.release(keyword, date, end)
+
+        middle = window.date + timedelta(days=window.days // 2 - 1)
+        progress = self.progress[keyword]
+        progress.windows += 1
+        progress.splits += 1
+        for half in (SearchWindow(keyword, window.date, middle), SearchWindow(keyword, middle + timedelta(days=1), window.end)):
+            self.push((0, 0, half.date), half)
+        return True, None
+
+    # Método chamado quando a janela falhou: volta para a frente da fila ou, esgotadas as tentativas, é descartada.
+    # Retorna (vai_tentar_de_novo, progresso se a palavra-chave terminou).
+    def fail(self, keyword, date, end=None):
+        window = self.release(keyword, date, end)
+        if window is None:
+            return False, None
+        if window.attempts < self.max_attempts:
+            self.push((0, window.attempts, window.date), window)
+            return True, None
+        progress = self.progress[keyword]
+        progress.failed += window.days
+        return False, self.finish_if_done(progress)
+
+    def finish_if_done(self, progress):
+        if not progress.done:
+            return None
+        progress.finished_at = monotonic()
+        self.active -= 1
+        self.activate_keywords()
+        return progress
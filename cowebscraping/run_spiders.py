@@ -0,0 +1,278 @@
+"""
+Executor conjunto: roda spiders dos dois projetos (G1 e web_scraping_news) num processo só, num reator só.
+
+Em vez de um `scrapy crawl` por portal (cada um com o seu Chromium, os seus túneis SSH, o seu histórico de URLs e a
+sua cópia das tabelas de palavras-chave), os spiders dividem:
+- um navegador: um Chromium aberto aqui, ao qual o scrapy-playwright de cada spider se conecta por CDP
+  (PLAYWRIGHT_CDP_URL); cada spider continua com os seus contextos e abas;
+- o pool de túneis/clientes do MongoDB (crawler_common.mongo_pool.MONGO_POOL, o mesmo módulo nos dois projetos): um
+  handshake SSH por servidor para o processo inteiro;
+- o índice de URLs vistas (crawler_common.seen_index.SeenUrlIndex), carregado uma vez da união das coleções que os
+  spiders consultam (ver shared_seen_url_sources em cada spider) e salvo uma vez no fim.
+
+Cada spider mantém o próprio downloader, com o seu orçamento de requisições simultâneas (CONCURRENT_REQUESTS,
+ver RUNNER_BUDGETS / -b). Rode na pasta do config.yaml (os arquivos locais de cada spider são criados nela):
+
+    python run_spiders.py                                   # os três portais
+    python run_spiders.py scrape diplomatique_news -b scrape=8 -a scrape:y=2024 -a worker=1
+"""
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+from scrapy.crawler import Crawler, CrawlerProcess
+from scrapy.settings import Settings
+from scrapy.spiderloader import get_spider_loader
+from scrapy.utils.reactor import install_reactor
+
+from crawler_common.mongo_pool import acquire_mongo_client
+from crawler_common.seen_index import load_seen_index
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Projetos (módulo de settings, pasta do scrapy.cfg) na ordem em que os spiders são procurados pelo nome.
+PROJECTS = [
+    ('g1.settings', os.path.join(ROOT, 'g1', 'g1-v3')),
+    ('web_scraping_news.settings', os.path.join(ROOT, 'correio_diplomatique')),
+]
+DEFAULT_SPIDERS = ['scrape', 'diplomatique_news', 'correio_do_povo_news']
+
+# Requisições simultâneas por spider (CONCURRENT_REQUESTS de cada downloader; a soma é o total do processo).
+# Spiders fora da tabela ficam com o valor do próprio projeto. Ex: -b scrape=8
+RUNNER_BUDGETS = {
+    'scrape': 4,
+    'diplomatique_news': 8,
+    'correio_do_povo_news': 4,
+}
+
+TWISTED_REACTOR = 'twisted.internet.asyncioreactor.AsyncioSelectorReactor'
+BROWSER_LAUNCH_TIMEOUT = 20                             # Segundos para o Chromium compartilhado abrir a porta do DevTools
+SEEN_INDEX_SNAPSHOT_FILE = 'seen_urls_shared_{}.idx'    # Snapshot do índice compartilhado ({} = coleções de origem)
+SEEN_INDEX_SNAPSHOT_MAX_AGE = 7 * 24 * 60 * 60          # Segundos até reconstruir o snapshot do zero. 0 = sem snapshot
+
+logger = logging.getLogger('run_spiders')
+
+
+class SharedBrowser:
+    """
+    Chromium único do processo. É aberto com --remote-debugging-port=0 e a porta escolhida é lida do arquivo
+    DevToolsActivePort do perfil temporário; os spiders se conectam por CDP e, ao fecharem, só se desconectam.
+    """
+    def __init__(self, headless=True, launch_timeout=BROWSER_LAUNCH_TIMEOUT):
+        self.headless = headless
+        self.launch_timeout = launch_timeout
+        self.process = None
+        self.user_data_dir = None
+        self.cdp_url = None
+
+    @staticmethod
+    def executable_path():
+        from playwright.sync_api import sync_playwright
+
+        def find():
+            with sync_playwright() as p:
+                return p.chromium.executable_path
+
+        # Numa thread à parte: o sync_playwright tem o próprio loop asyncio e não pode mexer no do reator
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(find).result()
+
+    def start(self):
+        self.user_data_dir = tempfile.mkdtemp(prefix='shared-chromium-')
+        args = [
+            self.executable_path(),
+            '--remote-debugging-port=0',
+            f'--user-data-dir={self.user_data_dir}',
+            '--no-first-run',
+            '--no-default-browser-check',
+            '--no-sandbox',
+        ]
+        if self.headless:
+            args.append('--headless=new')
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        port_file = os.path.join(self.user_data_dir, 'DevToolsActivePort')
+        deadline = time.monotonic() + self.launch_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                with open(port_file, 'r') as f:
+                    port = f.readline().strip()
+            except OSError:
+                port = ''
+            if port.isdigit():
+                self.cdp_url = f'http://127.0.0.1:{port}'
+                return self.cdp_url
+            time.sleep(0.1)
+        self.stop()
+        raise RuntimeError('O Chromium compartilhado não abriu a porta do DevTools')
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+
+class SpiderSpec:
+    """Spider a rodar: classe, settings do projeto dele e argumentos (-a)."""
+    def __init__(self, name, spidercls, settings, kwargs):
+        self.name = name
+        self.spidercls = spidercls
+        self.settings = settings
+        self.kwargs = kwargs
+
+
+# Método que encontra o spider pelo nome nos projetos e devolve a classe com uma cópia das settings do projeto dele.
+def load_spider(name):
+    for settings_module, _ in PROJECTS:
+        settings = Settings()
+        settings.setmodule(settings_module, priority='project')
+        loader = get_spider_loader(settings)
+        if name in loader.list():
+            return loader.load(name), settings
+    raise KeyError(f"Spider '{name}' não encontrado nos projetos: {[module for module, _ in PROJECTS]}")
+
+
+# Método que carrega o índice de URLs vistas compartilhado: a união das coleções pedidas pelos spiders.
+# Retorna (índice, caminho do snapshot) ou (None, None) se menos de dois spiders o usariam ou se o banco falhar
+# (cada spider carrega o próprio, como no `scrapy crawl`).
+def load_shared_seen_urls(specs):
+    try:
+        with open('config.yaml', 'r') as f:
+            configs = yaml.safe_load(f)
+    except FileNotFoundError:
+        logger.error("config.yaml não encontrado: cada spider carrega o próprio histórico")
+        return None, None
+    mongo_configs = configs['mongodb_lamcad']
+
+    wanted = {}
+    users = []
+    for spec in specs:
+        sources = getattr(spec.spidercls, 'shared_seen_url_sources', lambda *args: None)(spec.settings, mongo_configs, spec.kwargs)
+        if sources is None:
+            continue
+        users.append(spec)
+        for name, query in sources:
+            wanted.setdefault(name, query)
+    if len(users) < 2:
+        return None, None
+
+    mongo = None
+    try:
+        mongo = acquire_mongo_client(configs['lamcad'], mongo_configs['uri'])
+        db = mongo.client[mongo_configs['database']]
+        sources = [(name, db[name], query) for name, query in sorted(wanted.items())]
+        snapshot_path = SEEN_INDEX_SNAPSHOT_FILE.format('_'.join(name for name, _, _ in sources))
+        seen_urls, from_snapshot, fetched = load_seen_index(snapshot_path, SEEN_INDEX_SNAPSHOT_MAX_AGE, sources)
+    except Exception as e:
+        logger.error(f"⚠️ Falha ao carregar o histórico compartilhado ({e}): cada spider carrega o próprio")
+        return None, None
+    finally:
+        # O túnel continua aberto (IDLE_TIMEOUT) para os spiders e pipelines que vêm logo depois
+        if mongo: mongo.release()
+
+    origin = f"snapshot {snapshot_path} + {fetched} URLs novas do banco" if from_snapshot else "banco"
+    logger.info(f"✅ Histórico compartilhado por {[spec.name for spec in users]} carregado do {origin}: {seen_urls.describe()}")
+    for spec in users:
+        spec.kwargs['shared_seen_urls'] = seen_urls
+    return seen_urls, snapshot_path
+
+
+def save_shared_seen_urls(seen_urls, snapshot_path):
+    if SEEN_INDEX_SNAPSHOT_MAX_AGE > 0 and seen_urls.recent:
+        try:
+            count = seen_urls.save(snapshot_path)
+            logger.info(f"💾 Snapshot do histórico compartilhado atualizado: {count} URLs em {snapshot_path}")
+        except OSError as e:
+            logger.error(f"Erro ao salvar o snapshot do histórico compartilhado: {e}")
+    logger.info(f"📦 Histórico compartilhado no encerramento: {seen_urls.describe()}")
+    seen_urls.close()
+
+
+# Método que separa os -a: 'spider:chave=valor' vale só para o spider; 'chave=valor', para todos.
+def parse_spider_arguments(arguments, names):
+    kwargs = {name: {} for name in names}
+    for argument in arguments:
+        key, _, value = argument.partition('=')
+        target, _, key = key.rpartition(':')
+        for name in ([target] if target else names):
+            if name not in kwargs:
+                raise SystemExit(f"-a {argument}: o spider '{target}' não está na lista")
+            kwargs[name][key] = value
+    return kwargs
+
+
+def parse_budgets(arguments):
+    budgets = dict(RUNNER_BUDGETS)
+    for argument in arguments:
+        name, _, value = argument.partition('=')
+        budgets[name] = int(value)
+    return budgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Roda vários spiders num processo só, com navegador, pool do '
+                                                 'MongoDB e histórico de URLs compartilhados.')
+    parser.add_argument('spiders', nargs='*', default=DEFAULT_SPIDERS, help=f'Padrão: {" ".join(DEFAULT_SPIDERS)}')
+    parser.add_argument('-a', dest='arguments', action='append', default=[], metavar='[SPIDER:]CHAVE=VALOR',
+                        help='Argumento do spider (como no scrapy crawl -a)')
+    parser.add_argument('-b', dest='budgets', action='append', default=[], metavar='SPIDER=N',
+                        help='Requisições simultâneas do spider (CONCURRENT_REQUESTS)')
+    parser.add_argument('--no-shared-browser', action='store_true',
+                        help='Cada spider abre o próprio navegador (como no scrapy crawl)')
+    args = parser.parse_args(argv)
+
+    for _, project_dir in PROJECTS:
+        if project_dir not in sys.path:
+            sys.path.insert(0, project_dir)
+
+    # O reator (asyncio, exigido pelo Playwright) é instalado aqui, antes de qualquer módulo dos spiders ser importado:
+    # os Crawlers criados abaixo só conferem que é o mesmo das settings de cada projeto
+    process = CrawlerProcess({'TWISTED_REACTOR': TWISTED_REACTOR, 'LOG_LEVEL': 'INFO'})
+    install_reactor(TWISTED_REACTOR)
+
+    spider_kwargs = parse_spider_arguments(args.arguments, args.spiders)
+    budgets = parse_budgets(args.budgets)
+    specs = [SpiderSpec(name, *load_spider(name), spider_kwargs[name]) for name in args.spiders]
+
+    seen_urls, snapshot_path = load_shared_seen_urls(specs)
+    browser = None
+    try:
+        if not args.no_shared_browser:
+            browser = SharedBrowser()
+            logger.info(f"🌐 Chromium compartilhado em {browser.start()}")
+
+        for spec in specs:
+            # Prioridade 'cmdline' (como o -s do scrapy crawl): vale mais que o custom_settings do spider
+            if browser is not None:
+                spec.settings.set('PLAYWRIGHT_CDP_URL', browser.cdp_url, priority='cmdline')
+            if spec.name in budgets:
+                spec.settings.set('CONCURRENT_REQUESTS', budgets[spec.name], priority='cmdline')
+            process.crawl(Crawler(spec.spidercls, spec.settings), **spec.kwargs)
+            logger.info(f"🕷️ {spec.name}: {budgets.get(spec.name, 'padrão do projeto')} requisições simultâneas")
+
+        process.start()
+    finally:
+        if seen_urls is not None:
+            save_shared_seen_urls(seen_urls, snapshot_path)
+        if browser is not None:
+            browser.stop()
+
+
+if __name__ == '__main__':
+    main()